@@ -1,4 +1,9 @@
+import asyncio
+import json
+from typing import Any, Dict, Optional
+
 from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi.responses import StreamingResponse
 from app.schemas.lead import ChatRequest, ChatResponse
 from app.services.ai_service import AIService
 from app.services.lead_service import LeadService
@@ -18,72 +23,79 @@ logger = logging.getLogger(__name__)
 
 # ... (rest of the imports)
 
-@router.post("/respond", response_model=ChatResponse)
-
-async def chat_respond(chat_request: ChatRequest):
-
-    """Generate AI response for chat messages"""
-
-    logger.info(f"--- chat_respond started for tenant_id: {chat_request.tenant_id} ---")
-
-    try:
-
-        # Get or create lead based on user_id, source, and tenant_id
-
-        logger.info("Getting or creating lead...")
-
-        lead = None
-
-        
-
-        if chat_request.source == LeadSource.WHATSAPP.value:
-
-            # Need to modify get_lead_by_phone to include tenant_id
-
-            # For now, let's assume get_lead_by_phone will fetch by phone within the tenant_id
-
-            lead = await lead_service.get_lead_by_phone(chat_request.user_id, chat_request.tenant_id)
+async def _get_or_create_lead(chat_request: ChatRequest):
+    """Find the chat user's lead within the tenant, creating it on first contact."""
+    logger.info("Getting or creating lead...")
+    lead = None
+
+    if chat_request.source == LeadSource.WHATSAPP.value:
+        # Need to modify get_lead_by_phone to include tenant_id
+        # For now, let's assume get_lead_by_phone will fetch by phone within the tenant_id
+        lead = await lead_service.get_lead_by_phone(chat_request.user_id, chat_request.tenant_id)
+    # Add other sources as needed (and ensure their get methods are tenant-aware)
+
+    if not lead:
+        # Create a new lead
+        logger.info("Creating a new lead...")
+        lead_data = LeadCreate(
+            tenant_id=chat_request.tenant_id, # Pass tenant_id
+            name=chat_request.user_id,
+            email="",
+            phone=chat_request.user_id if chat_request.source == LeadSource.WHATSAPP.value else "",
+            source=LeadSource(chat_request.source)
+        )
+        lead = await lead_service.create_lead(lead_data, chat_request.tenant_id)
+        logger.info("New lead created.")
+    return lead
 
-        # Add other sources as needed (and ensure their get methods are tenant-aware)
 
-        
+def _user_context(lead, tenant_id: str) -> Dict[str, Any]:
+    """AI service context: the tenant, and the lead's rolling summary of its oldest messages."""
+    return {
+        "tenant_id": tenant_id,
+        "conversation_summary": lead.summary,
+        "summarized_messages": lead.summary_message_count,
+    }
 
-        if not lead:
 
-            # Create a new lead
+def _detected_intent(intent_result: "asyncio.Future[str]") -> Optional[str]:
+    """The intent label if detection has finished successfully, else None; never raises."""
+    if intent_result.done() and not intent_result.cancelled() and intent_result.exception() is None:
+        return intent_result.result()
+    return None
 
-            logger.info("Creating a new lead...")
 
-            lead_data = LeadCreate(
+def _sse_event(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
 
-                tenant_id=chat_request.tenant_id, # Pass tenant_id
 
-                name=chat_request.user_id,
+@router.post("/respond", response_model=ChatResponse)
 
-                email="",
+async def chat_respond(chat_request: ChatRequest, background_tasks: BackgroundTasks):
 
-                phone=chat_request.user_id if chat_request.source == LeadSource.WHATSAPP.value else "",
+    """Generate AI response for chat messages"""
 
-                source=LeadSource(chat_request.source)
+    logger.info(f"--- chat_respond started for tenant_id: {chat_request.tenant_id} ---")
 
-            )
+    try:
 
-            lead = await lead_service.create_lead(lead_data)
+        # Get or create lead based on user_id, source, and tenant_id
 
-            logger.info("New lead created.")
+        lead = await _get_or_create_lead(chat_request)
 
         
 
-        # Generate AI response
+        # Generate AI response and detect intent
 
         logger.info("Generating AI response...")
 
-        # Create user context with tenant_id for product search
-        user_context = {
-            "tenant_id": chat_request.tenant_id
-        }
+        # Create user context with tenant_id for product search and the rolling summary
+        user_context = _user_context(lead, chat_request.tenant_id)
+
+        # Reply and intent come from one LLM call when AI_COMBINED_RESPONSE is on,
+        # otherwise intent detection runs alongside and may finish after the reply
 
-        ai_response = await ai_service.generate_response(
+        ai_response, intent_result = await ai_service.respond_first(
 
             chat_request.message,
 
@@ -95,15 +107,6 @@ async def chat_respond(chat_request: ChatRequest):
 
         logger.info("AI response generated.")
 
-        
-
-        # Detect intent
-
-        logger.info("Detecting intent...")
-
-        intent = await ai_service.detect_intent(chat_request.message, lead.messages if lead.messages else [])
-
-        logger.info(f"Intent detected: {intent}")
 
         
 
@@ -119,27 +122,16 @@ async def chat_respond(chat_request: ChatRequest):
 
         
 
-        # Update intent if needed
-
-        if intent in ["HOT", "WARM", "COLD"]:
-
-            logger.info("Updating lead intent...")
-
-            from app.constants.enums import LeadIntent
-
-            intent_map = {
-
-                "HOT": LeadIntent.HOT,
+        # Update intent once detected, after the response has been sent
 
-                "WARM": LeadIntent.WARM,
+        intent = _detected_intent(intent_result)
 
-                "COLD": LeadIntent.COLD
+        logger.info(f"Intent detected: {intent}" if intent else "Intent still being detected")
 
-            }
-
-            await lead_service.update_lead_intent(str(lead.id), intent_map.get(intent, LeadIntent.COLD), chat_request.tenant_id)
-
-            logger.info("Lead intent updated.")
+        background_tasks.add_task(lead_service.apply_detected_intent, str(lead.id), intent_result, chat_request.tenant_id)
+        background_tasks.add_task(
+            lead_service.refresh_conversation_summary, str(lead.id), chat_request.tenant_id, ai_service.summarize_conversation
+        )
 
         
 
@@ -160,3 +152,66 @@ async def chat_respond(chat_request: ChatRequest):
         logger.error(f"Error in chat_respond: {e}", exc_info=True)
 
         raise HTTPException(status_code=500, detail=f"Error generating chat response: {str(e)}")
+
+
+@router.get("/stats")
+async def get_chat_stats():
+    """
+    Get AI response statistics, including response cache hit rate and tokens saved.
+    """
+    return ai_service.get_stats()
+
+
+@router.post("/respond/stream")
+async def chat_respond_stream(chat_request: ChatRequest):
+    """
+    Stream the AI response to a chat message as server-sent events.
+
+    Each ``token`` event carries the next piece of the reply as ``{"text": ...}``.
+    When the reply is complete, both messages are saved to the lead and a
+    ``done`` event carries the full ``ChatResponse``. Its intent is null if
+    classification is still running; the lead's intent is updated once it
+    finishes. An ``error`` event ends the stream if saving fails.
+    """
+    logger.info(f"--- chat_respond_stream started for tenant_id: {chat_request.tenant_id} ---")
+    try:
+        lead = await _get_or_create_lead(chat_request)
+    except Exception as e:
+        logger.error(f"Error in chat_respond_stream: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error generating chat response: {str(e)}")
+
+    chunks, intent_result = ai_service.respond_stream(
+        chat_request.message,
+        lead.messages if lead.messages else [],
+        user_context=_user_context(lead, chat_request.tenant_id)
+    )
+
+    async def events():
+        parts = []
+        async for chunk in chunks:
+            parts.append(chunk)
+            yield _sse_event("token", {"text": chunk})
+        ai_response = "".join(parts)
+        try:
+            await lead_service.add_message_to_lead(str(lead.id), chat_request.message, "user", chat_request.tenant_id)
+            await lead_service.add_message_to_lead(str(lead.id), ai_response, "assistant", chat_request.tenant_id)
+        except Exception as e:
+            logger.error(f"Error saving streamed chat response: {e}", exc_info=True)
+            yield _sse_event("error", {"detail": "Error saving chat response"})
+            return
+        intent = _detected_intent(intent_result)
+        yield _sse_event("done", ChatResponse(response=ai_response, intent=intent, follow_up=True).model_dump())
+        logger.info("--- chat_respond_stream finished ---")
+
+    # Runs after the stream ends, including when the client disconnects early
+    background_tasks = BackgroundTasks()
+    background_tasks.add_task(lead_service.apply_detected_intent, str(lead.id), intent_result, chat_request.tenant_id)
+    background_tasks.add_task(
+        lead_service.refresh_conversation_summary, str(lead.id), chat_request.tenant_id, ai_service.summarize_conversation
+    )
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=background_tasks
+    )
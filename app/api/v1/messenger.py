@@ -228,47 +228,41 @@ async def process_messenger_message(tenant_id: str, sender_id: str, message_text
             lead = await lead_service.create_lead(lead_data)
             logger.info("New lead created.")
         
-        # Generate AI response
+        # Generate AI response and detect intent
         logger.info("Generating AI response...")
 
-        # Create user context with tenant_id for product search
+        # Create user context with tenant_id for product search and the rolling summary
         user_context = {
-            "tenant_id": tenant_id
+            "tenant_id": tenant_id,
+            "conversation_summary": lead.summary,
+            "summarized_messages": lead.summary_message_count
         }
 
-        ai_response = await ai_service.generate_response(
+        # Reply and intent come from one LLM call when AI_COMBINED_RESPONSE is on,
+        # otherwise intent detection runs alongside and may finish after the reply
+        ai_response, intent_result = await ai_service.respond_first(
             chat_request.message,
             lead.messages if lead.messages else [],
             user_context=user_context
         )
         logger.info(f"AI response generated: {ai_response}")
         
-        # Detect intent
-        logger.info("Detecting intent...")
-        intent = await ai_service.detect_intent(chat_request.message, lead.messages if lead.messages else [])
-        logger.info(f"Intent detected: {intent}")
-        
         # Add the user message and AI response to the conversation
         logger.info("Adding messages to lead history...")
         await lead_service.add_message_to_lead(str(lead.id), chat_request.message, "user", tenant_id)
         await lead_service.add_message_to_lead(str(lead.id), ai_response, "assistant", tenant_id)
         logger.info("Messages added.")
         
-        # Update intent if needed
-        if intent in ["HOT", "WARM", "COLD"]:
-            logger.info("Updating lead intent...")
-            from app.constants.enums import LeadIntent
-            intent_map = {
-                "HOT": LeadIntent.HOT,
-                "WARM": LeadIntent.WARM,
-                "COLD": LeadIntent.COLD
-            }
-            await lead_service.update_lead_intent(str(lead.id), intent_map.get(intent, LeadIntent.COLD), tenant_id)
-            logger.info("Lead intent updated.")
-        
         # Send the response back to the user via Facebook Messenger
         await send_messenger_response(sender_id, ai_response)
         
+        # Update intent once detected; it never holds up the reply
+        intent = await lead_service.apply_detected_intent(str(lead.id), intent_result, tenant_id)
+        logger.info(f"Intent detected: {intent}")
+
+        # Fold older messages into the rolling summary used by the next prompts
+        await lead_service.refresh_conversation_summary(str(lead.id), tenant_id, ai_service.summarize_conversation)
+        
     except Exception as e:
         logger.error(f"Error processing Messenger message: {e}", exc_info=True)
 
@@ -1,47 +1,191 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from typing import List, Optional
+import asyncio
 import logging
 
-from app.services.product_search.product_search_service import ProductSearchService
-from app.schemas.product_search import ProductSearchRequest, ProductSearchResponse, Product
+from app.models.user import User
+from app.services.product_search.catalog_upload import CatalogValidationError
+from app.services.product_search.product_search_service import get_product_search_service
+from app.services.product_search.search_pool import SearchQueueFullError
+from app.utils.responses import RawJSONResponse
+from app.utils.security import get_current_user
+from app.schemas.product_search import (
+    ProductSearchRequest, ProductSearchResponse, Product, SuggestionResponse,
+    ProductBatchSearchRequest, ProductBatchSearchResponse,
+    CatalogUploadResponse, CatalogDeltaRequest, CatalogDeltaResponse
+)
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 # Initialize the product search service
-product_search_service = ProductSearchService()
+product_search_service = get_product_search_service()
 
-@router.post("/search", response_model=ProductSearchResponse)
+@router.post("/search", response_model=ProductSearchResponse, response_class=RawJSONResponse)
 async def search_products(
     search_request: ProductSearchRequest
 ):
     """
-    Search for products based on query string.
+    Search for products based on query string, optionally filtered by price
+    range, stock, brand, category and featured flag.
     Requires tenant_id to ensure multi-tenant isolation.
     """
     try:
         logger.info(f"Searching products for tenant: {search_request.tenant_id} with query: {search_request.query}")
         
-        # Perform the search
-        products = product_search_service.search_products(
+        # Perform the search on the worker pool; products come back as JSON
+        # serialized once per catalog version
+        result = await product_search_service.search_async(
             tenant_id=search_request.tenant_id,
             query=search_request.query,
-            limit=search_request.limit
+            limit=search_request.limit,
+            min_price=search_request.min_price,
+            max_price=search_request.max_price,
+            in_stock=search_request.in_stock,
+            brand=search_request.brand,
+            category=search_request.category,
+            featured=search_request.featured,
+            sort=search_request.sort,
+            include_facets=search_request.include_facets,
+            mode=search_request.mode,
+            projection=search_request.projection
         )
         
-        # Convert to response format
-        product_models = [Product(**product) for product in products]
-        
-        return ProductSearchResponse(
-            products=product_models,
-            total=len(product_models),
-            query=search_request.query
-        )
+        return RawJSONResponse({
+            "products": result["products"],
+            "total": len(result["products"]),
+            "query": search_request.query,
+            "total_matches": result["total"],
+            "facets": result["facets"],
+        })
+    except SearchQueueFullError as e:
+        logger.warning(f"Rejected search for tenant {search_request.tenant_id}: {e}")
+        raise HTTPException(status_code=503, detail="Product search is busy, please retry shortly")
     except Exception as e:
         logger.error(f"Error searching products: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error searching products: {str(e)}")
 
 
+@router.post("/batch", response_model=ProductBatchSearchResponse, response_class=RawJSONResponse)
+async def batch_search_products(
+    batch_request: ProductBatchSearchRequest
+):
+    """
+    Run several searches for one tenant in a single request.
+    Duplicate queries are answered once; results are keyed by query.
+    Requires tenant_id to ensure multi-tenant isolation.
+    """
+    try:
+        logger.info(f"Batch searching {len(batch_request.queries)} queries for tenant: {batch_request.tenant_id}")
+        
+        results = await product_search_service.search_batch_async(
+            tenant_id=batch_request.tenant_id,
+            queries=batch_request.queries,
+            limit=batch_request.limit,
+            mode=batch_request.mode,
+            projection=batch_request.projection
+        )
+        
+        return RawJSONResponse({"results": {
+            query: {
+                "products": result["products"],
+                "total": len(result["products"]),
+                "total_matches": result["total"],
+            }
+            for query, result in results.items()
+        }})
+    except SearchQueueFullError as e:
+        logger.warning(f"Rejected batch search for tenant {batch_request.tenant_id}: {e}")
+        raise HTTPException(status_code=503, detail="Product search is busy, please retry shortly")
+    except Exception as e:
+        logger.error(f"Error batch searching products: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error batch searching products: {str(e)}")
+
+
+@router.get("/suggest", response_model=SuggestionResponse)
+async def suggest_products(
+    tenant_id: str,
+    prefix: str,
+    limit: int = Query(default=10, ge=1, le=20)
+):
+    """
+    Suggest product names and categories as the customer types.
+    Requires tenant_id to ensure multi-tenant isolation.
+    """
+    try:
+        # Loading a cold catalog and building its prefix index run on the worker pool
+        suggestions = await product_search_service.suggest_async(
+            tenant_id=tenant_id,
+            prefix=prefix,
+            limit=limit
+        )
+        return SuggestionResponse(prefix=prefix, suggestions=suggestions)
+    except SearchQueueFullError as e:
+        logger.warning(f"Rejected suggestions for tenant {tenant_id}: {e}")
+        raise HTTPException(status_code=503, detail="Product search is busy, please retry shortly")
+    except Exception as e:
+        logger.error(f"Error suggesting products for prefix {prefix!r}: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error suggesting products: {str(e)}")
+
+
+@router.put("/catalog/{tenant_id}", response_model=CatalogUploadResponse)
+async def upload_catalog(
+    tenant_id: str,
+    request: Request,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Replace a tenant's catalog with the JSON array of products in the request body.
+    The body is parsed, validated and indexed as it streams in; the new
+    catalog is published only if every product is valid.
+    """
+    try:
+        upload = product_search_service.start_catalog_upload(tenant_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        async for chunk in request.stream():
+            if chunk:
+                await asyncio.to_thread(upload.feed, chunk)
+        return await asyncio.to_thread(upload.finish)
+    except CatalogValidationError as e:
+        raise HTTPException(status_code=422, detail={"message": str(e), "products": e.errors})
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid catalog: {str(e)}")
+    except Exception as e:
+        logger.error(f"Error uploading catalog for tenant {tenant_id}: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error uploading catalog: {str(e)}")
+    finally:
+        upload.close()
+
+
+@router.patch("/catalog/{tenant_id}", response_model=CatalogDeltaResponse)
+async def update_catalog(
+    tenant_id: str,
+    delta: CatalogDeltaRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Add, replace or delete products of a tenant's catalog by SKU.
+    Unchanged products are reused from the current catalog, so small edits
+    do not rebuild it.
+    """
+    try:
+        return await asyncio.to_thread(
+            product_search_service.update_catalog,
+            tenant_id,
+            delta.upsert,
+            delta.delete
+        )
+    except CatalogValidationError as e:
+        raise HTTPException(status_code=422, detail={"message": str(e), "products": e.errors})
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error updating catalog for tenant {tenant_id}: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error updating catalog: {str(e)}")
+
+
 @router.get("/product/{product_id}", response_model=Product)
 async def get_product_by_id(
     tenant_id: str,
@@ -129,4 +273,12 @@ async def search_products_by_brand(
         )
     except Exception as e:
         logger.error(f"Error searching products by brand {brand}: {e}", exc_info=True)
-        raise HTTPException(status_code=500, detail=f"Error searching products by brand: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error searching products by brand: {str(e)}")
+
+
+@router.get("/stats")
+async def get_product_search_stats():
+    """
+    Get catalog store, search result cache, ranking and worker pool counters.
+    """
+    return product_search_service.get_stats()
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 
 class Settings(BaseSettings):
@@ -18,11 +18,54 @@ class Settings(BaseSettings):
     GOOGLE_SHEETS_SPREADSHEET_ID: Optional[str] = None
 
     # AI settings
-    AI_PROVIDER: str = "gemini"  # openai, openrouter, gemini
+    AI_PROVIDER: str = "gemini"  # openai, openrouter, gemini, local
     OPENAI_API_KEY: Optional[str] = None
     OPENROUTER_API_KEY: Optional[str] = None
     GEMINI_API_KEY: Optional[str] = None
     AI_MODEL: str = "gemini-2.5-flash"
+    AI_COMBINED_RESPONSE: bool = True  # reply and intent from one structured LLM call, two calls as fallback
+    AI_REPLY_TIMEOUT_SECONDS: float = 20.0
+    AI_INTENT_TIMEOUT_SECONDS: float = 10.0  # on timeout the lead's intent is left unchanged
+    AI_BASE_URL: Optional[str] = None  # override the provider's API root, e.g. a local OpenAI-compatible server
+    AI_TENANT_PROVIDERS: Dict[str, Dict[str, str]] = {}  # per tenant: provider, model, base_url, api_key
+    AI_GEMINI_THINKING_BUDGET: Optional[int] = 0  # 0 disables thinking for short replies; unset for the model default
+    AI_STUB_LATENCY_MS: float = 0.0  # delay added by the "local" stub provider
+    AI_HTTP_MAX_CONNECTIONS: int = 100  # pooled keep-alive connections per provider endpoint
+    AI_HTTP_TIMEOUT_SECONDS: float = 30.0
+    AI_RESPONSE_CACHE_TENANTS: List[str] = []  # tenants whose LLM responses are cached; ["*"] for all
+    AI_RESPONSE_CACHE_SIZE: int = 512  # cached responses per tenant
+    AI_RESPONSE_CACHE_TTL_SECONDS: float = 3600.0
+    AI_RESPONSE_CACHE_HISTORY_TURNS: int = 2  # recent messages that must match for a hit
+    AI_PROMPT_MAX_TOKENS: int = 1500  # token budget of a reply prompt (0 for no limit)
+    AI_PROMPT_RECENT_MESSAGES: int = 6  # latest messages always kept verbatim; older ones are summarized
+    AI_SUMMARY_BATCH_MESSAGES: int = 4  # summarize once this many messages left the verbatim window
+    AI_SUMMARY_MAX_TOKENS: int = 200
+    AI_MAX_CONCURRENCY: int = 64  # ceiling of the adaptive limit on LLM calls in flight (0 disables admission control)
+    AI_MIN_CONCURRENCY: int = 2
+    AI_INITIAL_CONCURRENCY: int = 8
+    AI_TARGET_LATENCY_SECONDS: float = 5.0  # slower calls shrink the concurrency limit
+    AI_QUEUE_TIMEOUT_SECONDS: float = 10.0  # calls waiting longer for admission are dropped
+    AI_TENANT_RATE_PER_SECOND: float = 5.0  # LLM calls each tenant may start per second, at weight 1
+    AI_TENANT_BURST: float = 20.0
+    AI_TENANT_WEIGHTS: Dict[str, float] = {}  # tenant id -> weight scaling its rate and burst
+    AI_INTENT_MODEL_PATH: Optional[str] = "tenant_data/intent_model.json"  # from app.services.intent.train; seed examples if missing
+    AI_INTENT_LOCAL_CONFIDENCE: float = 0.9  # local intent predictions below this go to the LLM (above 1 always does)
+
+    # Product search settings
+    PRODUCT_CATALOG_DIR: str = "data_center"
+    PRODUCT_CATALOG_MEMORY_BUDGET_MB: int = 512  # 0 disables eviction
+    PRODUCT_CATALOG_PREWARM_TENANTS: List[str] = []
+    PRODUCT_CATALOG_RELOAD_INTERVAL_SECONDS: float = 5.0  # 0 disables hot reload
+    PRODUCT_CATALOG_COMPILE_ON_LOAD: bool = False  # write a shared mmap'd .pscat next to each catalog JSON
+    PRODUCT_SEARCH_CACHE_SIZE: int = 1024  # cached searches per tenant, 0 disables
+    PRODUCT_SEARCH_CACHE_TTL_SECONDS: float = 300.0
+    PRODUCT_SEARCH_HYBRID_ALPHA: float = 0.5  # BM25 weight when blending with TF-IDF similarity
+    PRODUCT_SEARCH_SPELLING_CORRECTION: bool = True
+    PRODUCT_SEARCH_SYNONYMS: Dict[str, List[str]] = {}  # applied to every tenant, e.g. {"spf": ["sunscreen"]}
+    PRODUCT_SEARCH_SYNONYMS_DIR: Optional[str] = None  # per-tenant <tenant_id>.json files, default <catalog dir>/synonyms
+    PRODUCT_SEARCH_WORKERS: int = 4  # threads running searches off the event loop
+    PRODUCT_SEARCH_MAX_QUEUE_DEPTH: int = 256  # waiting searches before new ones get 503
+    PRODUCT_SEARCH_MAX_QUEUE_PER_TENANT: int = 64
 
     # WhatsApp settings
     WHATSAPP_WEBHOOK_VERIFY_TOKEN: str
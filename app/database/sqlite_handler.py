@@ -17,6 +17,9 @@ DB_DIR = "tenant_data"
 if not os.path.exists(DB_DIR):
     os.makedirs(DB_DIR)
 
+# Database files whose columns are known to be up to date in this process
+_migrated_paths = set()
+
 def get_db_path(tenant_id: str) -> str:
     """Constructs the path to the tenant's database file."""
     return os.path.join(DB_DIR, f"{tenant_id}.db")
@@ -33,6 +36,9 @@ async def get_db_connection(tenant_id: str):
         conn = await aiosqlite.connect(db_path)
         # Ensure tables exist on every connection. `IF NOT EXISTS` is cheap.
         await create_tables(conn)
+        if db_path not in _migrated_paths:
+            await migrate_tables(conn)
+            _migrated_paths.add(db_path)
         conn.row_factory = aiosqlite.Row
         yield conn
     except aiosqlite.Error as e:
@@ -67,7 +73,9 @@ async def create_tables(conn: aiosqlite.Connection):
         intent TEXT NOT NULL,
         created_at TEXT NOT NULL,
         updated_at TEXT NOT NULL,
-        facebook_id TEXT UNIQUE
+        facebook_id TEXT UNIQUE,
+        summary TEXT,
+        summary_message_count INTEGER NOT NULL DEFAULT 0
     );
     """)
     await conn.execute("""
@@ -87,6 +95,25 @@ async def create_tables(conn: aiosqlite.Connection):
     await conn.commit()
     logger.info("Tables created or verified successfully.")
 
+async def migrate_tables(conn: aiosqlite.Connection):
+    """Adds columns that databases created by earlier versions lack. Run once per database file."""
+    # Databases created before conversation summaries lack their columns.
+    cursor = await conn.execute("PRAGMA table_info(leads)")
+    lead_columns = {row[1] for row in await cursor.fetchall()}
+    for column, definition in (
+        ("summary", "TEXT"),
+        ("summary_message_count", "INTEGER NOT NULL DEFAULT 0"),
+    ):
+        if column in lead_columns:
+            continue
+        try:
+            await conn.execute(f"ALTER TABLE leads ADD COLUMN {column} {definition}")
+        except aiosqlite.OperationalError as e:
+            # Another connection added it first.
+            if "duplicate column" not in str(e):
+                raise
+    await conn.commit()
+
 def _row_to_dict(row: aiosqlite.Row) -> Dict[str, Any]:
     """Converts a aiosqlite.Row object to a dictionary."""
     return dict(row) if row else None
@@ -165,6 +192,21 @@ async def update_lead_intent(tenant_id: str, lead_id: str, intent: LeadIntent) -
         await conn.commit()
         return await fetch_lead_and_messages(conn, lead_id)
 
+async def update_lead_summary(
+    tenant_id: str,
+    lead_id: str,
+    summary: str,
+    message_count: int
+) -> Optional[Dict[str, Any]]:
+    """Stores a lead's rolling conversation summary, unless a newer one is already stored."""
+    async with get_db_connection(tenant_id) as conn:
+        await conn.execute(
+            "UPDATE leads SET summary = ?, summary_message_count = ? WHERE id = ? AND summary_message_count < ?",
+            (summary, message_count, lead_id, message_count)
+        )
+        await conn.commit()
+        return await fetch_lead_and_messages(conn, lead_id)
+
 async def get_all_leads(tenant_id: str) -> List[Dict[str, Any]]:
     """Gets all leads for a tenant."""
     async with get_db_connection(tenant_id) as conn:
@@ -177,6 +219,12 @@ async def get_all_leads(tenant_id: str) -> List[Dict[str, Any]]:
             if lead:
                 leads.append(lead)
         return leads
+
+async def get_all_messages(tenant_id: str) -> List[Dict[str, Any]]:
+    """Gets every message of a tenant, grouped by lead in conversation order."""
+    async with get_db_connection(tenant_id) as conn:
+        cursor = await conn.execute("SELECT * FROM messages ORDER BY lead_id, timestamp ASC, id ASC")
+        return [_row_to_dict(row) for row in await cursor.fetchall()]
 # ... (existing functions) ...
 
 # User Management Functions
@@ -3,6 +3,7 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.v1 import webhook, chat, lead, analytics, auth, messenger, product_search # Import auth and messenger routers
 from app.config.settings import settings
+from app.services.llm import close_http_clients
 
 
 app = FastAPI(
@@ -29,6 +30,10 @@ app.include_router(auth.router, prefix=settings.API_V1_STR + "/auth", tags=["aut
 app.include_router(messenger.router, prefix=settings.API_V1_STR + "/messenger", tags=["messenger"]) # Add messenger router
 app.include_router(product_search.router, prefix=settings.API_V1_STR + "/product_search", tags=["product_search"]) # Add product search router
 
+@app.on_event("shutdown")
+async def shutdown():
+    await close_http_clients()
+
 @app.get("/")
 async def root():
     return {"message": "AI Lead Capture & Automation System is running!"}
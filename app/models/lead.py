@@ -27,6 +27,8 @@ class LeadBase(BaseModel):
 class Lead(LeadBase):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     messages: List[Message] = []
+    summary: Optional[str] = None  # Rolling summary of the oldest messages
+    summary_message_count: int = 0  # Messages covered by the summary
 
 
 class LeadCreate(BaseModel):
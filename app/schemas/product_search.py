@@ -1,12 +1,23 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Any, Dict, List, Literal, Optional, Union
 from app.models.lead import Message  # Reusing the Message model if needed
 
 
 class ProductSearchRequest(BaseModel):
-    query: str
+    query: str = ""
     tenant_id: str
     limit: int = 10
+    # Facet filters
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+    in_stock: Optional[bool] = None
+    brand: Optional[str] = None
+    category: Optional[str] = None
+    featured: Optional[bool] = None
+    sort: Literal["relevance", "price_asc", "price_desc"] = "relevance"
+    include_facets: bool = False
+    mode: Literal["lexical", "vector", "hybrid"] = "lexical"
+    projection: Literal["full", "slim"] = "full"  # "slim" returns only customer-facing fields
 
 
 class Product(BaseModel):
@@ -45,7 +56,73 @@ class Product(BaseModel):
     # Include other fields as needed based on your JSON structure
 
 
+# Customer-facing product fields, returned by the "slim" projection
+class ProductSummary(BaseModel):
+    ID: int
+    SKU: Optional[str] = Field(default=None, alias="SKU")
+    Name: str = Field(alias="Name")
+    Short_description: Optional[str] = Field(default=None, alias="Short description")
+    Is_featured: Optional[int] = Field(default=0, alias="Is featured?")
+    In_stock: Optional[int] = Field(default=None, alias="In stock?")
+    Sale_price: Optional[int] = Field(default=None, alias="Sale price")
+    Regular_price: Optional[int] = Field(default=None, alias="Regular price")
+    Categories: Optional[str] = Field(default=None, alias="Categories")
+    Images: Optional[str] = Field(default=None, alias="Images")
+    Brand: Optional[str] = Field(default=None, alias="Brand")
+
+
 class ProductSearchResponse(BaseModel):
-    products: List[Product]
+    products: List[Union[Product, ProductSummary]]
+    total: int
+    query: str
+    total_matches: Optional[int] = None  # Matches before the limit was applied
+    facets: Optional[Dict[str, Any]] = None
+
+
+class ProductBatchSearchRequest(BaseModel):
+    tenant_id: str
+    queries: List[str] = Field(min_length=1, max_length=50)
+    limit: int = 10
+    mode: Literal["lexical", "vector", "hybrid"] = "lexical"
+    projection: Literal["full", "slim"] = "full"
+
+
+class ProductBatchSearchResult(BaseModel):
+    products: List[Union[Product, ProductSummary]]
     total: int
-    query: str
\ No newline at end of file
+    total_matches: int
+
+
+class ProductBatchSearchResponse(BaseModel):
+    results: Dict[str, ProductBatchSearchResult]  # Keyed by the query as sent
+
+
+class Suggestion(BaseModel):
+    text: str
+    type: Literal["product", "category"]
+    product_id: Optional[str] = None  # Set for product suggestions
+
+
+class SuggestionResponse(BaseModel):
+    prefix: str
+    suggestions: List[Suggestion]
+
+
+class CatalogUploadResponse(BaseModel):
+    tenant_id: str
+    products: int
+    version: int
+    build_seconds: float
+
+
+# SKU-keyed catalog edit: upserted products replace those with the same SKU
+class CatalogDeltaRequest(BaseModel):
+    upsert: List[Dict[str, Any]] = Field(default_factory=list, max_length=10000)
+    delete: List[str] = Field(default_factory=list, max_length=10000)
+
+
+class CatalogDeltaResponse(CatalogUploadResponse):
+    added: int
+    updated: int
+    deleted: int
+    not_found: List[str]
@@ -1,17 +1,448 @@
-import openai
-import os
-from typing import List, Dict, Any
+import asyncio
+import hashlib
+import json
+import logging
+import re
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple
 from app.config.settings import settings
-from app.models.lead import Message
-from app.services.product_search.product_search_service import ProductSearchService
+from app.models.lead import Lead, Message
+from app.services.intent import analyze_message, get_intent_classifier
+from app.services.llm import LLMProvider, get_llm_provider
+from app.services.llm.admission import get_llm_admission_controller
+from app.services.llm.prompt_builder import PromptBuilder
+from app.services.llm.response_cache import get_llm_response_cache
+from app.services.llm.singleflight import get_llm_singleflight, request_key
+from app.services.llm.tokens import count_message_tokens, count_tokens
+from app.services.product_search.product_search_service import get_product_search_service
+from app.services.product_search.search_pool import SearchQueueFullError
+
+logger = logging.getLogger(__name__)
+
+INTENTS = ("HOT", "WARM", "COLD", "NEUTRAL")
+
+SALES_ASSISTANT_PROMPT = (
+    "You are a sales assistant for an online store. "
+    "Be short, friendly, persuasive. "
+    "Ask only ONE question at a time. "
+    "Collect name, product interest, and contact info. "
+    "If user shows buying intent, mark as HOT."
+)
+
+# Appended to the sales prompt when the reply and intent come from one call
+COMBINED_RESPONSE_INSTRUCTIONS = (
+    " Respond with a JSON object only, in the form "
+    '{"reply": "<your message to the customer>", "intent": "<HOT, WARM, COLD or NEUTRAL>"}, '
+    "where intent is the customer's buying intent so far."
+)
+
+CONVERSATION_SUMMARY_PROMPT = (
+    "You keep a running summary of a sales conversation for the store's assistant. "
+    "Update the current summary with the new messages. Keep the customer's name, contact "
+    "details, products of interest, budget, objections and open questions. "
+    "Reply with the updated summary only, in at most 120 words."
+)
+
+INTENT_CLASSIFIER_PROMPT = "You are an intent classifier. Respond with only one word: HOT, WARM, COLD, or NEUTRAL."
+
+# Part of every response cache key, so editing a prompt retires the cached responses
+PROMPT_VERSION = hashlib.sha1(
+    (SALES_ASSISTANT_PROMPT + COMBINED_RESPONSE_INSTRUCTIONS + INTENT_CLASSIFIER_PROMPT).encode("utf-8")
+).hexdigest()[:12]
+
+REPLY_FALLBACK = "I'm having trouble responding right now. Could you please try again?"
+# Least reply time worth starting a fallback reply call with; below it the reply is REPLY_FALLBACK
+MIN_FALLBACK_REPLY_SECONDS = 1.0
+# Reply when no LLM provider is configured
+NO_PROVIDER_REPLY = "I'm here to help! Could you tell me more about what you're looking for?"
+
+_INTENT_PATTERN = re.compile(r"\b(" + "|".join(INTENTS) + r")\b")
+_JSON_OBJECT_PATTERN = re.compile(r"\{.*\}", re.DOTALL)
+
+
+def normalize_intent(text: str) -> Optional[str]:
+    """
+    Extract an intent label from model output.
+
+    Args:
+        text: Raw model output, e.g. "HOT", "Intent: warm." or "cold"
+
+    Returns:
+        The first of ``INTENTS`` mentioned, or None if there is none
+    """
+    match = _INTENT_PATTERN.search(text.upper())
+    return match.group(1) if match else None
+
+
+def parse_reply_and_intent(content: str) -> Optional[Tuple[str, Optional[str]]]:
+    """
+    Parse the structured output of a combined reply and intent call.
+
+    Accepts a bare JSON object as well as one wrapped in a markdown code
+    fence or surrounded by prose, which models produce despite instructions.
+
+    Args:
+        content: Raw model output
+
+    Returns:
+        ``(reply, intent)`` where intent is None if missing or unrecognized,
+        or None if no reply could be found
+    """
+    text = content.strip()
+    candidates = [text]
+    match = _JSON_OBJECT_PATTERN.search(text)
+    if match and match.group(0) != text:
+        candidates.append(match.group(0))
+    for candidate in candidates:
+        try:
+            data = json.loads(candidate)
+        except ValueError:
+            continue
+        if not isinstance(data, dict):
+            continue
+        reply = data.get("reply") or data.get("response")
+        if isinstance(reply, str) and reply.strip():
+            return reply.strip(), normalize_intent(str(data.get("intent") or ""))
+    return None
+
+
+def _call_tokens(messages: List[Dict[str, str]], completion: str) -> int:
+    """Estimated prompt and completion tokens of a call, credited to the cache on hits."""
+    return count_message_tokens(messages) + count_tokens(completion)
 
 
 class AIService:
     def __init__(self):
-        if settings.AI_PROVIDER == "openai":
-            openai.api_key = settings.OPENAI_API_KEY
-        # Additional providers can be initialized here
-        self.product_search_service = ProductSearchService()
+        self.product_search_service = get_product_search_service()
+        self.response_cache = get_llm_response_cache()
+        self.admission = get_llm_admission_controller()
+        self.singleflight = get_llm_singleflight()
+        self.intent_classifier = get_intent_classifier()
+        self.prompt_builder = PromptBuilder(
+            max_prompt_tokens=settings.AI_PROMPT_MAX_TOKENS,
+            max_history_messages=settings.AI_PROMPT_RECENT_MESSAGES + settings.AI_SUMMARY_BATCH_MESSAGES
+        )
+        # Turns answered by the combined call vs. turns that fell back to two calls
+        self.response_stats = {"combined": 0, "combined_fallback": 0}
+        # Intent detections still running after their reply was returned
+        self._pending_intents = set()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Return response generation counters.
+
+        Returns:
+            This service's combined-call counters, the shared response cache's
+            hit rate and estimated tokens saved, the LLM admission controller's
+            concurrency limit and queue counters, how many calls joined an
+            identical call in flight, and how many intents the local classifier
+            settled without the LLM
+        """
+        return {
+            "responses": dict(self.response_stats),
+            "response_cache": self.response_cache.stats(),
+            "admission": self.admission.stats(),
+            "coalescing": self.singleflight.stats(),
+            "intent_classifier": self.intent_classifier.stats(),
+        }
+
+    async def respond(
+        self,
+        user_message: str,
+        conversation_history: List[Message],
+        user_context: Dict[str, Any] = None
+    ) -> Tuple[str, str]:
+        """
+        Generate the reply to a message and classify the customer's intent.
+
+        Waits for both; see ``respond_first`` for a reply that does not wait
+        for the intent.
+
+        Args:
+            user_message: The customer's message
+            conversation_history: Earlier messages of the conversation
+            user_context: Optional context: ``tenant_id``, and the lead's rolling
+                ``conversation_summary`` with the number of ``summarized_messages``
+
+        Returns:
+            ``(reply, intent)``
+        """
+        reply, intent = await self.respond_first(user_message, conversation_history, user_context)
+        return reply, await intent
+
+    async def respond_first(
+        self,
+        user_message: str,
+        conversation_history: List[Message],
+        user_context: Dict[str, Any] = None
+    ) -> Tuple[str, "asyncio.Future[str]"]:
+        """
+        Generate the reply to a message while its intent is classified alongside.
+
+        With ``AI_COMBINED_RESPONSE`` the reply and intent come from a single
+        structured-output call. Otherwise, and whenever product search answers
+        the message, the provider cannot make the combined call or its output
+        cannot be parsed, ``detect_intent`` runs concurrently with reply
+        generation. The reply, including a fallback after a failed combined
+        call, must be ready within ``AI_REPLY_TIMEOUT_SECONDS`` of the call;
+        intent detection has its own ``AI_INTENT_TIMEOUT_SECONDS``. A stage
+        that runs out is cancelled, so a slow intent call never delays the
+        reply: the returned future may still be pending.
+
+        Args:
+            user_message: The customer's message
+            conversation_history: Earlier messages of the conversation
+            user_context: Optional context: ``tenant_id``, and the lead's rolling
+                ``conversation_summary`` with the number of ``summarized_messages``
+
+        Returns:
+            ``(reply, intent)`` where intent is a future resolving to the label;
+            it never raises and resolves to NEUTRAL if detection times out or fails
+        """
+        reply, generation = None, None
+        tenant_id = user_context.get('tenant_id') if user_context else None
+        conversation_history, summary = self._unsummarized(conversation_history, user_context)
+        # One reply deadline, shared by the combined call and its two-call fallback
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.AI_REPLY_TIMEOUT_SECONDS
+        if settings.AI_COMBINED_RESPONSE:
+            reply = await self._handle_product_search(user_message, tenant_id)
+            if reply is None:
+                try:
+                    combined = await asyncio.wait_for(
+                        self._generate_combined_response(user_message, conversation_history, tenant_id, summary),
+                        max(0.0, deadline - loop.time())
+                    )
+                except asyncio.TimeoutError:
+                    logger.warning(f"Reply generation timed out after {settings.AI_REPLY_TIMEOUT_SECONDS}s")
+                    return REPLY_FALLBACK, self._start_intent_detection(user_message, conversation_history, tenant_id)
+                if combined is not None:
+                    reply, intent = combined
+                    if intent is None:
+                        return reply, self._start_intent_detection(user_message, conversation_history, tenant_id)
+                    resolved = loop.create_future()
+                    resolved.set_result(intent)
+                    return reply, resolved
+                if deadline - loop.time() < MIN_FALLBACK_REPLY_SECONDS:
+                    logger.warning("No time left for a fallback reply after the combined call failed")
+                    return REPLY_FALLBACK, self._start_intent_detection(user_message, conversation_history, tenant_id)
+                generation = self._generate_reply(user_message, conversation_history, tenant_id, summary)
+        else:
+            # The history is already cut down to the unsummarized messages.
+            generation = self._search_or_reply(user_message, conversation_history, tenant_id, summary)
+
+        intent = self._start_intent_detection(user_message, conversation_history, tenant_id)
+        if reply is None:
+            try:
+                reply = await asyncio.wait_for(generation, max(0.0, deadline - loop.time()))
+            except asyncio.TimeoutError:
+                logger.warning(f"Reply generation timed out after {settings.AI_REPLY_TIMEOUT_SECONDS}s")
+                reply = REPLY_FALLBACK
+        return reply, intent
+
+    def respond_stream(
+        self,
+        user_message: str,
+        conversation_history: List[Message],
+        user_context: Dict[str, Any] = None
+    ) -> Tuple[AsyncIterator[str], "asyncio.Future[str]"]:
+        """
+        Stream the reply to a message while its intent is classified alongside.
+
+        Text is forwarded as the provider produces it, so the customer sees
+        the reply start after the time to first token rather than after the
+        whole completion. Product search answers arrive as a single chunk. If
+        the provider sends nothing for ``AI_REPLY_TIMEOUT_SECONDS`` the stream
+        ends, with ``REPLY_FALLBACK`` if nothing was sent yet.
+
+        Args:
+            user_message: The customer's message
+            conversation_history: Earlier messages of the conversation
+            user_context: Optional context: ``tenant_id``, and the lead's rolling
+                ``conversation_summary`` with the number of ``summarized_messages``
+
+        Returns:
+            ``(chunks, intent)``: an async iterator over the reply text and a
+            future resolving to the intent label, as in ``respond_first``
+        """
+        tenant_id = user_context.get('tenant_id') if user_context else None
+        conversation_history, summary = self._unsummarized(conversation_history, user_context)
+        intent = self._start_intent_detection(user_message, conversation_history, tenant_id)
+        return self._stream_reply(user_message, conversation_history, tenant_id, summary), intent
+
+    async def _stream_reply(
+        self,
+        user_message: str,
+        conversation_history: List[Message],
+        tenant_id: Optional[str],
+        summary: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        reply = await self._handle_product_search(user_message, tenant_id)
+        if reply is not None:
+            yield reply
+            return
+        provider = get_llm_provider(tenant_id)
+        if provider is None:
+            yield NO_PROVIDER_REPLY
+            return
+        # Shares entries with _generate_reply: same prompt and parameters
+        cache_key = self._cache_key("reply", provider, user_message, conversation_history, summary)
+        cached = self.response_cache.get(tenant_id, cache_key)
+        if cached is not None:
+            yield cached
+            return
+
+        messages = self._build_messages(user_message, conversation_history, SALES_ASSISTANT_PROMPT, summary)
+        parts = []
+        sent = False
+        try:
+            async with self.admission.admit(tenant_id) as admission:
+                chunks = provider.stream(messages, max_tokens=150, temperature=0.7)
+                try:
+                    while True:
+                        try:
+                            chunk = await asyncio.wait_for(chunks.__anext__(), settings.AI_REPLY_TIMEOUT_SECONDS)
+                        except StopAsyncIteration:
+                            content = "".join(parts)
+                            if content.strip():
+                                self.response_cache.put(
+                                    tenant_id, cache_key, content.strip(), _call_tokens(messages, content)
+                                )
+                            break
+                        admission.responded()
+                        sent = True
+                        parts.append(chunk)
+                        yield chunk
+                finally:
+                    await chunks.aclose()
+        except asyncio.TimeoutError:
+            logger.warning(f"Reply stream from {provider.name} stalled for {settings.AI_REPLY_TIMEOUT_SECONDS}s")
+        except Exception as e:
+            logger.error(f"Error streaming AI response with {provider.name}: {e}")
+        if not sent:
+            yield REPLY_FALLBACK
+
+    def _start_intent_detection(
+        self,
+        message: str,
+        conversation_history: List[Message],
+        tenant_id: Optional[str] = None
+    ) -> "asyncio.Task[str]":
+        """Run ``detect_intent`` as a task bounded by ``AI_INTENT_TIMEOUT_SECONDS``; errors resolve to NEUTRAL."""
+        async def detect() -> str:
+            try:
+                return await asyncio.wait_for(
+                    self.detect_intent(message, conversation_history, tenant_id),
+                    settings.AI_INTENT_TIMEOUT_SECONDS
+                )
+            except asyncio.TimeoutError:
+                logger.warning(f"Intent detection timed out after {settings.AI_INTENT_TIMEOUT_SECONDS}s")
+                return "NEUTRAL"
+            except Exception as e:
+                # e.g. a misconfigured tenant provider; the reply must not fail with it
+                logger.error(f"Intent detection failed: {e}", exc_info=True)
+                return "NEUTRAL"
+
+        task = asyncio.create_task(detect())
+        # Keep a reference until it finishes; callers may not await it.
+        self._pending_intents.add(task)
+        task.add_done_callback(self._pending_intents.discard)
+        return task
+
+    def _build_messages(
+        self,
+        user_message: str,
+        conversation_history: List[Message],
+        system_prompt: str,
+        summary: Optional[str] = None
+    ) -> List[Dict[str, str]]:
+        """Assemble the chat messages within the prompt token budget; see ``PromptBuilder``."""
+        return self.prompt_builder.build(system_prompt, conversation_history, user_message, summary)
+
+    @staticmethod
+    def _unsummarized(
+        conversation_history: List[Message],
+        user_context: Optional[Dict[str, Any]]
+    ) -> Tuple[List[Message], Optional[str]]:
+        """Split off the messages covered by the lead's rolling summary, passed in ``user_context``."""
+        summary = user_context.get("conversation_summary") if user_context else None
+        if not summary:
+            return conversation_history, None
+        return conversation_history[user_context.get("summarized_messages", 0):], summary
+
+    async def _generate_combined_response(
+        self,
+        user_message: str,
+        conversation_history: List[Message],
+        tenant_id: Optional[str] = None,
+        summary: Optional[str] = None
+    ) -> Optional[Tuple[str, Optional[str]]]:
+        """
+        Ask the model for the reply and the intent in one JSON-formatted call.
+
+        Returns:
+            ``(reply, intent)`` as parsed by ``parse_reply_and_intent``, or None
+            if no provider is configured, the call failed or no reply was parsed
+        """
+        provider = get_llm_provider(tenant_id)
+        if provider is None:
+            return None
+        cache_key = self._cache_key("combined", provider, user_message, conversation_history, summary)
+        cached = self.response_cache.get(tenant_id, cache_key)
+        if cached is not None:
+            return cached
+        messages = self._build_messages(
+            user_message, conversation_history, SALES_ASSISTANT_PROMPT + COMBINED_RESPONSE_INSTRUCTIONS, summary
+        )
+        try:
+            content = await self._complete(provider, tenant_id, messages, max_tokens=200, temperature=0.7, json_mode=True)
+        except Exception as e:
+            logger.warning(f"Combined reply and intent call failed, falling back to two calls: {e}")
+            self.response_stats["combined_fallback"] += 1
+            return None
+        parsed = parse_reply_and_intent(content)
+        if parsed is None:
+            logger.warning(f"Could not parse combined reply and intent, falling back to two calls: {content[:200]!r}")
+            self.response_stats["combined_fallback"] += 1
+        else:
+            self.response_stats["combined"] += 1
+            self.response_cache.put(tenant_id, cache_key, parsed, _call_tokens(messages, content))
+        return parsed
+
+    async def _complete(
+        self,
+        provider: LLMProvider,
+        tenant_id: Optional[str],
+        messages: List[Dict[str, str]],
+        **kwargs
+    ) -> str:
+        """
+        Call a provider once admission control lets the tenant's call through.
+
+        Identical requests already in flight are joined rather than sent again,
+        so duplicate webhook deliveries and bursts of the same question share
+        one call (and one admission slot).
+        """
+        async def call() -> str:
+            async with self.admission.admit(tenant_id):
+                return await provider.complete(messages, **kwargs)
+
+        return await self.singleflight.do(request_key(provider, messages, **kwargs), call)
+
+    def _cache_key(
+        self,
+        kind: str,
+        provider: LLMProvider,
+        user_message: str,
+        conversation_history: List[Message],
+        summary: Optional[str] = None
+    ) -> Tuple[str, ...]:
+        """Response cache key of a call to a provider; the rolling summary is part of the prompt."""
+        prompt_version = PROMPT_VERSION
+        if summary:
+            prompt_version += ":" + hashlib.blake2b(summary.encode("utf-8"), digest_size=8).hexdigest()
+        return self.response_cache.key(
+            kind, f"{provider.name}:{provider.model}", prompt_version, user_message, conversation_history
+        )
 
     async def generate_response(
         self,
@@ -22,56 +453,53 @@ class AIService:
         """
         Generate AI response based on user message and conversation history
         """
-        # Check if the message is a product search query
         tenant_id = user_context.get('tenant_id') if user_context else None
+        conversation_history, summary = self._unsummarized(conversation_history, user_context)
+        return await self._search_or_reply(user_message, conversation_history, tenant_id, summary)
+
+    async def _search_or_reply(
+        self,
+        user_message: str,
+        conversation_history: List[Message],
+        tenant_id: Optional[str] = None,
+        summary: Optional[str] = None
+    ) -> str:
+        """Answer with product search results if the message is a search, else with a model reply."""
+        # Check if the message is a product search query
         product_search_response = await self._handle_product_search(user_message, tenant_id)
 
         if product_search_response:
             return product_search_response
 
-        # Prepare the conversation history for the AI
-        messages = [
-            {
-                "role": "system",
-                "content": (
-                    "You are a sales assistant for an online store. "
-                    "Be short, friendly, persuasive. "
-                    "Ask only ONE question at a time. "
-                    "Collect name, product interest, and contact info. "
-                    "If user shows buying intent, mark as HOT."
-                )
-            }
-        ]
+        return await self._generate_reply(user_message, conversation_history, tenant_id, summary)
 
-        # Add conversation history
-        for msg in conversation_history:
-            role = "user" if msg.role == "user" else "assistant"
-            messages.append({
-                "role": role,
-                "content": msg.content
-            })
-
-        # Add the current user message
-        messages.append({
-            "role": "user",
-            "content": user_message
-        })
+    async def _generate_reply(
+        self,
+        user_message: str,
+        conversation_history: List[Message],
+        tenant_id: Optional[str] = None,
+        summary: Optional[str] = None
+    ) -> str:
+        """Ask the tenant's model for the reply to a message, without product search."""
+        provider = get_llm_provider(tenant_id)
+        if provider is None:
+            return NO_PROVIDER_REPLY
+        cache_key = self._cache_key("reply", provider, user_message, conversation_history, summary)
+        cached = self.response_cache.get(tenant_id, cache_key)
+        if cached is not None:
+            return cached
+        messages = self._build_messages(user_message, conversation_history, SALES_ASSISTANT_PROMPT, summary)
 
         try:
-            if settings.AI_PROVIDER == "openai":
-                response = await openai.ChatCompletion.acreate(
-                    model=settings.AI_MODEL,
-                    messages=messages,
-                    max_tokens=150,
-                    temperature=0.7
-                )
-                return response.choices[0].message.content.strip()
-            else:
-                # Fallback or other providers
-                return "I'm here to help! Could you tell me more about what you're looking for?"
+            content = await self._complete(provider, tenant_id, messages, max_tokens=150, temperature=0.7)
+            reply = content.strip()
+            if not reply:
+                return REPLY_FALLBACK
+            self.response_cache.put(tenant_id, cache_key, reply, _call_tokens(messages, content))
+            return reply
         except Exception as e:
-            print(f"Error generating AI response: {e}")
-            return "I'm having trouble responding right now. Could you please try again?"
+            logger.error(f"Error generating AI response with {provider.name}: {e}")
+            return REPLY_FALLBACK
 
     async def _handle_product_search(self, user_message: str, tenant_id: str) -> str:
         """
@@ -82,40 +510,21 @@ class AIService:
             tenant_id: The tenant identifier for multi-tenant isolation
 
         Returns:
-            Formatted product search results or None if not a product search query
+            Formatted product search results, or None if the message is not a
+            product search or the search failed or was rejected because the
+            search queue is full; the caller then answers with a model reply
         """
         if not tenant_id:
             return None
 
-        # Check if the message contains product search keywords
-        search_keywords = [
-            "search", "find", "looking for", "want", "need", "product",
-            "item", "buy", "price of", "show me", "available", "what do you have"
-        ]
-
-        message_lower = user_message.lower()
-        is_product_search = any(keyword in message_lower for keyword in search_keywords)
-
-        if not is_product_search:
+        analysis = analyze_message(user_message)
+        if not analysis.is_product_search:
             return None
-
-        # Extract search query by removing common search phrases
-        search_query = user_message
-        for keyword in search_keywords:
-            if keyword in message_lower:
-                # Remove the keyword and any leading/trailing text that might be a question
-                search_query = message_lower.replace(keyword, "").strip()
-                break
-
-        # Clean up the search query
-        search_query = search_query.strip("?.,! ")
-
-        if len(search_query) < 2:  # If the remaining query is too short, use the original message
-            search_query = user_message.strip("?.,! ")
+        search_query = analysis.search_query
 
         # Perform product search
         try:
-            products = self.product_search_service.search_products(
+            products = await self.product_search_service.search_products_async(
                 tenant_id=tenant_id,
                 query=search_query,
                 limit=5  # Limit to 5 products to avoid overwhelming the user
@@ -142,52 +551,145 @@ class AIService:
             response += "Would you like more details about any of these products?"
             return response
 
+        except SearchQueueFullError as e:
+            # Answer from the model rather than queue behind a saturated pool.
+            logger.warning(f"Product search for tenant {tenant_id} skipped, search queue is full: {e}")
+            return None
         except Exception as e:
-            print(f"Error in product search: {e}")
+            logger.error(f"Error in product search for tenant {tenant_id}: {e}", exc_info=True)
             return None
 
-    async def detect_intent(self, message: str, conversation_history: List[Message]) -> str:
+    async def detect_intent(
+        self,
+        message: str,
+        conversation_history: List[Message],
+        tenant_id: Optional[str] = None
+    ) -> str:
         """
-        Detect the intent of the user message
+        Detect the intent of the user message.
+
+        The local classifier answers first; only predictions below
+        ``AI_INTENT_LOCAL_CONFIDENCE`` are sent to the LLM, which also sees the
+        recent conversation. Without a provider, or if the LLM call fails or
+        names no intent, such an uncertain message gets the keyword result
+        (HOT, WARM or COLD) intent detection used before the classifier.
+
+        Args:
+            message: The customer's message
+            conversation_history: Earlier messages of the conversation
+            tenant_id: The tenant identifier
+
+        Returns:
+            One of ``INTENTS``
         """
+        prediction = self.intent_classifier.classify(message)
+        if self.intent_classifier.is_confident(prediction):
+            return prediction.intent
+        fallback = analyze_message(message).keyword_intent
+        provider = get_llm_provider(tenant_id)
+        if provider is None:
+            return fallback
+        try:
+            intent = await self.detect_intent_with_llm(message, conversation_history, tenant_id)
+        except Exception as e:
+            logger.error(f"Error detecting intent with {provider.name}: {e}")
+            return fallback
+        return intent or fallback
+
+    async def detect_intent_with_llm(
+        self,
+        message: str,
+        conversation_history: List[Message],
+        tenant_id: Optional[str] = None
+    ) -> Optional[str]:
+        """
+        Classify the intent of the user message with the tenant's LLM provider.
+
+        Args:
+            message: The customer's message
+            conversation_history: Earlier messages of the conversation
+            tenant_id: The tenant identifier
+
+        Returns:
+            One of ``INTENTS``, or None if no provider is configured or the
+            model's answer names no intent
+
+        Raises:
+            Exception: Whatever the provider call raises
+        """
+        provider = get_llm_provider(tenant_id)
+        if provider is None:
+            return None
+        cache_key = self._cache_key("intent", provider, message, conversation_history)
+        cached = self.response_cache.get(tenant_id, cache_key)
+        if cached is not None:
+            return cached
         intent_prompt = (
             f"Based on the following conversation, determine the user's intent: "
             f"Conversation: {[msg.content for msg in conversation_history[-5:]]} "
             f"Latest message: {message} "
             f"Respond with one of: HOT, WARM, COLD, or NEUTRAL"
         )
+        messages = [
+            {
+                "role": "system",
+                "content": INTENT_CLASSIFIER_PROMPT
+            },
+            {
+                "role": "user",
+                "content": intent_prompt
+            }
+        ]
+        content = await self._complete(
+            provider,
+            tenant_id,
+            messages,
+            max_tokens=10,
+            temperature=0.1
+        )
+        intent = normalize_intent(content)
+        if intent is not None:
+            self.response_cache.put(tenant_id, cache_key, intent, _call_tokens(messages, content))
+        return intent
+
+    async def summarize_conversation(self, lead: Lead) -> Optional[Tuple[str, int]]:
+        """
+        Fold the messages that left the verbatim prompt window into the lead's rolling summary.
+
+        Runs once ``AI_SUMMARY_BATCH_MESSAGES`` messages have moved out of the
+        last ``AI_PROMPT_RECENT_MESSAGES``, so each call summarizes a bounded
+        number of new messages on top of the previous summary.
+
+        Args:
+            lead: The lead, with its messages and current summary
+
+        Returns:
+            ``(summary, summarized_messages)`` to store on the lead, or None if
+            no update is due, no provider is configured or the call failed
+        """
+        fold_until = len(lead.messages) - settings.AI_PROMPT_RECENT_MESSAGES
+        if fold_until - lead.summary_message_count < settings.AI_SUMMARY_BATCH_MESSAGES:
+            return None
+        provider = get_llm_provider(lead.tenant_id)
+        if provider is None:
+            return None
 
+        transcript = "\n".join(
+            f"{'Customer' if message.role == 'user' else 'Assistant'}: {message.content}"
+            for message in lead.messages[lead.summary_message_count:fold_until]
+        )
+        messages = [
+            {"role": "system", "content": CONVERSATION_SUMMARY_PROMPT},
+            {"role": "user", "content": f"Current summary:\n{lead.summary or '(none)'}\n\nNew messages:\n{transcript}"},
+        ]
         try:
-            if settings.AI_PROVIDER == "openai":
-                response = await openai.ChatCompletion.acreate(
-                    model=settings.AI_MODEL,
-                    messages=[
-                        {
-                            "role": "system",
-                            "content": "You are an intent classifier. Respond with only one word: HOT, WARM, COLD, or NEUTRAL."
-                        },
-                        {
-                            "role": "user",
-                            "content": intent_prompt
-                        }
-                    ],
-                    max_tokens=10,
-                    temperature=0.1
-                )
-                intent = response.choices[0].message.content.strip().upper()
-                return intent
-            else:
-                # Fallback logic
-                hot_keywords = ["buy", "purchase", "order", "price", "cost", "deal", "discount", "now"]
-                warm_keywords = ["interested", "maybe", "considering", "tell me more", "info"]
-
-                msg_lower = message.lower()
-                if any(keyword in msg_lower for keyword in hot_keywords):
-                    return "HOT"
-                elif any(keyword in msg_lower for keyword in warm_keywords):
-                    return "WARM"
-                else:
-                    return "COLD"
+            content = await self._complete(
+                provider, lead.tenant_id, messages, max_tokens=settings.AI_SUMMARY_MAX_TOKENS, temperature=0.2
+            )
         except Exception as e:
-            print(f"Error detecting intent: {e}")
-            return "COLD"
\ No newline at end of file
+            logger.warning(f"Could not update conversation summary of lead {lead.id}: {e}")
+            return None
+        summary = content.strip()
+        if not summary:
+            return None
+        return summary, fold_until
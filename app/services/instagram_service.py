@@ -49,15 +49,12 @@ class InstagramService:
         # Add the message to the lead's conversation history
         await self.lead_service.add_message_to_lead(str(lead.id), text, "user", tenant_id)
         
-        # Generate AI response
-        ai_response = await self.ai_service.generate_response(
+        # Generate AI response and detect intent
+        ai_response, intent = await self.ai_service.respond(
             text, 
             lead.messages
         )
         
-        # Detect intent
-        intent = await self.ai_service.detect_intent(text, lead.messages)
-        
         # Update lead intent if needed
         if intent in ["HOT", "WARM", "COLD"]:
             from app.constants.enums import LeadIntent
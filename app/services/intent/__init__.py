@@ -0,0 +1,17 @@
+"""Local message understanding: shared pre-processing and intent classification that escalates only uncertain messages to the LLM."""
+from app.services.intent.analysis import MessageAnalysis, MessageAnalyzer, PhraseAutomaton, analyze_message
+from app.services.intent.classifier import (
+    IntentClassifier, IntentPrediction, NaiveBayesIntentModel, SEED_EXAMPLES, get_intent_classifier
+)
+
+__all__ = [
+    "IntentClassifier",
+    "IntentPrediction",
+    "MessageAnalysis",
+    "MessageAnalyzer",
+    "NaiveBayesIntentModel",
+    "PhraseAutomaton",
+    "SEED_EXAMPLES",
+    "analyze_message",
+    "get_intent_classifier",
+]
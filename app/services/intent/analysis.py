@@ -0,0 +1,306 @@
+"""Single-pass message pre-processing shared by product search and intent detection."""
+import itertools
+import re
+from collections import deque
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, Iterable, List, Sequence, Tuple
+
+from app.services.product_search.text import normalize_text
+
+_TOKEN_RE = re.compile(r"[\w']+")
+NEGATIONS = frozenset({
+    "no", "not", "never", "dont", "don't", "doesnt", "doesn't", "wont", "won't",
+    "cant", "can't", "cannot", "isnt", "isn't", "nothing", "without",
+})
+# Tokens after a negation that are marked as negated
+NEGATION_SCOPE = 3
+
+
+def _phrases(*slots: str) -> List[str]:
+    """Expand word slots of "a|b" alternatives ("" makes a slot optional) into phrases."""
+    return [
+        " ".join(word for word in words if word)
+        for words in itertools.product(*(slot.split("|") for slot in slots))
+    ]
+
+
+# Phrases that make a message a product search; removed from the search query
+SEARCH_PHRASES = [
+    "search", "find", "looking for", "want", "need", "product",
+    "item", "buy", "price of", "show me", "available", "what do you have",
+]
+# Words left out of the search query besides the search phrases
+QUERY_FILLER = frozenset({
+    "i", "i'm", "im", "me", "my", "a", "an", "the", "to", "for", "some", "any", "please",
+    "can", "could", "you", "do", "does", "have", "is", "are", "there", "your", "of",
+    "hi", "hello", "hey", "what's", "whats",
+})
+
+# High-precision intent phrases; anything they miss is left to the model.
+INTENT_PHRASES: Dict[str, List[str]] = {
+    "HOT": [
+        "buy", "buying", "purchase", "purchasing",
+        "price", "prices", "cost", "costs", "deal", "deals", "discount", "discounts",
+        *_phrases("place|placing", "|an|my|the", "order"),
+        *_phrases("order|ordering", "it|this|that|one|two|now|today"),
+        "checkout", "check out", "cash on delivery",
+        *_phrases("add", "|it|this", "to", "|my", "cart"),
+        *_phrases("i'll|i will", "take", "it|this|that|one|two"),
+        *_phrases("how", "do|can", "i", "pay|order"),
+    ],
+    "WARM": [
+        "interested", "considering", "thinking about", "thinking of", "tell me more",
+        *_phrases("more", "info|information|details"),
+    ],
+    "COLD": [
+        "not interested", "no thanks", "no thank",
+        *_phrases("just|only", "looking|browsing"),
+        "unsubscribe",
+        *_phrases("stop", "messaging|texting|sending"),
+        *_phrases("too", "expensive|pricey"),
+    ],
+}
+# Phrases that signal an intent only when they are the whole message
+WHOLE_MESSAGE_PHRASES: Dict[str, List[str]] = {
+    "NEUTRAL": [
+        *_phrases("hi|hello|hey|hiya", "|there"),
+        "salam", "assalamualaikum",
+        *_phrases("good", "morning|afternoon|evening"),
+        "ok", "okay", "thanks", "thank you", "thx", "great", "cool", "sure",
+    ],
+}
+# The keyword lists intent detection used before the classifier; the answer
+# without an LLM when the classifier is unsure (HOT, else WARM, else COLD)
+KEYWORD_PHRASES: Dict[str, List[str]] = {
+    "HOT": [
+        "buy", "buying", "purchase", "purchasing", "order", "orders", "ordering", "ordered",
+        "price", "prices", "pricing", "cost", "costs", "deal", "deals", "discount", "discounts", "now",
+    ],
+    "WARM": ["interested", "maybe", "considering", "tell me more", "info", "information"],
+}
+# Intents that a negation in front of the phrase cancels ("don't want to buy")
+NEGATABLE_INTENTS = frozenset({"HOT", "WARM"})
+
+
+class PhraseAutomaton:
+    """
+    Aho-Corasick automaton over word tokens.
+
+    Finds every occurrence of every phrase in one left-to-right pass over a
+    message's tokens, however many phrases there are. Working on tokens
+    rather than characters means matches always start and end on word
+    boundaries, so "want" does not match "wanted".
+    """
+
+    def __init__(self, phrases: Iterable[Tuple[Sequence[str], Any]]):
+        """
+        Compile the automaton.
+
+        Args:
+            phrases: ``(tokens, payload)`` pairs; the payload is reported with each match
+        """
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[int, Any]]] = [[]]
+        for tokens, payload in phrases:
+            state = 0
+            for token in tokens:
+                next_state = self._goto[state].get(token)
+                if next_state is None:
+                    next_state = self._goto[state][token] = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                state = next_state
+            self._output[state].append((len(tokens), payload))
+
+        # Breadth-first, so a state's failure target is finished before its children.
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, child in self._goto[state].items():
+                fallback = self._fail[state]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(token, 0)
+                self._fail[child] = target if target != child else 0
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+                queue.append(child)
+
+    def find(self, tokens: Sequence[str]) -> List[Tuple[int, int, Any]]:
+        """
+        Find every phrase occurrence.
+
+        Args:
+            tokens: The message's tokens
+
+        Returns:
+            ``(start, end, payload)`` per match, with ``tokens[start:end]`` the phrase
+        """
+        matches = []
+        state = 0
+        for position, token in enumerate(tokens):
+            while state and token not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(token, 0)
+            for length, payload in self._output[state]:
+                matches.append((position + 1 - length, position + 1, payload))
+        return matches
+
+
+@dataclass(frozen=True)
+class MessageAnalysis:
+    normalized: str  # NFKC, case-folded message
+    tokens: Tuple[str, ...]
+    feature_tokens: Tuple[str, ...]  # tokens in a negation's scope prefixed with "not_"
+    is_product_search: bool
+    search_query: str  # the message without search phrases and filler words
+    intent_signals: FrozenSet[str]  # intents whose phrases matched, negated ones excluded
+    keyword_intent: str  # HOT, WARM or COLD from KEYWORD_PHRASES, negated ones excluded
+
+
+def tokenize(text: str) -> Tuple[Tuple[str, ...], Tuple[bool, ...]]:
+    """
+    Split a message into case-folded tokens and mark those in a negation's scope.
+
+    Args:
+        text: The customer's message
+
+    Returns:
+        ``(tokens, negated)``; up to three tokens after "not", "don't" etc.
+        are negated
+    """
+    return _split(normalize_text(text))
+
+
+def feature_tokens(text: str) -> Tuple[str, ...]:
+    """Tokens of a message with the negated ones prefixed with ``not_``, as the intent model sees them."""
+    return _mark_negated(*tokenize(text))
+
+
+def _split(normalized: str) -> Tuple[Tuple[str, ...], Tuple[bool, ...]]:
+    tokens = []
+    negated = []
+    scope = 0
+    for token in _TOKEN_RE.findall(normalized):
+        token = token.strip("'")
+        if not token:
+            continue
+        tokens.append(token)
+        if token in NEGATIONS:
+            scope = NEGATION_SCOPE
+            negated.append(False)
+        else:
+            negated.append(scope > 0)
+            scope = max(0, scope - 1)
+    return tuple(tokens), tuple(negated)
+
+
+def _mark_negated(tokens: Tuple[str, ...], negated: Tuple[bool, ...]) -> Tuple[str, ...]:
+    return tuple("not_" + token if flag else token for token, flag in zip(tokens, negated))
+
+
+class MessageAnalyzer:
+    """
+    Normalizes a message once and runs every phrase rule set over it in one pass.
+
+    Search phrases, intent phrases, whole-message phrases and the fallback
+    keywords share a single
+    ``PhraseAutomaton``; the resulting ``MessageAnalysis`` is what product
+    search and intent detection both work from.
+    """
+
+    def __init__(
+        self,
+        search_phrases: Iterable[str] = SEARCH_PHRASES,
+        intent_phrases: Dict[str, List[str]] = INTENT_PHRASES,
+        whole_message_phrases: Dict[str, List[str]] = WHOLE_MESSAGE_PHRASES,
+        keyword_phrases: Dict[str, List[str]] = KEYWORD_PHRASES
+    ):
+        """
+        Compile the rule sets.
+
+        Args:
+            search_phrases: Phrases that make a message a product search
+            intent_phrases: Intent -> phrases that signal it anywhere in a message
+            whole_message_phrases: Intent -> phrases that signal it as the whole message
+            keyword_phrases: HOT and WARM keywords of the keyword fallback
+        """
+        rules = [(phrase, ("search", None)) for phrase in search_phrases]
+        rules += [
+            (phrase, ("intent", intent)) for intent, phrases in intent_phrases.items() for phrase in phrases
+        ]
+        rules += [
+            (phrase, ("whole", intent)) for intent, phrases in whole_message_phrases.items() for phrase in phrases
+        ]
+        rules += [
+            (phrase, ("keyword", intent)) for intent, phrases in keyword_phrases.items() for phrase in phrases
+        ]
+        self.automaton = PhraseAutomaton((tokenize(phrase)[0], payload) for phrase, payload in rules)
+
+    def analyze(self, message: str) -> MessageAnalysis:
+        """
+        Analyze a message.
+
+        Args:
+            message: The customer's message
+
+        Returns:
+            The message's analysis
+        """
+        normalized = normalize_text(message)
+        tokens, negated = _split(normalized)
+        search_spans = set()
+        intents = set()
+        keywords = set()
+        for start, end, (kind, intent) in self.automaton.find(tokens):
+            if kind == "search":
+                if not negated[start]:
+                    search_spans.update(range(start, end))
+            elif kind == "whole":
+                if start == 0 and end == len(tokens):
+                    intents.add(intent)
+            elif kind == "keyword":
+                if not negated[start]:
+                    keywords.add(intent)
+            elif not (negated[start] and intent in NEGATABLE_INTENTS):
+                intents.add(intent)
+
+        search_query = " ".join(
+            token for position, token in enumerate(tokens)
+            if position not in search_spans and token not in QUERY_FILLER
+        )
+        if len(search_query) < 2:  # too little left; search for the whole message
+            search_query = " ".join(tokens)
+        return MessageAnalysis(
+            normalized=normalized,
+            tokens=tokens,
+            feature_tokens=_mark_negated(tokens, negated),
+            is_product_search=bool(search_spans),
+            search_query=search_query,
+            intent_signals=frozenset(intents),
+            keyword_intent="HOT" if "HOT" in keywords else "WARM" if "WARM" in keywords else "COLD",
+        )
+
+
+@lru_cache(maxsize=None)
+def get_message_analyzer() -> MessageAnalyzer:
+    """Return the process-wide analyzer with the built-in rule sets."""
+    return MessageAnalyzer()
+
+
+@lru_cache(maxsize=1024)
+def analyze_message(message: str) -> MessageAnalysis:
+    """
+    Analyze a message with the shared analyzer.
+
+    Memoized, so the consumers of one chat turn share a single analysis.
+
+    Args:
+        message: The customer's message
+
+    Returns:
+        The message's analysis; shared, so treat it as read-only
+    """
+    return get_message_analyzer().analyze(message)
@@ -0,0 +1,328 @@
+"""Local buying-intent classification: intent phrases plus a naive Bayes model over hashed n-grams."""
+import json
+import logging
+import math
+import os
+import threading
+import zlib
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+from app.services.intent.analysis import analyze_message, feature_tokens
+
+logger = logging.getLogger(__name__)
+
+LABELS = ("HOT", "WARM", "COLD", "NEUTRAL")
+MODEL_FORMAT = 1
+DEFAULT_BUCKETS = 1 << 18
+# Confidence reported for a rule match the model does not contradict
+RULE_CONFIDENCE = 0.95
+
+# Built-in training examples, so the model is useful before it is trained on stored messages
+SEED_EXAMPLES: List[Tuple[str, str]] = [
+    ("I want to order now", "HOT"),
+    ("I'd like to buy this", "HOT"),
+    ("how do I place an order", "HOT"),
+    ("please send me two of these", "HOT"),
+    ("can you deliver it tomorrow", "HOT"),
+    ("I'll take the 50ml one", "HOT"),
+    ("what's the price", "HOT"),
+    ("how much does it cost", "HOT"),
+    ("how much is the sunscreen", "HOT"),
+    ("is there a discount if I buy two", "HOT"),
+    ("do you have a deal on this", "HOT"),
+    ("add it to my cart", "HOT"),
+    ("can I pay cash on delivery", "HOT"),
+    ("my address is house 12 road 5 dhanmondi", "HOT"),
+    ("my number is 01711000000", "HOT"),
+    ("confirm my order please", "HOT"),
+    ("I need it today", "HOT"),
+    ("ship it to chittagong", "HOT"),
+    ("book one for me", "HOT"),
+    ("yes I want it", "HOT"),
+    ("I'm interested in the facial cleanser", "WARM"),
+    ("tell me more about this serum", "WARM"),
+    ("maybe, what are the ingredients", "WARM"),
+    ("I'm considering the moisturizer", "WARM"),
+    ("can you send more info", "WARM"),
+    ("is it good for oily skin", "WARM"),
+    ("does it work for acne", "WARM"),
+    ("what sizes do you have", "WARM"),
+    ("is this original", "WARM"),
+    ("which one do you recommend for dry skin", "WARM"),
+    ("do you have it in stock", "WARM"),
+    ("how long does delivery take", "WARM"),
+    ("what is the difference between these two", "WARM"),
+    ("I might get it next week", "WARM"),
+    ("how do I use it", "WARM"),
+    ("any side effects", "WARM"),
+    ("not interested", "COLD"),
+    ("no thanks", "COLD"),
+    ("I'm just looking", "COLD"),
+    ("just browsing", "COLD"),
+    ("too expensive for me", "COLD"),
+    ("I don't want to buy anything", "COLD"),
+    ("not now maybe later", "COLD"),
+    ("stop messaging me", "COLD"),
+    ("I already bought one elsewhere", "COLD"),
+    ("I don't need it", "COLD"),
+    ("never mind", "COLD"),
+    ("not for me", "COLD"),
+    ("hi", "NEUTRAL"),
+    ("hello", "NEUTRAL"),
+    ("hey there", "NEUTRAL"),
+    ("good morning", "NEUTRAL"),
+    ("thanks", "NEUTRAL"),
+    ("thank you", "NEUTRAL"),
+    ("ok", "NEUTRAL"),
+    ("are you a bot", "NEUTRAL"),
+    ("who is this", "NEUTRAL"),
+    ("what are your opening hours", "NEUTRAL"),
+    ("where is your shop", "NEUTRAL"),
+    ("can I talk to a person", "NEUTRAL"),
+]
+
+
+def hashed_features(tokens: Sequence[str], buckets: int = DEFAULT_BUCKETS) -> Counter:
+    """
+    Hash a message's unigrams and bigrams into feature buckets.
+
+    Uses CRC-32 rather than ``hash()`` so buckets are stable across processes.
+
+    Args:
+        tokens: The message's feature tokens, see ``analysis.feature_tokens``
+        buckets: Number of hash buckets
+
+    Returns:
+        Bucket index -> count
+    """
+    grams = list(tokens) + [f"{first} {second}" for first, second in zip(tokens, tokens[1:])]
+    return Counter(zlib.crc32(gram.encode("utf-8")) % buckets for gram in grams)
+
+
+class NaiveBayesIntentModel:
+    """Multinomial naive Bayes over hashed n-grams, with Laplace smoothing."""
+
+    def __init__(
+        self,
+        documents: Dict[str, int],
+        feature_counts: Dict[str, Dict[int, int]],
+        buckets: int = DEFAULT_BUCKETS,
+        alpha: float = 1.0
+    ):
+        """
+        Initialize the model from its counts.
+
+        Args:
+            documents: Label -> number of training messages
+            feature_counts: Label -> bucket index -> occurrences
+            buckets: Number of hash buckets the counts were made with
+            alpha: Additive smoothing
+        """
+        self.labels = [label for label in LABELS if documents.get(label)]
+        self.documents = documents
+        self.feature_counts = feature_counts
+        self.buckets = buckets
+        self.alpha = alpha
+        total_documents = sum(documents[label] for label in self.labels)
+        vocabulary = set()
+        for label in self.labels:
+            vocabulary.update(feature_counts.get(label, {}))
+        self._vocabulary = vocabulary
+        self._log_prior = {label: math.log(documents[label] / total_documents) for label in self.labels}
+        self._log_unseen = {}
+        for label in self.labels:
+            total = sum(feature_counts.get(label, {}).values())
+            self._log_unseen[label] = math.log(total + alpha * max(1, len(vocabulary)))
+
+    @classmethod
+    def train(
+        cls,
+        examples: Iterable[Tuple[str, str]],
+        buckets: int = DEFAULT_BUCKETS,
+        alpha: float = 1.0
+    ) -> "NaiveBayesIntentModel":
+        """
+        Train a model.
+
+        Args:
+            examples: ``(message, label)`` pairs; labels outside ``LABELS`` are skipped
+            buckets: Number of hash buckets
+            alpha: Additive smoothing
+
+        Returns:
+            The trained model
+        """
+        documents: Dict[str, int] = Counter()
+        feature_counts: Dict[str, Counter] = {}
+        for text, label in examples:
+            if label not in LABELS:
+                continue
+            documents[label] += 1
+            feature_counts.setdefault(label, Counter()).update(hashed_features(feature_tokens(text), buckets))
+        if not documents:
+            raise ValueError("No labelled examples to train on")
+        return cls(dict(documents), {label: dict(counts) for label, counts in feature_counts.items()}, buckets, alpha)
+
+    def predict(self, tokens: Sequence[str]) -> Tuple[str, float]:
+        """
+        Classify a message.
+
+        Features never seen in training are ignored, so a message made only of
+        unknown words gets the prior and a correspondingly low confidence.
+
+        Args:
+            tokens: The message's feature tokens, see ``analysis.feature_tokens``
+
+        Returns:
+            ``(label, posterior probability)``
+        """
+        features = hashed_features(tokens, self.buckets)
+        scores = {}
+        for label in self.labels:
+            counts = self.feature_counts.get(label, {})
+            score = self._log_prior[label]
+            for feature, occurrences in features.items():
+                if feature in self._vocabulary:
+                    score += occurrences * (math.log(counts.get(feature, 0) + self.alpha) - self._log_unseen[label])
+            scores[label] = score
+        best = max(scores, key=scores.get)
+        total = sum(math.exp(score - scores[best]) for score in scores.values())
+        return best, 1.0 / total
+
+    def save(self, path: str):
+        """Write the model as JSON."""
+        data = {
+            "format": MODEL_FORMAT,
+            "buckets": self.buckets,
+            "alpha": self.alpha,
+            "documents": self.documents,
+            "features": {
+                label: {str(feature): count for feature, count in counts.items()}
+                for label, counts in self.feature_counts.items()
+            },
+        }
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as file:
+            json.dump(data, file)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "NaiveBayesIntentModel":
+        """
+        Read a model written by ``save``.
+
+        Raises:
+            ValueError: If the file is not a model of the supported format
+        """
+        with open(path) as file:
+            data = json.load(file)
+        if data.get("format") != MODEL_FORMAT:
+            raise ValueError(f"Unsupported intent model format {data.get('format')!r} in {path}")
+        features = {
+            label: {int(feature): count for feature, count in counts.items()}
+            for label, counts in data["features"].items()
+        }
+        return cls(data["documents"], features, data["buckets"], data["alpha"])
+
+
+@dataclass(frozen=True)
+class IntentPrediction:
+    intent: str
+    confidence: float
+    source: str  # "rules" or "model"
+
+
+class IntentClassifier:
+    """
+    Classifies buying intent locally, saying how sure it is.
+
+    The intent phrases of the shared message analysis give a confident
+    answer when exactly one intent's phrases match (negated ones, as in
+    "don't want to buy", are ignored) and the model does not confidently
+    disagree. Otherwise the naive
+    Bayes model decides, with its posterior as the confidence. Predictions
+    below ``threshold`` should be escalated to the LLM.
+    """
+
+    def __init__(self, model: NaiveBayesIntentModel, threshold: float = 0.9):
+        """
+        Initialize the classifier.
+
+        Args:
+            model: The trained model
+            threshold: Confidence at or above which a prediction is final
+        """
+        self.model = model
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self.confident = 0
+        self.uncertain = 0
+
+    def classify(self, message: str) -> IntentPrediction:
+        """
+        Classify a message.
+
+        Args:
+            message: The customer's message
+
+        Returns:
+            The predicted intent, its confidence and what decided it
+        """
+        prediction = self._classify(message)
+        with self._lock:
+            if self.is_confident(prediction):
+                self.confident += 1
+            else:
+                self.uncertain += 1
+        return prediction
+
+    def is_confident(self, prediction: IntentPrediction) -> bool:
+        """Whether a prediction is final or should be escalated."""
+        return prediction.confidence >= self.threshold
+
+    def stats(self) -> Dict[str, Any]:
+        """Return how many predictions were confident."""
+        with self._lock:
+            total = self.confident + self.uncertain
+            return {
+                "confident": self.confident,
+                "uncertain": self.uncertain,
+                "confident_rate": self.confident / total if total else 0.0,
+            }
+
+    def _classify(self, message: str) -> IntentPrediction:
+        analysis = analyze_message(message)
+        model_intent, model_confidence = self.model.predict(analysis.feature_tokens)
+        if len(analysis.intent_signals) == 1:
+            rule_intent = next(iter(analysis.intent_signals))
+            if rule_intent == model_intent:
+                return IntentPrediction(rule_intent, max(RULE_CONFIDENCE, model_confidence), "rules")
+            if model_confidence < self.threshold:
+                return IntentPrediction(rule_intent, RULE_CONFIDENCE, "rules")
+            # Rules and a confident model disagree: leave it to the LLM.
+            return IntentPrediction(model_intent, min(model_confidence, 1.0 - RULE_CONFIDENCE), "model")
+        return IntentPrediction(model_intent, model_confidence, "model")
+
+
+@lru_cache(maxsize=None)
+def get_intent_classifier() -> IntentClassifier:
+    """Return the process-wide classifier: the trained model if there is one, else one trained on the seed examples."""
+    from app.config.settings import settings
+
+    path = settings.AI_INTENT_MODEL_PATH
+    model = None
+    if path and os.path.exists(path):
+        try:
+            model = NaiveBayesIntentModel.load(path)
+            logger.info(f"Loaded intent model from {path}")
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Could not load intent model from {path}, using the seed examples: {e}")
+    if model is None:
+        model = NaiveBayesIntentModel.train(SEED_EXAMPLES)
+    return IntentClassifier(model, threshold=settings.AI_INTENT_LOCAL_CONFIDENCE)
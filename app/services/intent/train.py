@@ -0,0 +1,216 @@
+"""
+Train the local intent model on stored customer messages.
+
+Each customer message in the tenant databases is labelled from a JSONL file
+of ``{"text": ..., "intent": ...}`` lines. With ``--label-with-llm`` the
+remaining messages are labelled by the configured LLM provider, with their
+recent conversation as context, and the labels are appended to the file, so
+later runs only pay for new messages. The model learns from these labels
+plus the built-in seed examples; a held-out split reports its accuracy and
+how many messages it would settle without the LLM.
+
+Usage::
+
+    python -m app.services.intent.train --labels tenant_data/intent_labels.jsonl --label-with-llm
+    python -m app.services.intent.train --labels labels.jsonl --tenant shajba -o intent_model.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+from app.config.settings import settings
+from app.database import sqlite_handler
+from app.models.lead import Message
+from app.services.intent.classifier import (
+    LABELS, SEED_EXAMPLES, IntentClassifier, NaiveBayesIntentModel
+)
+from app.services.llm.response_cache import normalize_message
+
+logger = logging.getLogger(__name__)
+
+# Messages of conversation context given to the LLM labeller, as in detect_intent
+HISTORY_MESSAGES = 5
+
+
+def load_labels(path: Optional[str]) -> Dict[str, str]:
+    """Read normalized message -> intent from a JSONL labels file, if it exists."""
+    labels = {}
+    if not path or not os.path.exists(path):
+        return labels
+    with open(path) as file:
+        for line in file:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            intent = str(record.get("intent", "")).upper()
+            if intent in LABELS:
+                labels[normalize_message(record["text"])] = intent
+    return labels
+
+
+def list_tenants(db_dir: str) -> List[str]:
+    """Tenants with a database in ``db_dir``."""
+    return sorted(name[:-3] for name in os.listdir(db_dir) if name.endswith(".db"))
+
+
+async def stored_user_messages(tenant_ids: List[str]) -> List[Tuple[str, str, List[Message]]]:
+    """
+    Collect customer messages with the conversation before them.
+
+    Returns:
+        ``(tenant_id, text, history)`` for each customer message
+    """
+    samples = []
+    for tenant_id in tenant_ids:
+        history: List[Message] = []
+        lead_id = None
+        for row in await sqlite_handler.get_all_messages(tenant_id):
+            if row["lead_id"] != lead_id:
+                lead_id, history = row["lead_id"], []
+            message = Message(**row)
+            if message.role == "user" and message.content.strip():
+                samples.append((tenant_id, message.content, history[-HISTORY_MESSAGES:]))
+            history.append(message)
+    return samples
+
+
+async def label_with_llm(
+    samples: List[Tuple[str, str, List[Message]]],
+    labels: Dict[str, str],
+    labels_path: Optional[str],
+    concurrency: int
+) -> int:
+    """
+    Label the samples that have no label yet with the LLM, appending to the labels file.
+
+    Returns:
+        Number of newly labelled messages
+    """
+    from app.services.ai_service import AIService
+
+    ai_service = AIService()
+    semaphore = asyncio.Semaphore(concurrency)
+    pending = {}
+    for tenant_id, text, history in samples:
+        pending.setdefault(normalize_message(text), (tenant_id, text, history))
+    for key in labels:
+        pending.pop(key, None)
+    if not pending:
+        return 0
+
+    labelled = 0
+    output = open(labels_path, "a") if labels_path else None
+    try:
+        async def label(key: str, tenant_id: str, text: str, history: List[Message]):
+            nonlocal labelled
+            async with semaphore:
+                try:
+                    intent = await ai_service.detect_intent_with_llm(text, history, tenant_id)
+                except Exception as e:
+                    logger.warning(f"Could not label message for tenant {tenant_id}: {e}")
+                    return
+            if intent is None:
+                return
+            labels[key] = intent
+            labelled += 1
+            if output is not None:
+                output.write(json.dumps({"text": text, "intent": intent, "tenant_id": tenant_id}) + "\n")
+
+        await asyncio.gather(*(label(key, *sample) for key, sample in pending.items()))
+    finally:
+        if output is not None:
+            output.close()
+    return labelled
+
+
+def evaluate(examples: List[Tuple[str, str]], threshold: float, holdout: float = 0.2) -> Dict[str, float]:
+    """
+    Train on most examples and score the classifier on a stable held-out share.
+
+    Returns:
+        Accuracy on all held-out examples, the share predicted confidently and
+        the accuracy of those confident predictions
+    """
+    def held_out(text: str) -> bool:
+        return zlib.crc32(normalize_message(text).encode("utf-8")) % 1000 < holdout * 1000
+
+    train = [example for example in examples if not held_out(example[0])]
+    test = [example for example in examples if held_out(example[0])]
+    if not train or not test:
+        return {}
+    classifier = IntentClassifier(NaiveBayesIntentModel.train(train), threshold=threshold)
+    correct = confident = confident_correct = 0
+    for text, label in test:
+        prediction = classifier.classify(text)
+        correct += prediction.intent == label
+        if classifier.is_confident(prediction):
+            confident += 1
+            confident_correct += prediction.intent == label
+    return {
+        "examples": len(test),
+        "accuracy": correct / len(test),
+        "confident_rate": confident / len(test),
+        "confident_accuracy": confident_correct / confident if confident else 0.0,
+    }
+
+
+async def run(args: argparse.Namespace) -> int:
+    labels = load_labels(args.labels)
+    tenant_ids = args.tenant or list_tenants(args.db_dir)
+    samples = await stored_user_messages(tenant_ids)
+    print(f"{len(samples)} customer messages from {len(tenant_ids)} tenants, {len(labels)} labels on file")
+    if args.label_with_llm:
+        labelled = await label_with_llm(samples, labels, args.labels, args.concurrency)
+        print(f"Labelled {labelled} messages with the LLM")
+
+    examples = []
+    seen = set()
+    for _, text, _ in samples:
+        key = normalize_message(text)
+        if key in labels and key not in seen:
+            seen.add(key)
+            examples.append((text, labels[key]))
+    unlabelled = len({normalize_message(text) for _, text, _ in samples}) - len(examples)
+    if not args.no_seed:
+        examples += SEED_EXAMPLES
+    if not examples:
+        print("No labelled examples; pass --labels or --label-with-llm")
+        return 1
+    print(f"Training on {len(examples)} examples ({unlabelled} stored messages had no label)")
+
+    scores = evaluate(examples, args.threshold)
+    if scores:
+        print(
+            f"Held-out: {scores['examples']} examples, accuracy {scores['accuracy']:.1%}, "
+            f"{scores['confident_rate']:.1%} settled locally at {scores['confident_accuracy']:.1%} accuracy"
+        )
+    NaiveBayesIntentModel.train(examples).save(args.output)
+    print(f"Wrote {args.output}")
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Train the local intent model on stored customer messages.")
+    parser.add_argument("--db-dir", default=sqlite_handler.DB_DIR, help="directory of tenant databases")
+    parser.add_argument("--tenant", action="append", help="only use this tenant's messages (repeatable)")
+    parser.add_argument("--labels", help="JSONL file of {\"text\", \"intent\"} labels, appended to by --label-with-llm")
+    parser.add_argument("--label-with-llm", action="store_true", help="label unlabelled messages with the LLM")
+    parser.add_argument("--concurrency", type=int, default=4, help="LLM labelling calls in flight")
+    parser.add_argument("--no-seed", action="store_true", help="leave out the built-in seed examples")
+    parser.add_argument("--threshold", type=float, default=settings.AI_INTENT_LOCAL_CONFIDENCE,
+                        help="confidence counted as settled locally in the evaluation")
+    parser.add_argument("-o", "--output", default=settings.AI_INTENT_MODEL_PATH, help="model output path")
+    args = parser.parse_args(argv)
+    if not args.output:
+        parser.error("--output is required when AI_INTENT_MODEL_PATH is unset")
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    sys.exit(main())
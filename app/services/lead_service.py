@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import Awaitable, Callable, List, Optional, Tuple, Union
 from datetime import datetime
 import logging
 
@@ -93,6 +93,46 @@ class LeadService:
 
         return self._dict_to_lead_model(updated_lead_dict)
 
+    async def apply_detected_intent(
+        self,
+        lead_id: str,
+        intent: Union[str, Awaitable[str]],
+        tenant_id: str
+    ) -> Optional[str]:
+        """
+        Store a detected intent label on a lead, waiting for it if it is still being classified.
+
+        Only HOT, WARM and COLD change the lead; other labels (NEUTRAL) leave it as it is.
+        """
+        if not isinstance(intent, str):
+            intent = await intent
+        if intent in ("HOT", "WARM", "COLD"):
+            await self.update_lead_intent(lead_id, LeadIntent(intent.lower()), tenant_id)
+            logger.info(f"Lead {lead_id} intent updated to {intent}")
+        return intent
+
+    async def refresh_conversation_summary(
+        self,
+        lead_id: str,
+        tenant_id: str,
+        summarize: Callable[[Lead], Awaitable[Optional[Tuple[str, int]]]]
+    ) -> Optional[str]:
+        """
+        Update a lead's rolling conversation summary, e.g. with ``AIService.summarize_conversation``.
+
+        Meant to run in the background after a turn's messages are saved.
+        """
+        lead = await self.get_lead_by_id(lead_id, tenant_id)
+        if lead is None:
+            return None
+        update = await summarize(lead)
+        if update is None:
+            return lead.summary
+        summary, message_count = update
+        await sqlite_handler.update_lead_summary(tenant_id, lead_id, summary, message_count)
+        logger.info(f"Lead {lead_id} conversation summary now covers {message_count} messages")
+        return summary
+
     async def get_all_leads(self, tenant_id: str) -> List[Lead]:
         """Get all leads for a tenant."""
         leads_list = await sqlite_handler.get_all_leads(tenant_id)
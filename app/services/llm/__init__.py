@@ -0,0 +1,13 @@
+"""Chat completion providers behind one interface, on pooled HTTP clients."""
+from app.services.llm.base import ChatMessage, LLMError, LLMProvider
+from app.services.llm.http import close_http_clients
+from app.services.llm.registry import PROVIDERS, get_llm_provider
+
+__all__ = [
+    "ChatMessage",
+    "LLMError",
+    "LLMProvider",
+    "PROVIDERS",
+    "close_http_clients",
+    "get_llm_provider",
+]
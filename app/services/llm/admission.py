@@ -0,0 +1,306 @@
+"""Admission control for LLM calls: adaptive global concurrency and per-tenant rate limits."""
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import Any, AsyncIterator, Callable, Deque, Dict, Optional
+
+from app.services.llm.base import LLMError
+
+logger = logging.getLogger(__name__)
+
+# Provider statuses that mean "slow down"
+THROTTLE_STATUS_CODES = (429, 503)
+# Longest pause honoured from a provider's Retry-After
+MAX_PAUSE_SECONDS = 30.0
+
+
+class LLMAdmissionError(LLMError):
+    """Raised when an LLM call is not admitted before its queue deadline."""
+
+
+class _TokenBucket:
+    def __init__(self, rate: float, burst: float, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+
+    def reserve(self, now: float) -> float:
+        """Take a token, going into debt if needed; returns the seconds until it is covered."""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        return -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+    def refund(self):
+        self.tokens += 1
+
+
+class Admission:
+    """A granted slot; ``responded`` marks when the first response byte arrived."""
+
+    def __init__(self, clock: Callable[[], float]):
+        self._clock = clock
+        self.started = clock()
+        self.first_response: Optional[float] = None
+
+    def responded(self):
+        if self.first_response is None:
+            self.first_response = self._clock()
+
+
+def _granted(waiter: asyncio.Future) -> bool:
+    return waiter.done() and not waiter.cancelled()
+
+
+class LLMAdmissionController:
+    """
+    Limits LLM calls in flight and shares them fairly between tenants.
+
+    The global concurrency limit adapts AIMD-style: every call that answers
+    within ``target_latency_seconds`` raises it by ``1 / limit`` (about one
+    per limit's worth of calls), while a slow call multiplies it by
+    ``latency_backoff`` and a 429/503 from the provider halves it. Decreases
+    happen at most once per target latency, so one burst of errors from the
+    same window only counts once. A provider's Retry-After pauses admission
+    rather than letting callers retry into the limit.
+
+    Each tenant has a token bucket (``tenant_rate`` calls per second,
+    ``tenant_burst`` deep, both scaled by the tenant's weight), and callers
+    waiting for a slot are queued per tenant and admitted round-robin. A call
+    that cannot be admitted before its deadline raises ``LLMAdmissionError``
+    instead of running late.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 8,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        target_latency_seconds: float = 5.0,
+        latency_backoff: float = 0.9,
+        queue_timeout_seconds: float = 10.0,
+        tenant_rate: float = 5.0,
+        tenant_burst: float = 20.0,
+        tenant_weights: Optional[Dict[str, float]] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize the controller.
+
+        Args:
+            initial_limit: Calls in flight allowed before any feedback
+            min_limit: Floor of the adaptive limit
+            max_limit: Ceiling of the adaptive limit (0 disables admission control)
+            target_latency_seconds: Latency (to the first response byte) above which the limit shrinks
+            latency_backoff: Factor applied to the limit after a slow call
+            queue_timeout_seconds: Longest a call may wait for admission
+            tenant_rate: Calls per second each tenant may start, at weight 1
+            tenant_burst: Calls a tenant may start at once after being idle, at weight 1
+            tenant_weights: Tenant id -> weight scaling its rate and burst
+            clock: Monotonic time source, overridable for tests
+        """
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max_limit
+        self.limit = float(min(max(initial_limit, self.min_limit), max_limit)) if max_limit else 0.0
+        self.target_latency_seconds = target_latency_seconds
+        self.latency_backoff = latency_backoff
+        self.queue_timeout_seconds = queue_timeout_seconds
+        self.tenant_rate = tenant_rate
+        self.tenant_burst = tenant_burst
+        self.tenant_weights = dict(tenant_weights or {})
+        self._clock = clock
+        self._buckets: Dict[str, _TokenBucket] = {}
+        # tenant_id -> futures waiting for a slot; key order is the round-robin order
+        self._waiters: "OrderedDict[str, Deque[asyncio.Future]]" = OrderedDict()
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._last_decrease = float("-inf")
+        self._resume_handle: Optional[asyncio.TimerHandle] = None
+        self.admitted = 0
+        self.rate_limited = 0
+        self.expired = 0
+        self.throttled = 0
+        self.max_wait_seconds = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_limit > 0
+
+    @asynccontextmanager
+    async def admit(self, tenant_id: Optional[str]) -> AsyncIterator[Admission]:
+        """
+        Hold an admission slot for the duration of an LLM call.
+
+        The call's latency is measured to ``Admission.responded`` if the body
+        marks it (streams do, on their first chunk), otherwise to the end of
+        the block. An ``LLMError`` with status 429 or 503 counts as throttling.
+
+        Args:
+            tenant_id: Tenant the call is made for
+
+        Returns:
+            Async context manager yielding the ``Admission``
+
+        Raises:
+            LLMAdmissionError: If the call is not admitted before its deadline
+        """
+        if not self.enabled:
+            yield Admission(self._clock)
+            return
+        await self._acquire(tenant_id or "")
+        admission = Admission(self._clock)
+        error: Optional[BaseException] = None
+        try:
+            yield admission
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            end = admission.first_response if admission.first_response is not None else self._clock()
+            self._release(end - admission.started, error)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the current limit, load and admission counters."""
+        return {
+            "limit": round(self.limit, 2),
+            "in_flight": self._in_flight,
+            "queued": sum(len(waiters) for waiters in self._waiters.values()),
+            "paused_seconds": round(max(0.0, self._paused_until - self._clock()), 2),
+            "admitted": self.admitted,
+            "rate_limited": self.rate_limited,
+            "expired": self.expired,
+            "throttled": self.throttled,
+            "max_wait_seconds": round(self.max_wait_seconds, 3),
+        }
+
+    async def _acquire(self, tenant_id: str):
+        arrived = self._clock()
+        deadline = arrived + self.queue_timeout_seconds
+
+        bucket = self._buckets.get(tenant_id)
+        if bucket is None:
+            weight = self.tenant_weights.get(tenant_id, 1.0)
+            bucket = self._buckets[tenant_id] = _TokenBucket(
+                self.tenant_rate * weight, max(1.0, self.tenant_burst * weight), arrived
+            )
+        wait = bucket.reserve(arrived)
+        if arrived + wait > deadline:
+            bucket.refund()
+            self.rate_limited += 1
+            raise LLMAdmissionError(f"Tenant {tenant_id or 'default'} is over its LLM call rate")
+        if wait:
+            await asyncio.sleep(wait)
+
+        if self._can_admit() and not self._waiters:
+            self._grant(arrived)
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(tenant_id, deque()).append(waiter)
+        self._schedule_resume()
+        try:
+            await asyncio.wait_for(waiter, max(0.0, deadline - self._clock()))
+        except asyncio.TimeoutError:
+            if not _granted(waiter):
+                self.expired += 1
+                raise LLMAdmissionError(
+                    f"LLM call for tenant {tenant_id or 'default'} not admitted within {self.queue_timeout_seconds}s"
+                ) from None
+        except BaseException:
+            if _granted(waiter):
+                # Admitted just as the caller gave up; hand the slot on.
+                self._in_flight -= 1
+                self._dispatch()
+            raise
+        finally:
+            self._discard(tenant_id, waiter)
+        self.max_wait_seconds = max(self.max_wait_seconds, self._clock() - arrived)
+
+    def _can_admit(self) -> bool:
+        return self._in_flight < int(self.limit) and self._clock() >= self._paused_until
+
+    def _grant(self, arrived: float):
+        self._in_flight += 1
+        self.admitted += 1
+        self.max_wait_seconds = max(self.max_wait_seconds, self._clock() - arrived)
+
+    def _discard(self, tenant_id: str, waiter: asyncio.Future):
+        waiters = self._waiters.get(tenant_id)
+        if waiters is None:
+            return
+        try:
+            waiters.remove(waiter)
+        except ValueError:
+            pass
+        if not waiters:
+            del self._waiters[tenant_id]
+
+    def _release(self, latency: float, error: Optional[BaseException]):
+        self._in_flight -= 1
+        now = self._clock()
+        if isinstance(error, LLMError) and error.status_code in THROTTLE_STATUS_CODES:
+            self.throttled += 1
+            self._decrease(now, 0.5)
+            if error.retry_after:
+                self._paused_until = max(self._paused_until, now + min(error.retry_after, MAX_PAUSE_SECONDS))
+        elif latency > self.target_latency_seconds:
+            self._decrease(now, self.latency_backoff)
+        elif error is None:
+            self.limit = min(float(self.max_limit), self.limit + 1.0 / self.limit)
+        self._dispatch()
+
+    def _decrease(self, now: float, factor: float):
+        if now - self._last_decrease < self.target_latency_seconds:
+            return
+        self._last_decrease = now
+        previous = self.limit
+        self.limit = max(float(self.min_limit), self.limit * factor)
+        logger.info(f"LLM concurrency limit lowered from {previous:.1f} to {self.limit:.1f}")
+
+    def _dispatch(self):
+        """Admit waiting calls round-robin across tenants while slots are free."""
+        while self._waiters and self._can_admit():
+            tenant_id, waiters = next(iter(self._waiters.items()))
+            waiter = waiters.popleft()
+            if waiters:
+                self._waiters.move_to_end(tenant_id)
+            else:
+                del self._waiters[tenant_id]
+            if waiter.done():  # timed out
+                continue
+            self._in_flight += 1
+            self.admitted += 1
+            waiter.set_result(None)
+        self._schedule_resume()
+
+    def _schedule_resume(self):
+        """Wake the queue when a Retry-After pause ends, even if no call completes meanwhile."""
+        delay = self._paused_until - self._clock()
+        if delay <= 0 or not self._waiters or self._resume_handle is not None:
+            return
+
+        def resume():
+            self._resume_handle = None
+            self._dispatch()
+
+        self._resume_handle = asyncio.get_running_loop().call_later(delay, resume)
+
+
+@lru_cache(maxsize=None)
+def get_llm_admission_controller() -> LLMAdmissionController:
+    """Return the process-wide admission controller configured from settings."""
+    from app.config.settings import settings
+
+    return LLMAdmissionController(
+        initial_limit=settings.AI_INITIAL_CONCURRENCY,
+        min_limit=settings.AI_MIN_CONCURRENCY,
+        max_limit=settings.AI_MAX_CONCURRENCY,
+        target_latency_seconds=settings.AI_TARGET_LATENCY_SECONDS,
+        queue_timeout_seconds=settings.AI_QUEUE_TIMEOUT_SECONDS,
+        tenant_rate=settings.AI_TENANT_RATE_PER_SECOND,
+        tenant_burst=settings.AI_TENANT_BURST,
+        tenant_weights=settings.AI_TENANT_WEIGHTS
+    )
@@ -0,0 +1,85 @@
+"""Provider-agnostic interface for chat completion calls."""
+from typing import AsyncIterator, Dict, List, Optional
+
+# {"role": "system" | "user" | "assistant", "content": text}
+ChatMessage = Dict[str, str]
+
+
+class LLMError(RuntimeError):
+    """
+    Raised when a provider call fails.
+
+    ``status_code`` is set for HTTP error responses and ``retry_after`` when
+    the provider said how long to back off, e.g. on 429.
+    """
+
+    def __init__(self, message: str, status_code: Optional[int] = None, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class LLMProvider:
+    """Base class of chat completion providers."""
+
+    name = "base"
+
+    def __init__(self, model: str):
+        """
+        Initialize the provider.
+
+        Args:
+            model: Model identifier sent to the provider
+        """
+        self.model = model
+
+    async def complete(
+        self,
+        messages: List[ChatMessage],
+        max_tokens: int = 150,
+        temperature: float = 0.7,
+        json_mode: bool = False
+    ) -> str:
+        """
+        Generate the next assistant message.
+
+        Args:
+            messages: Conversation so far, system prompt first
+            max_tokens: Upper bound on generated tokens
+            temperature: Sampling temperature
+            json_mode: Ask the provider to constrain the output to a JSON object
+
+        Returns:
+            The generated text
+
+        Raises:
+            LLMError: If the call fails or the response is malformed
+        """
+        raise NotImplementedError
+
+    async def stream(
+        self,
+        messages: List[ChatMessage],
+        max_tokens: int = 150,
+        temperature: float = 0.7
+    ) -> AsyncIterator[str]:
+        """
+        Generate the next assistant message, yielding text as it is produced.
+
+        Providers without a streaming API yield the whole completion at once.
+
+        Args:
+            messages: Conversation so far, system prompt first
+            max_tokens: Upper bound on generated tokens
+            temperature: Sampling temperature
+
+        Returns:
+            Async iterator over text fragments, in order
+
+        Raises:
+            LLMError: If the call fails or the stream is malformed
+        """
+        yield await self.complete(messages, max_tokens=max_tokens, temperature=temperature)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(model={self.model!r})"
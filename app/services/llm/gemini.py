@@ -0,0 +1,105 @@
+"""Google Gemini provider over the generateContent REST API."""
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+
+from app.services.llm.base import ChatMessage, LLMError, LLMProvider
+from app.services.llm.http import get_http_client, iter_sse_json, response_json
+
+GEMINI_BASE_URL = "https://generativelanguage.googleapis.com/v1beta"
+
+
+class GeminiProvider(LLMProvider):
+    """Chat completions from Gemini models, translated from the OpenAI message format."""
+
+    name = "gemini"
+
+    def __init__(
+        self,
+        model: str,
+        api_key: Optional[str] = None,
+        base_url: str = GEMINI_BASE_URL,
+        thinking_budget: Optional[int] = None
+    ):
+        """
+        Initialize the provider.
+
+        Args:
+            model: Model identifier, e.g. ``gemini-2.5-flash``
+            api_key: Gemini API key
+            base_url: API root
+            thinking_budget: Tokens the model may spend thinking before it
+                answers; 0 disables thinking, None leaves the model default
+        """
+        super().__init__(model)
+        self.base_url = base_url
+        self.thinking_budget = thinking_budget
+        self.headers = {"x-goog-api-key": api_key} if api_key else {}
+
+    def _payload(
+        self,
+        messages: List[ChatMessage],
+        max_tokens: int,
+        temperature: float,
+        json_mode: bool = False
+    ) -> Dict[str, Any]:
+        system = [message["content"] for message in messages if message["role"] == "system"]
+        contents = [
+            {"role": "model" if message["role"] == "assistant" else "user", "parts": [{"text": message["content"]}]}
+            for message in messages if message["role"] != "system"
+        ]
+        generation_config = {"maxOutputTokens": max_tokens, "temperature": temperature}
+        if json_mode:
+            generation_config["responseMimeType"] = "application/json"
+        if self.thinking_budget is not None:
+            generation_config["thinkingConfig"] = {"thinkingBudget": self.thinking_budget}
+        payload = {"contents": contents, "generationConfig": generation_config}
+        if system:
+            payload["systemInstruction"] = {"parts": [{"text": "\n\n".join(system)}]}
+        return payload
+
+    async def complete(
+        self,
+        messages: List[ChatMessage],
+        max_tokens: int = 150,
+        temperature: float = 0.7,
+        json_mode: bool = False
+    ) -> str:
+        payload = self._payload(messages, max_tokens, temperature, json_mode)
+        try:
+            response = await get_http_client(self.base_url).post(
+                f"models/{self.model}:generateContent", json=payload, headers=self.headers
+            )
+        except httpx.HTTPError as e:
+            raise LLMError(f"gemini request failed: {e}") from e
+        return _candidate_text(response_json(response, self.name))
+
+    async def stream(
+        self,
+        messages: List[ChatMessage],
+        max_tokens: int = 150,
+        temperature: float = 0.7
+    ) -> AsyncIterator[str]:
+        payload = self._payload(messages, max_tokens, temperature)
+        try:
+            async with get_http_client(self.base_url).stream(
+                "POST", f"models/{self.model}:streamGenerateContent",
+                params={"alt": "sse"}, json=payload, headers=self.headers
+            ) as response:
+                async for event in iter_sse_json(response, self.name):
+                    # The last event may carry only the finish reason
+                    text = _candidate_text(event, strict=False)
+                    if text:
+                        yield text
+        except httpx.HTTPError as e:
+            raise LLMError(f"gemini stream failed: {e}") from e
+
+
+def _candidate_text(data: Any, strict: bool = True) -> str:
+    try:
+        parts = data["candidates"][0]["content"]["parts"]
+    except (KeyError, IndexError, TypeError):
+        if not strict:
+            return ""
+        raise LLMError("gemini returned no candidate") from None
+    return "".join(part.get("text", "") for part in parts)
@@ -0,0 +1,115 @@
+"""Long-lived pooled HTTP clients shared by all provider instances."""
+import json
+import logging
+from typing import Any, AsyncIterator, Dict, Optional
+
+import httpx
+
+from app.config.settings import settings
+from app.services.llm.base import LLMError
+
+try:
+    import h2  # noqa: F401  (enables HTTP/2 in httpx)
+    HTTP2_AVAILABLE = True
+except ImportError:  # httpx without the [http2] extra: HTTP/1.1 keep-alive only
+    HTTP2_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# base URL -> client; connections are reused across calls, tenants and providers
+_clients: Dict[str, httpx.AsyncClient] = {}
+
+
+def get_http_client(base_url: str) -> httpx.AsyncClient:
+    """
+    Return the shared client for a provider endpoint, creating it on first use.
+
+    Clients keep connections alive between calls, so only the first call to
+    an endpoint pays for connection and TLS setup, and use HTTP/2 when the
+    ``h2`` package is installed so concurrent calls share one connection.
+    A client belongs to the event loop it is first used on.
+
+    Args:
+        base_url: Provider API root, e.g. ``https://api.openai.com/v1``
+
+    Returns:
+        The pooled client
+    """
+    client = _clients.get(base_url)
+    if client is None or client.is_closed:
+        client = _clients[base_url] = httpx.AsyncClient(
+            base_url=base_url,
+            http2=HTTP2_AVAILABLE,
+            limits=httpx.Limits(
+                max_connections=settings.AI_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.AI_HTTP_MAX_CONNECTIONS,
+                keepalive_expiry=60.0
+            ),
+            timeout=httpx.Timeout(settings.AI_HTTP_TIMEOUT_SECONDS, connect=5.0)
+        )
+    return client
+
+
+async def close_http_clients():
+    """Close every pooled client; called on application shutdown."""
+    clients = list(_clients.values())
+    _clients.clear()
+    for client in clients:
+        await client.aclose()
+
+
+async def iter_sse_json(response: httpx.Response, provider: str) -> AsyncIterator[Any]:
+    """
+    Decode the ``data:`` events of a server-sent event stream as JSON.
+
+    Args:
+        response: A streamed HTTP response
+        provider: Provider name for error messages
+
+    Returns:
+        Async iterator over the decoded events; ends at ``data: [DONE]`` or end of stream
+
+    Raises:
+        LLMError: For error statuses and events that are not JSON
+    """
+    if response.status_code >= 400:
+        await response.aread()
+        response_json(response, provider)
+    async for line in response.aiter_lines():
+        if not line.startswith("data:"):
+            continue
+        data = line[5:].strip()
+        if data == "[DONE]":
+            return
+        try:
+            yield json.loads(data)
+        except ValueError:
+            raise LLMError(f"{provider} sent a malformed stream event") from None
+
+
+def response_json(response: httpx.Response, provider: str) -> Any:
+    """
+    Decode a provider response, raising ``LLMError`` for error statuses and bad bodies.
+
+    Args:
+        response: The HTTP response
+        provider: Provider name for error messages
+
+    Returns:
+        The decoded JSON body
+    """
+    if response.status_code >= 400:
+        retry_after: Optional[float] = None
+        try:
+            retry_after = float(response.headers.get("retry-after", ""))
+        except ValueError:
+            pass
+        raise LLMError(
+            f"{provider} returned HTTP {response.status_code}: {response.text[:200]}",
+            status_code=response.status_code,
+            retry_after=retry_after
+        )
+    try:
+        return response.json()
+    except ValueError:
+        raise LLMError(f"{provider} returned a non-JSON response", status_code=response.status_code) from None
@@ -0,0 +1,94 @@
+"""Providers speaking the OpenAI chat completions API (OpenAI, OpenRouter, local servers)."""
+from typing import AsyncIterator, Dict, List, Optional
+
+import httpx
+
+from app.services.llm.base import ChatMessage, LLMError, LLMProvider
+from app.services.llm.http import get_http_client, iter_sse_json, response_json
+
+
+class OpenAICompatibleProvider(LLMProvider):
+    """
+    Chat completions over the OpenAI REST API.
+
+    OpenRouter and most self-hosted model servers expose the same API, so
+    this class serves all of them; only the base URL and headers differ.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        base_url: str,
+        model: str,
+        api_key: Optional[str] = None,
+        extra_headers: Optional[Dict[str, str]] = None
+    ):
+        """
+        Initialize the provider.
+
+        Args:
+            name: Provider name reported in errors and stats
+            base_url: API root, e.g. ``https://api.openai.com/v1``
+            model: Model identifier
+            api_key: Bearer token; may be omitted for local servers
+            extra_headers: Additional headers sent with every call
+        """
+        super().__init__(model)
+        self.name = name
+        self.base_url = base_url
+        self.headers = dict(extra_headers or {})
+        if api_key:
+            self.headers["Authorization"] = f"Bearer {api_key}"
+
+    async def complete(
+        self,
+        messages: List[ChatMessage],
+        max_tokens: int = 150,
+        temperature: float = 0.7,
+        json_mode: bool = False
+    ) -> str:
+        payload = {
+            "model": self.model,
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+        }
+        if json_mode:
+            payload["response_format"] = {"type": "json_object"}
+        try:
+            response = await get_http_client(self.base_url).post("chat/completions", json=payload, headers=self.headers)
+        except httpx.HTTPError as e:
+            raise LLMError(f"{self.name} request failed: {e}") from e
+        data = response_json(response, self.name)
+        try:
+            return data["choices"][0]["message"]["content"] or ""
+        except (KeyError, IndexError, TypeError):
+            raise LLMError(f"{self.name} returned a malformed completion") from None
+
+    async def stream(
+        self,
+        messages: List[ChatMessage],
+        max_tokens: int = 150,
+        temperature: float = 0.7
+    ) -> AsyncIterator[str]:
+        payload = {
+            "model": self.model,
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "stream": True,
+        }
+        try:
+            async with get_http_client(self.base_url).stream(
+                "POST", "chat/completions", json=payload, headers=self.headers
+            ) as response:
+                async for event in iter_sse_json(response, self.name):
+                    try:
+                        text = event["choices"][0]["delta"].get("content")
+                    except (KeyError, IndexError, TypeError, AttributeError):
+                        # OpenRouter interleaves keep-alive and usage events
+                        continue
+                    if text:
+                        yield text
+        except httpx.HTTPError as e:
+            raise LLMError(f"{self.name} stream failed: {e}") from e
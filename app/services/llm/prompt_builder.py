@@ -0,0 +1,70 @@
+"""Token-budgeted chat prompts from a rolling summary plus the most recent messages."""
+from typing import List, Optional
+
+from app.models.lead import Message
+from app.services.llm.base import ChatMessage
+from app.services.llm.tokens import MESSAGE_OVERHEAD_TOKENS, count_message_tokens, count_tokens
+
+SUMMARY_HEADER = "Summary of the earlier conversation:"
+
+
+class PromptBuilder:
+    """
+    Builds chat prompts whose size does not grow with the conversation.
+
+    A prompt is the system prompt (followed by the rolling summary of older
+    messages, if there is one), then the most recent messages verbatim, then
+    the new message. Recent messages are taken newest first until either
+    ``max_history_messages`` or the token budget is reached, so older
+    messages that are not summarized yet drop out first.
+    """
+
+    def __init__(self, max_prompt_tokens: int = 1500, max_history_messages: int = 10):
+        """
+        Initialize the builder.
+
+        Args:
+            max_prompt_tokens: Token budget of a prompt (0 for no token limit)
+            max_history_messages: Most history messages included verbatim
+        """
+        self.max_prompt_tokens = max_prompt_tokens
+        self.max_history_messages = max_history_messages
+
+    def build(
+        self,
+        system_prompt: str,
+        conversation_history: List[Message],
+        user_message: str,
+        summary: Optional[str] = None
+    ) -> List[ChatMessage]:
+        """
+        Assemble the messages of a prompt.
+
+        The system prompt, summary and new message are always included, even
+        if they alone exceed the budget.
+
+        Args:
+            system_prompt: Instructions for the model
+            conversation_history: Messages not covered by the summary, oldest first
+            user_message: The customer's new message
+            summary: Rolling summary of the messages before ``conversation_history``
+
+        Returns:
+            Chat messages, system prompt first
+        """
+        if summary:
+            system_prompt = f"{system_prompt}\n\n{SUMMARY_HEADER}\n{summary}"
+        head = [{"role": "system", "content": system_prompt}]
+        tail = [{"role": "user", "content": user_message}]
+        budget = self.max_prompt_tokens - count_message_tokens(head + tail) if self.max_prompt_tokens else None
+
+        recent = conversation_history[-self.max_history_messages:] if self.max_history_messages > 0 else []
+        history = []
+        for message in reversed(recent):
+            if budget is not None:
+                budget -= MESSAGE_OVERHEAD_TOKENS + count_tokens(message.content)
+                if budget < 0:
+                    break
+            history.append({"role": "user" if message.role == "user" else "assistant", "content": message.content})
+        history.reverse()
+        return head + history + tail
@@ -0,0 +1,100 @@
+"""Build and cache the configured provider for each tenant."""
+import logging
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from app.config.settings import settings
+from app.services.llm.base import LLMProvider
+from app.services.llm.gemini import GEMINI_BASE_URL, GeminiProvider
+from app.services.llm.openai_compatible import OpenAICompatibleProvider
+from app.services.llm.stub import LocalStubProvider
+
+logger = logging.getLogger(__name__)
+
+PROVIDERS = ("openai", "openrouter", "gemini", "local")
+
+OPENAI_BASE_URL = "https://api.openai.com/v1"
+OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
+
+# Frozen provider config -> provider, or None when it cannot be used
+_providers: Dict[Tuple, Optional[LLMProvider]] = {}
+_lock = threading.Lock()
+
+
+def provider_config(tenant_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Resolve the provider settings for a tenant.
+
+    Entries of ``AI_TENANT_PROVIDERS[tenant_id]`` (``provider``, ``model``,
+    ``base_url``, ``api_key``) override the global ``AI_*`` settings.
+
+    Args:
+        tenant_id: The tenant identifier, or None for the defaults
+
+    Returns:
+        The merged configuration
+    """
+    config = {
+        "provider": settings.AI_PROVIDER,
+        "model": settings.AI_MODEL,
+        "base_url": settings.AI_BASE_URL,
+        "api_key": None,
+    }
+    if tenant_id:
+        config.update(settings.AI_TENANT_PROVIDERS.get(tenant_id, {}))
+    return config
+
+
+def get_llm_provider(tenant_id: Optional[str] = None) -> Optional[LLMProvider]:
+    """
+    Return the provider configured for a tenant.
+
+    Providers are cached per configuration, so tenants with the same settings
+    share one instance, and all instances share the pooled HTTP clients.
+
+    Args:
+        tenant_id: The tenant identifier, or None for the defaults
+
+    Returns:
+        The provider, or None if it is unknown or has no API key configured
+    """
+    config = provider_config(tenant_id)
+    key = tuple(sorted(config.items()))
+    with _lock:
+        if key not in _providers:
+            _providers[key] = _build_provider(config)
+        return _providers[key]
+
+
+def _build_provider(config: Dict[str, Any]) -> Optional[LLMProvider]:
+    name = config["provider"]
+    model = config["model"]
+    base_url = config["base_url"]
+    if name == "local":
+        return LocalStubProvider(model, latency_seconds=settings.AI_STUB_LATENCY_MS / 1000.0)
+    if name not in PROVIDERS:
+        logger.warning(f"Unknown AI provider {name!r}, using canned replies")
+        return None
+
+    api_key = config["api_key"] or {
+        "openai": settings.OPENAI_API_KEY,
+        "openrouter": settings.OPENROUTER_API_KEY,
+        "gemini": settings.GEMINI_API_KEY,
+    }[name]
+    # A base URL override (e.g. a local stand-in server) may not need a key.
+    if not api_key and not base_url:
+        logger.warning(f"No API key configured for AI provider {name}, using canned replies")
+        return None
+    if name == "gemini":
+        return GeminiProvider(
+            model,
+            api_key=api_key,
+            base_url=base_url or GEMINI_BASE_URL,
+            thinking_budget=settings.AI_GEMINI_THINKING_BUDGET
+        )
+    if name == "openrouter":
+        return OpenAICompatibleProvider(
+            "openrouter", base_url or OPENROUTER_BASE_URL, model, api_key,
+            extra_headers={"X-Title": settings.PROJECT_NAME}
+        )
+    return OpenAICompatibleProvider("openai", base_url or OPENAI_BASE_URL, model, api_key)
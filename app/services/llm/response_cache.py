@@ -0,0 +1,222 @@
+"""Bounded per-tenant cache of LLM responses to repeated messages."""
+import hashlib
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from app.models.lead import Message
+
+_WHITESPACE = re.compile(r"\s+")
+_EDGE_PUNCTUATION = " \t\n.,!?;:¡¿\"'`~-_*()[]{}"
+
+
+def normalize_message(text: str) -> str:
+    """
+    Reduce a message to the form used for cache lookups.
+
+    Case, Unicode compatibility forms, runs of whitespace and surrounding
+    punctuation are ignored, so "Hi!", "hi" and " HI " share an entry.
+
+    Args:
+        text: The customer's message
+
+    Returns:
+        The normalized message
+    """
+    text = unicodedata.normalize("NFKC", text).lower()
+    return _WHITESPACE.sub(" ", text).strip(_EDGE_PUNCTUATION)
+
+
+def history_fingerprint(conversation_history: List[Message], turns: int) -> str:
+    """
+    Hash the last messages of a conversation.
+
+    Args:
+        conversation_history: Earlier messages of the conversation
+        turns: How many of the most recent messages to include (0 ignores history)
+
+    Returns:
+        A short hex digest; empty for an empty window
+    """
+    recent = conversation_history[-turns:] if turns > 0 else []
+    if not recent:
+        return ""
+    digest = hashlib.blake2b(digest_size=8)
+    for message in recent:
+        digest.update(f"{message.role}\x00{normalize_message(message.content)}\x01".encode("utf-8"))
+    return digest.hexdigest()
+
+
+class _TenantPartition:
+    def __init__(self):
+        self.entries: "OrderedDict[Hashable, Tuple[float, Any, int]]" = OrderedDict()
+
+
+class LLMResponseCache:
+    """
+    LRU + TTL cache mapping a normalized message in context to the model's response.
+
+    Only opted-in tenants are cached, each in its own partition. Keys combine
+    the kind of call, the model, the prompt version, a fingerprint of the
+    recent history and the normalized message, so a prompt or model change
+    never serves stale responses. Each entry remembers the estimated tokens
+    the call used, which is added to ``tokens_saved`` on every hit.
+    """
+
+    def __init__(
+        self,
+        tenants: Iterable[str] = (),
+        max_entries_per_tenant: int = 512,
+        ttl_seconds: float = 3600.0,
+        history_turns: int = 2,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            tenants: Tenants whose responses are cached; "*" enables every tenant
+            max_entries_per_tenant: Maximum cached responses per tenant (0 disables caching)
+            ttl_seconds: Seconds an entry stays valid (0 means no expiry)
+            history_turns: Recent messages included in the key
+            clock: Monotonic time source, overridable for tests
+        """
+        self.tenants = frozenset(tenants)
+        self.max_entries_per_tenant = max_entries_per_tenant
+        self.ttl_seconds = ttl_seconds
+        self.history_turns = history_turns
+        self._clock = clock
+        self._partitions: Dict[str, _TenantPartition] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.tokens_saved = 0
+
+    def enabled_for(self, tenant_id: Optional[str]) -> bool:
+        """Whether responses for a tenant are cached."""
+        return (
+            bool(tenant_id)
+            and self.max_entries_per_tenant > 0
+            and ("*" in self.tenants or tenant_id in self.tenants)
+        )
+
+    def key(
+        self,
+        kind: str,
+        model: str,
+        prompt_version: str,
+        message: str,
+        conversation_history: List[Message]
+    ) -> Tuple[str, ...]:
+        """
+        Build the cache key of a call.
+
+        Args:
+            kind: What the call produces, e.g. "reply" or "intent"
+            model: Provider and model answering the call
+            prompt_version: Version of the prompts the call is built from
+            message: The customer's message
+            conversation_history: Earlier messages of the conversation
+
+        Returns:
+            Hashable key
+        """
+        return (
+            kind,
+            model,
+            prompt_version,
+            history_fingerprint(conversation_history, self.history_turns),
+            normalize_message(message),
+        )
+
+    def get(self, tenant_id: Optional[str], key: Hashable) -> Optional[Any]:
+        """
+        Look up a cached response.
+
+        Args:
+            tenant_id: The tenant identifier
+            key: Key from ``key``
+
+        Returns:
+            The cached response, or None on a miss or for tenants that are not cached
+        """
+        if not self.enabled_for(tenant_id):
+            return None
+        with self._lock:
+            partition = self._partitions.get(tenant_id)
+            entry = partition.entries.get(key) if partition is not None else None
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value, tokens = entry
+            if expires_at and expires_at <= self._clock():
+                del partition.entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            partition.entries.move_to_end(key)
+            self.hits += 1
+            self.tokens_saved += tokens
+            return value
+
+    def put(self, tenant_id: Optional[str], key: Hashable, value: Any, tokens: int):
+        """
+        Store a response.
+
+        Args:
+            tenant_id: The tenant identifier
+            key: Key from ``key``
+            value: The response; treated as immutable
+            tokens: Estimated prompt and completion tokens of the call
+        """
+        if not self.enabled_for(tenant_id):
+            return
+        expires_at = self._clock() + self.ttl_seconds if self.ttl_seconds else 0.0
+        with self._lock:
+            partition = self._partitions.get(tenant_id)
+            if partition is None:
+                partition = self._partitions[tenant_id] = _TenantPartition()
+            partition.entries[key] = (expires_at, value, tokens)
+            partition.entries.move_to_end(key)
+            while len(partition.entries) > self.max_entries_per_tenant:
+                partition.entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, tenant_id: str):
+        """Drop every cached response for a tenant."""
+        with self._lock:
+            self._partitions.pop(tenant_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit, miss, eviction and tokens-saved counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "tenants": len(self._partitions),
+                "entries": sum(len(partition.entries) for partition in self._partitions.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "tokens_saved": self.tokens_saved,
+            }
+
+
+@lru_cache(maxsize=None)
+def get_llm_response_cache() -> LLMResponseCache:
+    """Return the process-wide response cache configured from settings."""
+    from app.config.settings import settings
+
+    return LLMResponseCache(
+        tenants=settings.AI_RESPONSE_CACHE_TENANTS,
+        max_entries_per_tenant=settings.AI_RESPONSE_CACHE_SIZE,
+        ttl_seconds=settings.AI_RESPONSE_CACHE_TTL_SECONDS,
+        history_turns=settings.AI_RESPONSE_CACHE_HISTORY_TURNS
+    )
@@ -0,0 +1,89 @@
+"""Coalescing of identical LLM calls that are in flight at the same time."""
+import asyncio
+import hashlib
+import json
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, TypeVar
+
+from app.services.llm.base import ChatMessage, LLMProvider
+
+T = TypeVar("T")
+
+
+def request_key(provider: LLMProvider, messages: List[ChatMessage], **parameters) -> Hashable:
+    """
+    Identify a fully built provider request.
+
+    Providers are cached per configuration, so calls through the same
+    instance use the same endpoint, model and API key.
+
+    Args:
+        provider: The provider the request is sent to
+        messages: The request's chat messages
+        **parameters: Generation parameters, e.g. ``max_tokens``
+
+    Returns:
+        Hashable key, equal for identical requests to the same provider
+    """
+    payload = json.dumps([messages, parameters], sort_keys=True, ensure_ascii=False)
+    return id(provider), hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SingleFlight:
+    """
+    Lets concurrent callers of the same call share one execution.
+
+    The first caller of a key starts the call as a task; callers arriving
+    while it runs await the same task and get its result or exception. The
+    task is shielded, so a caller giving up (e.g. on its own timeout) does
+    not cancel the call for the others. Nothing is kept once the call ends:
+    this collapses duplicates in flight, it is not a cache.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, "asyncio.Task[Any]"] = {}
+        self.calls = 0
+        self.deduplicated = 0
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run ``call``, or join the identical call already in flight.
+
+        Args:
+            key: Identity of the call, e.g. from ``request_key``
+            call: Starts the call; only invoked if none is in flight for ``key``
+
+        Returns:
+            The call's result
+        """
+        self.calls += 1
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(call())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._finished(key, done))
+        else:
+            self.deduplicated += 1
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return call and deduplication counters."""
+        return {
+            "calls": self.calls,
+            "deduplicated": self.deduplicated,
+            "dedupe_rate": self.deduplicated / self.calls if self.calls else 0.0,
+            "in_flight": len(self._calls),
+        }
+
+    def _finished(self, key: Hashable, task: "asyncio.Task[Any]"):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            # Retrieve the exception even if every caller gave up on the call.
+            task.exception()
+
+
+@lru_cache(maxsize=None)
+def get_llm_singleflight() -> SingleFlight:
+    """Return the process-wide singleflight group for LLM calls."""
+    return SingleFlight()
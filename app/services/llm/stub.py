@@ -0,0 +1,82 @@
+"""Deterministic in-process provider for tests, demos and load tests."""
+import asyncio
+import json
+import zlib
+import re
+from typing import AsyncIterator, List
+
+from app.services.llm.base import ChatMessage, LLMProvider
+
+STUB_REPLIES = (
+    "Thanks for reaching out! Which product are you interested in?",
+    "Happy to help! Could you tell me a bit more about what you need?",
+    "Great question! May I have your name so I can assist you better?",
+)
+_HOT_WORDS = ("buy", "order", "purchase", "price", "now")
+_WARM_WORDS = ("interested", "maybe", "considering", "info", "more")
+_WORD_PATTERN = re.compile(r"\S+\s*")
+
+
+class LocalStubProvider(LLMProvider):
+    """
+    Answers without any network call.
+
+    The reply depends only on the last user message, so runs are
+    reproducible. Intent-classifier prompts get a keyword-based label and
+    JSON mode gets ``{"reply", "intent"}``. An optional fixed latency makes
+    it usable as a stand-in for a real provider in load tests.
+    """
+
+    name = "local"
+
+    def __init__(self, model: str = "stub", latency_seconds: float = 0.0):
+        """
+        Initialize the stub.
+
+        Args:
+            model: Reported model name
+            latency_seconds: Delay added to every call
+        """
+        super().__init__(model)
+        self.latency_seconds = latency_seconds
+
+    async def complete(
+        self,
+        messages: List[ChatMessage],
+        max_tokens: int = 150,
+        temperature: float = 0.7,
+        json_mode: bool = False
+    ) -> str:
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+        return self._answer(messages, json_mode)
+
+    async def stream(
+        self,
+        messages: List[ChatMessage],
+        max_tokens: int = 150,
+        temperature: float = 0.7
+    ) -> AsyncIterator[str]:
+        """Yield the reply word by word, spreading the latency across the words."""
+        words = _WORD_PATTERN.findall(self._answer(messages, json_mode=False))
+        for word in words:
+            if self.latency_seconds:
+                await asyncio.sleep(self.latency_seconds / len(words))
+            yield word
+
+    def _answer(self, messages: List[ChatMessage], json_mode: bool) -> str:
+        last = next((m["content"] for m in reversed(messages) if m["role"] == "user"), "")
+        lowered = last.lower()
+        if any(word in lowered for word in _HOT_WORDS):
+            intent = "HOT"
+        elif any(word in lowered for word in _WARM_WORDS):
+            intent = "WARM"
+        else:
+            intent = "COLD"
+        system = messages[0]["content"].lower() if messages and messages[0]["role"] == "system" else ""
+        if "intent classifier" in system:
+            return intent
+        reply = STUB_REPLIES[zlib.crc32(last.encode("utf-8")) % len(STUB_REPLIES)]
+        if json_mode:
+            return json.dumps({"reply": reply, "intent": intent})
+        return reply
@@ -0,0 +1,66 @@
+"""Local token counting for prompt budgets and usage estimates."""
+import logging
+import re
+from functools import lru_cache
+from typing import List, Optional
+
+from app.services.llm.base import ChatMessage
+
+try:
+    import tiktoken
+except ImportError:  # counts fall back to an approximation
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+# Chat formatting tokens added around each message, and priming the reply
+MESSAGE_OVERHEAD_TOKENS = 4
+REPLY_PRIMING_TOKENS = 2
+
+_PIECES = re.compile(r"\w+|[^\w\s]")
+
+
+@lru_cache(maxsize=1)
+def _encoding() -> Optional["tiktoken.Encoding"]:
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:  # the BPE file could not be loaded or downloaded
+        logger.warning(f"tiktoken encoding unavailable, approximating token counts: {e}")
+        return None
+
+
+@lru_cache(maxsize=8192)
+def count_tokens(text: str) -> int:
+    """
+    Count the tokens of a text.
+
+    Uses tiktoken's cl100k_base encoding when it is installed, otherwise an
+    approximation of one token per punctuation mark and per four characters
+    of each word. Counts are memoized, since the same history messages are
+    counted again on every turn of a conversation.
+
+    Args:
+        text: Any text
+
+    Returns:
+        Number of tokens
+    """
+    encoding = _encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return sum((len(piece) + 3) // 4 for piece in _PIECES.findall(text))
+
+
+def count_message_tokens(messages: List[ChatMessage]) -> int:
+    """
+    Count the prompt tokens of chat messages, including per-message formatting.
+
+    Args:
+        messages: Chat messages
+
+    Returns:
+        Number of prompt tokens
+    """
+    return sum(MESSAGE_OVERHEAD_TOKENS + count_tokens(message["content"]) for message in messages) + REPLY_PRIMING_TOKENS
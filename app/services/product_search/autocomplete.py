@@ -0,0 +1,130 @@
+"""Sorted-array prefix index for as-you-type product suggestions."""
+import heapq
+import math
+from bisect import bisect_left
+from typing import Any, Dict, List, Tuple
+
+from app.services.product_search.catalog import TenantCatalog
+from app.services.product_search.facets import get_catalog_facets
+from app.services.product_search.text import tokenize
+
+# Prefixes up to this length have their top suggestions precomputed, because
+# their key ranges are too wide to scan per keystroke.
+BUCKET_PREFIX_LENGTH = 3
+BUCKET_SIZE = 20
+# Longer prefixes are ranked on first use and remembered, up to this many.
+MEMO_SIZE = 4096
+
+PRODUCT = "product"
+CATEGORY = "category"
+
+
+class SuggestionIndex:
+    """
+    Prefix index over normalized product names and category terms.
+
+    Every word suffix of a product name is a key ("cerave foaming cleanser",
+    "foaming cleanser", "cleanser"), so typing any word of a name finds it.
+    Keys live in one sorted list; a prefix maps to a contiguous key range found
+    with two bisects. Short prefixes, whose ranges cover much of the catalog,
+    are answered from precomputed top-k buckets instead, and longer ones are
+    ranked once and memoized.
+    """
+
+    def __init__(self, catalog: TenantCatalog):
+        """
+        Build the prefix index for a catalog snapshot.
+
+        Args:
+            catalog: The catalog snapshot
+        """
+        facets = get_catalog_facets(catalog)
+        entries: List[Tuple[str, float, str, Any]] = []
+
+        for doc_id, name in enumerate(catalog.columns['name']):
+            # Featured products first, then in-stock ones.
+            score = 2.0 * (doc_id in facets.featured) + 1.0 * (doc_id in facets.in_stock)
+            tokens = tokenize(name)
+            for start in range(len(tokens)):
+                entries.append((" ".join(tokens[start:]), score, PRODUCT, doc_id))
+
+        for category, doc_ids in facets.categories.items():
+            score = min(4.0, 1.0 + math.log10(1 + len(doc_ids)))
+            tokens = tokenize(category)
+            for start in range(len(tokens)):
+                entries.append((" ".join(tokens[start:]), score, CATEGORY, category))
+
+        entries.sort(key=lambda entry: entry[0])
+        self.keys = [entry[0] for entry in entries]
+        self.scores = [entry[1] for entry in entries]
+        self.targets = [(entry[2], entry[3]) for entry in entries]
+
+        self.buckets: Dict[str, List[int]] = {}
+        heaps: Dict[str, List[Tuple[float, int, int]]] = {}
+        for position, key in enumerate(self.keys):
+            rank = self._rank(position)
+            for length in range(1, min(len(key), BUCKET_PREFIX_LENGTH) + 1):
+                heap = heaps.setdefault(key[:length], [])
+                # Keep spare entries, since one product can own several keys
+                # under the same prefix and duplicates are dropped at query time.
+                if len(heap) < BUCKET_SIZE * 2:
+                    heapq.heappush(heap, rank)
+                elif rank > heap[0]:
+                    heapq.heapreplace(heap, rank)
+        for prefix, heap in heaps.items():
+            self.buckets[prefix] = [-item[2] for item in sorted(heap, reverse=True)]
+        self._memo: Dict[str, List[int]] = {}
+
+    def _rank(self, position: int) -> Tuple[float, int, int]:
+        # Higher score first, then shorter (more specific) keys, then key order.
+        return (self.scores[position], -len(self.keys[position]), -position)
+
+    def _range(self, prefix: str) -> range:
+        low = bisect_left(self.keys, prefix)
+        high = bisect_left(self.keys, prefix + "\uffff", low)
+        return range(low, high)
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[Tuple[str, Any]]:
+        """
+        Return the best targets whose key starts with a prefix.
+
+        Args:
+            prefix: Text typed so far
+            limit: Maximum number of suggestions
+
+        Returns:
+            ``(kind, target)`` pairs, where target is a document position for
+            products and the normalized category for categories
+        """
+        normalized = " ".join(tokenize(prefix))
+        if not normalized:
+            return []
+
+        if len(normalized) <= BUCKET_PREFIX_LENGTH:
+            positions = self.buckets.get(normalized, [])
+        else:
+            positions = self._memo.get(normalized)
+            if positions is None:
+                positions = heapq.nlargest(
+                    max(limit, BUCKET_SIZE) * 2, self._range(normalized), key=self._rank
+                )
+                if len(self._memo) >= MEMO_SIZE:
+                    self._memo.clear()
+                self._memo[normalized] = positions
+
+        suggestions = []
+        seen = set()
+        for position in positions:
+            target = self.targets[position]
+            if target in seen:
+                continue
+            seen.add(target)
+            suggestions.append(target)
+            if len(suggestions) >= limit:
+                break
+        return suggestions
+
+
+def get_suggestion_index(catalog: TenantCatalog) -> SuggestionIndex:
+    """Return the prefix index of a catalog snapshot, building it on first use."""
+    return catalog.derived("suggest", SuggestionIndex)
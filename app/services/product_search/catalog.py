@@ -0,0 +1,247 @@
+"""Immutable snapshot of a single tenant's product catalog."""
+import os
+import sys
+import threading
+import time
+from array import array
+from collections import Counter
+from typing import Callable, List, Dict, Any, Mapping, Optional, Sequence, Tuple
+
+from app.services.product_search.text import tokenize
+
+# Searchable fields in posting order: (field name, source keys in priority order).
+SEARCH_FIELDS: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ("name", ("Name",)),
+    ("categories", ("Categories",)),
+    ("brand", ("Brand", "Brands")),
+    ("description", ("Description",)),
+)
+FIELD_IDS: Dict[str, int] = {name: field_id for field_id, (name, _) in enumerate(SEARCH_FIELDS)}
+
+# Columns kept alongside the searchable fields for lookups that should not
+# have to decode whole product records.
+LOOKUP_COLUMNS: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ("id", ("ID",)),
+    ("sale_price", ("Sale price",)),
+    ("regular_price", ("Regular price",)),
+    ("in_stock", ("In stock?",)),
+    ("featured", ("Is featured?",)),
+    ("sku", ("SKU",)),
+)
+
+
+def _field_value(product: Dict[str, Any], keys: Tuple[str, ...]) -> str:
+    for key in keys:
+        value = product.get(key)
+        if value not in (None, ''):
+            return str(value)
+    return ''
+
+
+def build_search_columns(products: Sequence[Dict[str, Any]]) -> Dict[str, List[str]]:
+    """
+    Extract the lowercased search columns from product records.
+
+    Args:
+        products: Sequence of product dictionaries
+
+    Returns:
+        Mapping of column name to one string per product
+    """
+    columns = {}
+    for name, keys in SEARCH_FIELDS:
+        columns[name] = [_field_value(product, keys).lower() for product in products]
+    for name, keys in LOOKUP_COLUMNS:
+        columns[name] = [_field_value(product, keys) for product in products]
+    return columns
+
+
+def product_columns(product: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Extract one product's values for every search and lookup column.
+
+    Args:
+        product: Product dictionary
+
+    Returns:
+        Mapping of column name to the product's value, as ``build_search_columns`` stores it
+    """
+    values = {name: _field_value(product, keys).lower() for name, keys in SEARCH_FIELDS}
+    values.update((name, _field_value(product, keys)) for name, keys in LOOKUP_COLUMNS)
+    return values
+
+
+def index_document(index: Dict[str, array], doc_id: int, fields: Mapping[str, str]):
+    """
+    Append one document's postings to an inverted index.
+
+    Documents must be added in increasing ``doc_id`` order so that every
+    posting list stays ordered by document.
+
+    Args:
+        index: Index being built, as returned by ``build_inverted_index``
+        doc_id: Position of the document
+        fields: The document's lowercased search field values
+    """
+    for name, _ in SEARCH_FIELDS:
+        field_id = FIELD_IDS[name]
+        for term, frequency in Counter(tokenize(fields[name])).items():
+            postings = index.get(term)
+            if postings is None:
+                postings = index[term] = array('I')
+            postings.extend((doc_id, field_id, frequency))
+
+
+def build_inverted_index(columns: Mapping[str, Sequence[str]]) -> Dict[str, array]:
+    """
+    Build a field-aware inverted index over the search columns.
+
+    Each posting list is a flat ``array('I')`` of ``(doc_id, field_id, term_frequency)``
+    triples ordered by document, which keeps the index compact and lets it be
+    written to and read from a compiled catalog without conversion.
+
+    Args:
+        columns: Search columns as returned by ``build_search_columns``
+
+    Returns:
+        Mapping of term to its posting triples
+    """
+    index: Dict[str, array] = {}
+    doc_count = len(columns[SEARCH_FIELDS[0][0]])
+    for doc_id in range(doc_count):
+        index_document(index, doc_id, {name: columns[name][doc_id] for name, _ in SEARCH_FIELDS})
+    return index
+
+
+def estimate_catalog_size(products: List[Dict[str, Any]]) -> int:
+    """
+    Roughly estimate the heap footprint of a parsed catalog.
+
+    Args:
+        products: List of product dictionaries as returned by ``json.load``
+
+    Returns:
+        Approximate size in bytes (dicts plus their values; keys are shared
+        by the JSON decoder so they are not counted per product)
+    """
+    total = sys.getsizeof(products)
+    for product in products:
+        total += sys.getsizeof(product)
+        for value in product.values():
+            total += sys.getsizeof(value)
+    return total
+
+
+def _estimate_index_size(columns: Mapping[str, Sequence[str]], index: Mapping[str, array]) -> int:
+    total = 0
+    for values in columns.values():
+        total += sys.getsizeof(values) + sum(sys.getsizeof(value) for value in values)
+    total += sys.getsizeof(index)
+    for term, postings in index.items():
+        total += sys.getsizeof(term) + sys.getsizeof(postings)
+    return total
+
+
+class TenantCatalog:
+    """
+    A loaded product catalog for one tenant.
+
+    Instances are treated as read-only once built so that they can be shared
+    between concurrent searches without locking. ``products``, ``columns`` and
+    ``index`` only need to behave as sequences/mappings, so a catalog can be
+    backed either by parsed JSON or by a memory-mapped compiled artifact.
+    """
+
+    def __init__(
+        self,
+        tenant_id: str,
+        products: Sequence[Dict[str, Any]],
+        source_path: Optional[str] = None,
+        version: int = 1,
+        source_signature: Optional[Tuple[int, int]] = None,
+        columns: Optional[Mapping[str, Sequence[str]]] = None,
+        index: Optional[Mapping[str, Sequence[int]]] = None,
+        size_bytes: Optional[int] = None,
+        precomputed: Optional[Dict[str, Dict[str, Any]]] = None
+    ):
+        """
+        Initialize the catalog snapshot.
+
+        Args:
+            tenant_id: The tenant identifier
+            products: Sequence of product dictionaries
+            source_path: File the products were loaded from, if any
+            version: Catalog version, bumped every time the tenant's catalog changes
+            source_signature: ``(mtime_ns, size)`` of the source file when it was read
+            columns: Prebuilt search columns; built from ``products`` when omitted
+            index: Prebuilt inverted index; built from the columns when omitted
+            size_bytes: Memory attributed to the catalog; estimated when omitted
+            precomputed: Derived structures stored in a compiled artifact, by
+                name, each with the ``params`` it was built with and its raw
+                buffers; used instead of rebuilding when the params match
+        """
+        self.tenant_id = tenant_id
+        self.products = products
+        self.source_path = source_path
+        self.version = version
+        self.source_signature = source_signature
+        self.columns = columns if columns is not None else build_search_columns(products)
+        self.index = index if index is not None else build_inverted_index(self.columns)
+        if size_bytes is None:
+            size_bytes = estimate_catalog_size(products) + _estimate_index_size(self.columns, self.index)
+        self.size_bytes = size_bytes
+        self.precomputed = precomputed or {}
+        self.loaded_at = time.time()
+        self._derived: Dict[str, Any] = {}
+        # Re-entrant: a factory may build the structures it depends on.
+        self._derived_lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self.products)
+
+    def product(self, doc_id: int) -> Dict[str, Any]:
+        """Return the product record stored at a document position."""
+        return self.products[doc_id]
+
+    def postings(self, term: str) -> Sequence[int]:
+        """Return the flat ``(doc_id, field_id, tf)`` posting triples for a term."""
+        return self.index.get(term, ())
+
+    def derived(self, name: str, factory: Callable[["TenantCatalog"], Any]) -> Any:
+        """
+        Return a structure derived from this snapshot, building it on first use.
+
+        Derived structures (facet tables, ranking statistics, ...) live and die
+        with the snapshot, so a reload never serves them stale.
+
+        Args:
+            name: Key identifying the structure
+            factory: Builds the structure from the catalog
+
+        Returns:
+            The cached structure
+        """
+        value = self._derived.get(name)
+        if value is None:
+            with self._derived_lock:
+                value = self._derived.get(name)
+                if value is None:
+                    value = self._derived[name] = factory(self)
+        return value
+
+
+def file_signature(file_path: str) -> Optional[Tuple[int, int]]:
+    """
+    Return a cheap change-detection signature for a catalog file.
+
+    Args:
+        file_path: Path to the catalog file
+
+    Returns:
+        ``(mtime_ns, size)`` or None if the file does not exist
+    """
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
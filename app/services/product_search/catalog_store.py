@@ -0,0 +1,414 @@
+"""Lazy, memory-bounded cache of tenant product catalogs."""
+import os
+import threading
+import logging
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Dict, Any, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: compiles are not serialized across processes
+    fcntl = None
+
+from app.services.product_search.catalog import TenantCatalog, file_signature
+from app.services.product_search.compiler import COMPILED_EXTENSION, compile_catalog_file, load_compiled_catalog
+
+logger = logging.getLogger(__name__)
+
+
+def is_valid_tenant_id(tenant_id: str) -> bool:
+    """
+    Check that a tenant id can safely be used as a catalog file name.
+
+    Args:
+        tenant_id: The tenant identifier
+
+    Returns:
+        True if the id contains no path components
+    """
+    return bool(tenant_id) and os.path.basename(tenant_id) == tenant_id and not tenant_id.startswith('.')
+
+
+class CatalogStore:
+    """
+    Loads tenant catalogs on first use and keeps the most recently used ones in memory.
+
+    When the total estimated size of the loaded catalogs exceeds the memory
+    budget, the least recently used catalogs are evicted. An evicted catalog is
+    simply loaded again on the tenant's next search.
+
+    A tenant's catalog is read from its compiled ``.pscat`` artifact when one
+    exists and is at least as new as the JSON file, otherwise from the JSON.
+
+    Catalogs are immutable snapshots: a reload builds a new ``TenantCatalog``
+    and swaps it in under the lock, so searches that already hold the old
+    snapshot finish against it undisturbed.
+
+    With ``compile_catalogs``, a JSON catalog is compiled into the shared
+    artifact the first time any worker process loads it, under an exclusive
+    file lock, and every process then maps that one artifact. A recompile
+    renames a new file into place, so processes still mapping the previous
+    version keep reading it until their watcher swaps them over.
+
+    Uploaded catalogs and catalog edits are published the same way, as a new
+    artifact under the same lock (see ``publish``). A tenant's JSON file that
+    is modified afterwards takes precedence again, as it is then newer.
+    """
+
+    def __init__(
+        self,
+        data_directory: str,
+        loader: Callable[[str], List[Dict[str, Any]]],
+        memory_budget_bytes: int = 0,
+        compile_catalogs: bool = False
+    ):
+        """
+        Initialize the store.
+
+        Args:
+            data_directory: Directory where product JSON files are stored
+            loader: Callable that parses a catalog file into a list of products,
+                raising on unreadable files
+            memory_budget_bytes: Maximum estimated size of loaded catalogs (0 means unlimited)
+            compile_catalogs: Compile JSON catalogs to shared ``.pscat`` artifacts on load
+        """
+        self.data_directory = data_directory
+        self.loader = loader
+        self.memory_budget_bytes = memory_budget_bytes
+        self.compile_catalogs = compile_catalogs
+        self._catalogs: "OrderedDict[str, TenantCatalog]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._tenant_locks: Dict[str, threading.Lock] = {}
+        self._total_bytes = 0
+        # tenant_id -> (source signature, version); kept across evictions so a
+        # catalog reloaded from an unchanged file keeps its version.
+        self._versions: Dict[str, Tuple[Optional[Tuple[int, int]], int]] = {}
+        self.hits = 0
+        self.loads = 0
+        self.evictions = 0
+        self.compiles = 0
+
+    def catalog_path(self, tenant_id: str) -> str:
+        """Return the path of a tenant's catalog JSON file."""
+        return os.path.join(self.data_directory, f"{tenant_id}.json")
+
+    def compiled_path(self, tenant_id: str) -> str:
+        """Return the path of a tenant's compiled catalog artifact."""
+        return os.path.join(self.data_directory, f"{tenant_id}{COMPILED_EXTENSION}")
+
+    def resolve_source(self, tenant_id: str) -> Optional[Tuple[str, Tuple[int, int]]]:
+        """
+        Decide which file a tenant's catalog should be loaded from.
+
+        Args:
+            tenant_id: The tenant identifier
+
+        Returns:
+            ``(path, signature)`` of the compiled artifact or JSON file, or None if neither exists
+        """
+        json_path = self.catalog_path(tenant_id)
+        compiled_path = self.compiled_path(tenant_id)
+        json_signature = file_signature(json_path)
+        compiled_signature = file_signature(compiled_path)
+        if compiled_signature is not None and (json_signature is None or compiled_signature[0] >= json_signature[0]):
+            return compiled_path, compiled_signature
+        if json_signature is not None:
+            return json_path, json_signature
+        return None
+
+    def available_tenants(self) -> List[str]:
+        """List tenants that have a catalog file on disk, loaded or not."""
+        if not os.path.exists(self.data_directory):
+            logger.warning(f"Data directory {self.data_directory} does not exist")
+            return []
+        return sorted({
+            os.path.splitext(filename)[0]
+            for filename in os.listdir(self.data_directory)
+            if filename.endswith(('.json', COMPILED_EXTENSION))
+        })
+
+    def loaded_tenants(self) -> List[str]:
+        """List tenants whose catalogs are currently in memory, coldest first."""
+        with self._lock:
+            return list(self._catalogs.keys())
+
+    def get(self, tenant_id: str) -> Optional[TenantCatalog]:
+        """
+        Get a tenant's catalog, loading it from disk on first use.
+
+        Args:
+            tenant_id: The tenant identifier
+
+        Returns:
+            The catalog, or None if the tenant has no catalog file
+        """
+        with self._lock:
+            catalog = self._catalogs.get(tenant_id)
+            if catalog is not None:
+                self._catalogs.move_to_end(tenant_id)
+                self.hits += 1
+                return catalog
+        tenant_lock = self._tenant_lock(tenant_id)
+        if tenant_lock is None:
+            return None
+
+        # Only one thread parses a given catalog; others wait for its result.
+        with tenant_lock:
+            with self._lock:
+                catalog = self._catalogs.get(tenant_id)
+                if catalog is not None:
+                    self._catalogs.move_to_end(tenant_id)
+                    self.hits += 1
+                    return catalog
+
+            catalog = self._load(tenant_id)
+            if catalog is None:
+                return None
+            self._insert(catalog)
+            return catalog
+
+    def reload(self, tenant_id: str) -> Optional[TenantCatalog]:
+        """
+        Re-read a tenant's catalog file and swap in the new snapshot.
+
+        If the file cannot be parsed, the current snapshot is kept.
+
+        Args:
+            tenant_id: The tenant identifier
+
+        Returns:
+            The catalog now being served, or None if the tenant has no catalog file
+        """
+        tenant_lock = self._tenant_lock(tenant_id)
+        if tenant_lock is None:
+            self.evict(tenant_id)
+            return None
+        with tenant_lock:
+            try:
+                catalog = self._load(tenant_id, raise_errors=True)
+            except Exception as e:
+                logger.error(f"Keeping previous catalog for tenant {tenant_id}, reload failed: {e}")
+                with self._lock:
+                    return self._catalogs.get(tenant_id)
+            if catalog is None:
+                self.evict(tenant_id)
+                return None
+            self._insert(catalog)
+            logger.info(f"Reloaded product catalog for tenant {tenant_id} (version {catalog.version})")
+            return catalog
+
+    def changed_tenants(self) -> List[str]:
+        """List loaded tenants whose catalog source changed since it was read."""
+        with self._lock:
+            loaded = [
+                (tenant_id, (catalog.source_path, catalog.source_signature))
+                for tenant_id, catalog in self._catalogs.items()
+            ]
+        return [tenant_id for tenant_id, source in loaded if self.resolve_source(tenant_id) != source]
+
+    def version(self, tenant_id: str) -> int:
+        """
+        Return the current catalog version for a tenant.
+
+        Args:
+            tenant_id: The tenant identifier
+
+        Returns:
+            The version of the most recently loaded catalog, or 0 if it was never loaded
+        """
+        with self._lock:
+            return self._versions.get(tenant_id, (None, 0))[1]
+
+    def prewarm(self, tenant_ids: Iterable[str]):
+        """
+        Load a list of hot tenants ahead of their first search.
+
+        Args:
+            tenant_ids: Tenants to load, in order of increasing priority
+        """
+        for tenant_id in tenant_ids:
+            if self.get(tenant_id) is None:
+                logger.warning(f"Cannot prewarm catalog for tenant {tenant_id}: no catalog file")
+
+    def evict(self, tenant_id: str) -> bool:
+        """
+        Drop a tenant's catalog from memory.
+
+        Args:
+            tenant_id: The tenant identifier
+
+        Returns:
+            True if the catalog was loaded
+        """
+        with self._lock:
+            catalog = self._catalogs.pop(tenant_id, None)
+            if catalog is None:
+                return False
+            self._total_bytes -= catalog.size_bytes
+            return True
+
+    def stats(self) -> Dict[str, Any]:
+        """Return counters describing the store's current state."""
+        with self._lock:
+            return {
+                "loaded_tenants": len(self._catalogs),
+                "loaded_bytes": self._total_bytes,
+                "memory_budget_bytes": self.memory_budget_bytes,
+                "hits": self.hits,
+                "loads": self.loads,
+                "evictions": self.evictions,
+                "compiles": self.compiles,
+            }
+
+    def _tenant_lock(self, tenant_id: str) -> Optional[threading.Lock]:
+        """Return the lock serializing a tenant's loads, or None if the tenant has no catalog to load."""
+        # Checked first: tenant ids come from requests, and a lock per unknown
+        # id would grow the map without bound.
+        if not is_valid_tenant_id(tenant_id):
+            logger.warning(f"Refusing to load catalog for invalid tenant id {tenant_id!r}")
+            return None
+        if self.resolve_source(tenant_id) is None:
+            return None
+        with self._lock:
+            return self._tenant_locks.setdefault(tenant_id, threading.Lock())
+
+    def _load(self, tenant_id: str, raise_errors: bool = False) -> Optional[TenantCatalog]:
+        if not is_valid_tenant_id(tenant_id):
+            logger.warning(f"Refusing to load catalog for invalid tenant id {tenant_id!r}")
+            return None
+        # Read the signature before the contents so a write racing with the
+        # load is picked up again by the next change check.
+        source = self.resolve_source(tenant_id)
+        if source is None:
+            return None
+        file_path, signature = source
+        if self.compile_catalogs and not file_path.endswith(COMPILED_EXTENSION):
+            try:
+                source = self._compile(tenant_id) or source
+            except Exception as e:
+                # A broken JSON file fails again below, with the usual handling.
+                logger.warning(f"Could not compile catalog for tenant {tenant_id}, loading JSON: {e}")
+            file_path, signature = source
+        if file_path.endswith(COMPILED_EXTENSION):
+            try:
+                catalog = load_compiled_catalog(tenant_id, file_path, source_signature=signature)
+            except Exception as e:
+                if raise_errors:
+                    raise
+                logger.error(f"Error loading compiled catalog {file_path}, falling back to JSON: {e}")
+            else:
+                self.loads += 1
+                catalog.version = self._next_version(tenant_id, signature)
+                return catalog
+            file_path = self.catalog_path(tenant_id)
+            signature = file_signature(file_path)
+            if signature is None:
+                return None
+        try:
+            products = self.loader(file_path)
+        except Exception as e:
+            if raise_errors:
+                raise
+            logger.error(f"Error loading products from {file_path}: {e}")
+            products = []
+        self.loads += 1
+        return TenantCatalog(
+            tenant_id,
+            products,
+            source_path=file_path,
+            version=self._next_version(tenant_id, signature),
+            source_signature=signature
+        )
+
+    def publish(
+        self,
+        tenant_id: str,
+        write: Callable[[str, Optional[TenantCatalog]], Any],
+        with_previous: bool = False
+    ) -> Any:
+        """
+        Write a new compiled artifact for a tenant and swap it in.
+
+        ``write`` runs under the tenant's artifact lock, so concurrent
+        publishes and compiles, in this or other worker processes, apply one
+        after the other. Other processes pick the new artifact up through
+        their catalog watcher.
+
+        Args:
+            tenant_id: The tenant identifier
+            write: Called with the artifact path to write and, with
+                ``with_previous``, the tenant's current catalog opened from its
+                artifact (None if the tenant has no catalog)
+            with_previous: Open the current catalog for ``write``, compiling
+                the tenant's JSON file first if needed
+
+        Returns:
+            Whatever ``write`` returns
+        """
+        compiled_path = self.compiled_path(tenant_id)
+        with self._artifact_lock(tenant_id):
+            previous = None
+            if with_previous:
+                source = self.resolve_source(tenant_id)
+                if source is not None and not source[0].endswith(COMPILED_EXTENSION):
+                    compile_catalog_file(source[0], compiled_path)
+                    self.compiles += 1
+                    source = self.resolve_source(tenant_id)
+                if source is not None:
+                    previous = load_compiled_catalog(tenant_id, source[0], source_signature=source[1])
+            result = write(compiled_path, previous)
+        self.reload(tenant_id)
+        return result
+
+    @contextmanager
+    def _artifact_lock(self, tenant_id: str) -> Iterator[None]:
+        """Hold the exclusive file lock that serializes writers of a tenant's artifact."""
+        with open(f"{self.compiled_path(tenant_id)}.lock", 'a') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _compile(self, tenant_id: str) -> Optional[Tuple[str, Tuple[int, int]]]:
+        """Compile a tenant's JSON catalog unless another process already has; return the new source."""
+        with self._artifact_lock(tenant_id):
+            # Another worker may have compiled it while this one waited.
+            source = self.resolve_source(tenant_id)
+            if source is None or source[0].endswith(COMPILED_EXTENSION):
+                return source
+            compile_catalog_file(source[0], self.compiled_path(tenant_id))
+            self.compiles += 1
+            return self.resolve_source(tenant_id)
+
+    def _next_version(self, tenant_id: str, signature: Tuple[int, int]) -> int:
+        with self._lock:
+            previous_signature, version = self._versions.get(tenant_id, (None, 0))
+            if previous_signature != signature:
+                version += 1
+            self._versions[tenant_id] = (signature, version)
+            return version
+
+    def _insert(self, catalog: TenantCatalog):
+        with self._lock:
+            previous = self._catalogs.pop(catalog.tenant_id, None)
+            if previous is not None:
+                self._total_bytes -= previous.size_bytes
+            self._catalogs[catalog.tenant_id] = catalog
+            self._total_bytes += catalog.size_bytes
+            self._evict_over_budget(keep=catalog.tenant_id)
+
+    def _evict_over_budget(self, keep: str):
+        if not self.memory_budget_bytes:
+            return
+        while self._total_bytes > self.memory_budget_bytes and len(self._catalogs) > 1:
+            tenant_id, catalog = next(iter(self._catalogs.items()))
+            if tenant_id == keep:
+                break
+            del self._catalogs[tenant_id]
+            self._total_bytes -= catalog.size_bytes
+            self.evictions += 1
+            logger.info(f"Evicted product catalog for tenant {tenant_id} ({catalog.size_bytes} bytes)")
@@ -0,0 +1,223 @@
+"""Streaming catalog uploads and SKU-level catalog edits."""
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from pydantic import ValidationError
+
+from app.schemas.product_search import Product
+from app.services.product_search.catalog import TenantCatalog
+from app.services.product_search.catalog_store import CatalogStore
+from app.services.product_search.compiler import CatalogBuilder
+from app.services.product_search.json_stream import DEFAULT_MAX_ITEM_BYTES, JSONArrayParser
+
+logger = logging.getLogger(__name__)
+
+# Stop reading an upload after this many invalid products.
+MAX_REPORTED_ERRORS = 20
+
+
+class CatalogValidationError(ValueError):
+    """Raised when uploaded products do not match the ``Product`` schema."""
+
+    def __init__(self, errors: List[Dict[str, Any]]):
+        super().__init__(f"{len(errors)} invalid product(s)")
+        self.errors = errors
+
+
+def validate_product(item: Any) -> Optional[Dict[str, Any]]:
+    """
+    Check one uploaded product against the ``Product`` schema.
+
+    Args:
+        item: A decoded JSON value
+
+    Returns:
+        None if the product is valid, otherwise a JSON-serializable error report
+    """
+    if not isinstance(item, dict):
+        return {"sku": None, "errors": [{"msg": "Product must be a JSON object"}]}
+    try:
+        Product.model_validate(item)
+    except ValidationError as e:
+        return {
+            "sku": item.get("SKU"),
+            "errors": e.errors(include_url=False, include_context=False, include_input=False),
+        }
+    return None
+
+
+class CatalogUpload:
+    """
+    Replaces a tenant's catalog with products streamed in as a JSON array.
+
+    Each chunk is parsed as it arrives and every completed product is
+    validated and added to a ``CatalogBuilder``, so neither the request body
+    nor the parsed catalog is ever held in memory as a whole. The new
+    catalog is only published by ``finish`` once every product is valid;
+    until then searches keep using the current catalog.
+    """
+
+    def __init__(self, store: CatalogStore, tenant_id: str, max_item_bytes: int = DEFAULT_MAX_ITEM_BYTES):
+        """
+        Start an upload.
+
+        Args:
+            store: The store to publish the catalog to
+            tenant_id: The tenant whose catalog is replaced
+            max_item_bytes: Largest single product accepted, in bytes of JSON
+        """
+        self.store = store
+        self.tenant_id = tenant_id
+        self.errors: List[Dict[str, Any]] = []
+        self._received = 0
+        self._parser = JSONArrayParser(max_item_bytes)
+        self._builder = CatalogBuilder(store.data_directory)
+        self._started = time.perf_counter()
+
+    def feed(self, chunk: bytes):
+        """
+        Parse, validate and index the products completed by a chunk of the body.
+
+        Args:
+            chunk: Next bytes of the request body
+
+        Raises:
+            ValueError: If the body is not a well-formed JSON array
+            CatalogValidationError: Once ``MAX_REPORTED_ERRORS`` products were invalid
+        """
+        self._add(self._parser.feed(chunk))
+
+    def finish(self) -> Dict[str, Any]:
+        """
+        Complete the upload and publish the new catalog.
+
+        Returns:
+            Summary with the tenant id, product count, new catalog version and build time
+
+        Raises:
+            ValueError: If the body ended before the array was complete
+            CatalogValidationError: If any product was invalid
+        """
+        self._add(self._parser.close())
+        if self.errors:
+            raise CatalogValidationError(self.errors)
+        count = self._builder.count
+        self.store.publish(self.tenant_id, lambda path, _: self._builder.write(path, meta={"source": "upload"}))
+        elapsed = time.perf_counter() - self._started
+        logger.info(f"Published uploaded catalog for tenant {self.tenant_id}: {count} products in {elapsed:.2f}s")
+        return {
+            "tenant_id": self.tenant_id,
+            "products": count,
+            "version": self.store.version(self.tenant_id),
+            "build_seconds": round(elapsed, 3),
+        }
+
+    def close(self):
+        """Release the spooled records; safe to call after ``finish`` or on failure."""
+        self._builder.close()
+
+    def _add(self, items: List[Any]):
+        for item in items:
+            position = self._received
+            self._received += 1
+            error = validate_product(item)
+            if error is not None:
+                self.errors.append({"index": position, **error})
+                if len(self.errors) >= MAX_REPORTED_ERRORS:
+                    raise CatalogValidationError(self.errors)
+            elif not self.errors:
+                self._builder.add(item)
+
+
+def _product_sku(product: Dict[str, Any]) -> str:
+    return str(product.get("SKU") or "")
+
+
+def apply_catalog_delta(
+    store: CatalogStore,
+    tenant_id: str,
+    upserts: List[Dict[str, Any]],
+    deletes: List[str]
+) -> Dict[str, Any]:
+    """
+    Add, replace and delete products of a tenant's catalog by SKU.
+
+    The new catalog is built from the current compiled artifact: unchanged
+    products are carried over without being decoded or re-indexed, and only
+    the upserted products are validated and indexed. Replaced products move
+    to the end of the catalog order.
+
+    Args:
+        store: The store holding the tenant's catalog
+        tenant_id: The tenant identifier
+        upserts: Products to add, or to replace the products with the same SKU
+        deletes: SKUs of products to remove
+
+    Returns:
+        Summary with the counts of added, updated and deleted products, the
+        SKUs that were not found, the new product count and catalog version
+
+    Raises:
+        CatalogValidationError: If an upserted product is invalid, has no SKU,
+            a SKU is empty or whitespace, or a SKU is given more than once.
+            Nothing is applied then.
+    """
+    errors = []
+    # An empty SKU would match every product without one.
+    for position, sku in enumerate(deletes):
+        if not isinstance(sku, str) or not sku.strip():
+            errors.append({"delete_index": position, "sku": sku, "errors": [{"msg": "Deleted SKUs must not be empty"}]})
+    deleted_skus = {sku for sku in deletes if isinstance(sku, str)}
+    seen = set()
+    for position, product in enumerate(upserts):
+        error = validate_product(product)
+        if error is None and not _product_sku(product).strip():
+            error = {"sku": product.get("SKU"), "errors": [{"msg": "Upserted products need a non-empty SKU"}]}
+        if error is None and _product_sku(product) in seen:
+            error = {"sku": _product_sku(product), "errors": [{"msg": "SKU is upserted more than once"}]}
+        if error is None and _product_sku(product) in deleted_skus:
+            error = {"sku": _product_sku(product), "errors": [{"msg": "SKU is both upserted and deleted"}]}
+        if error is not None:
+            errors.append({"index": position, **error})
+        else:
+            seen.add(_product_sku(product))
+    if errors:
+        raise CatalogValidationError(errors[:MAX_REPORTED_ERRORS])
+
+    started = time.perf_counter()
+
+    def write(path: str, previous: Optional[TenantCatalog]) -> Dict[str, Any]:
+        removed = deleted_skus | seen
+        found = set()
+        kept = []
+        if previous is not None:
+            for doc_id, sku in enumerate(previous.columns["sku"]):
+                if sku in removed:
+                    found.add(sku)
+                else:
+                    kept.append(doc_id)
+        with CatalogBuilder(store.data_directory) as builder:
+            if previous is not None:
+                builder.carry_over(previous, kept)
+            for product in upserts:
+                builder.add(product)
+            builder.write(path, meta={"source": "edit"})
+            count = builder.count
+        return {
+            "tenant_id": tenant_id,
+            "products": count,
+            "added": len(seen - found),
+            "updated": len(seen & found),
+            "deleted": len(deleted_skus & found),
+            "not_found": sorted(deleted_skus - found),
+        }
+
+    summary = store.publish(tenant_id, write, with_previous=True)
+    summary["version"] = store.version(tenant_id)
+    summary["build_seconds"] = round(time.perf_counter() - started, 3)
+    logger.info(
+        f"Edited catalog for tenant {tenant_id}: {summary['added']} added, {summary['updated']} updated, "
+        f"{summary['deleted']} deleted in {summary['build_seconds']}s"
+    )
+    return summary
@@ -0,0 +1,79 @@
+"""Background hot reload of tenant catalogs whose files change on disk."""
+import threading
+import logging
+from typing import Dict, Optional, Tuple
+
+from app.services.product_search.catalog_store import CatalogStore
+
+logger = logging.getLogger(__name__)
+
+
+class CatalogWatcher:
+    """
+    Polls the catalog sources of loaded tenants and reloads the ones that changed.
+
+    A change is only acted on once the source's path and ``(mtime_ns, size)`` signature have
+    been the same for two consecutive polls, so files that are still being
+    written are not parsed half way through. Reloads run on the watcher's own
+    daemon thread and the new snapshot is swapped in atomically by the store.
+    """
+
+    def __init__(self, store: CatalogStore, interval_seconds: float = 5.0):
+        """
+        Initialize the watcher.
+
+        Args:
+            store: The catalog store to keep up to date
+            interval_seconds: Seconds between polls of the catalog files
+        """
+        self.store = store
+        self.interval_seconds = interval_seconds
+        self._pending: Dict[str, Optional[Tuple[str, Tuple[int, int]]]] = {}
+        # Sources whose reload failed; retried only once the file changes again.
+        self._failed: Dict[str, Optional[Tuple[str, Tuple[int, int]]]] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start polling on a daemon thread. Calling it twice is a no-op."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="catalog-watcher", daemon=True)
+        self._thread.start()
+        logger.info(f"Watching product catalogs in {self.store.data_directory} every {self.interval_seconds}s")
+
+    def stop(self):
+        """Stop polling and wait for an in-progress reload to finish."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def poll(self):
+        """Check the loaded catalogs once and reload those whose files have settled."""
+        changed = set(self.store.changed_tenants())
+        for tenant_id in list(self._pending):
+            if tenant_id not in changed:
+                del self._pending[tenant_id]
+
+        for tenant_id in changed:
+            source = self.store.resolve_source(tenant_id)
+            if self._failed.get(tenant_id, ()) == source:
+                continue
+            if tenant_id in self._pending and self._pending[tenant_id] == source:
+                del self._pending[tenant_id]
+                catalog = self.store.reload(tenant_id)
+                if catalog is not None and (catalog.source_path, catalog.source_signature) != source:
+                    self._failed[tenant_id] = source
+                else:
+                    self._failed.pop(tenant_id, None)
+            else:
+                self._pending[tenant_id] = source
+
+    def _run(self):
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                self.poll()
+            except Exception as e:
+                logger.error(f"Error while checking product catalogs for changes: {e}", exc_info=True)
@@ -0,0 +1,569 @@
+"""
+Compile tenant JSON catalogs into a binary artifact that can be memory-mapped.
+
+Layout of a ``.pscat`` file::
+
+    magic (8 bytes) | header struct | table of contents (JSON) | sections...
+
+Every section starts on an 8-byte boundary and holds either a native-endian
+``array`` (``*.off`` offsets as ``Q``, posting triples as ``I``) or a UTF-8
+blob addressed by an offsets section. Loading a compiled catalog only parses
+the table of contents; records, search columns and posting lists are read
+straight out of the mapped pages on demand, so every worker process that maps
+the same file shares one copy through the OS page cache.
+
+The artifact also stores the numeric ranking structures (BM25 length-norm
+factors and the L2-normalized TF-IDF matrix) under ``derived`` in the table
+of contents. Rankers read them as zero-copy views instead of building a
+private copy in every worker, as long as they were built with the same
+parameters.
+
+Artifacts are built by ``CatalogBuilder`` one product at a time, with records
+spooled to a temporary file, so compiling never holds a parsed copy of the
+whole catalog. A builder can also carry over the unchanged products of a
+previous artifact without decoding or re-tokenizing them, which is how
+SKU-level catalog edits avoid a full rebuild.
+
+Usage::
+
+    python -m app.services.product_search.compiler data_center/shajba.json
+    python -m app.services.product_search.compiler --all data_center
+"""
+import argparse
+import json
+import mmap
+import os
+import shutil
+import struct
+import sys
+import tempfile
+import time
+import logging
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping, Sequence
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+from scipy import sparse
+
+from app.services.product_search.catalog import (
+    LOOKUP_COLUMNS, SEARCH_FIELDS, TenantCatalog, file_signature, index_document, product_columns
+)
+from app.services.product_search.json_stream import iter_json_array
+from app.services.product_search.ranking import BM25Ranker
+from app.services.product_search.vector_search import TermRowBuilder, VectorIndex
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"PSCATLG\0"
+FORMAT_VERSION = 4
+COMPILED_EXTENSION = ".pscat"
+# format version, byte order (1 = little, 2 = big), table of contents length
+_HEADER = struct.Struct("<IIQ")
+_ALIGNMENT = 8
+_READ_CHUNK_BYTES = 1 << 16
+
+
+class StringTable(Sequence):
+    """Read-only sequence of strings stored as an offsets array plus a UTF-8 blob."""
+
+    def __init__(self, offsets: memoryview, data: memoryview):
+        self._offsets = offsets
+        self._data = data
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self[i] for i in range(*position.indices(len(self)))]
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError("string table index out of range")
+        return self.raw(position).decode('utf-8')
+
+    def raw(self, position: int) -> bytes:
+        """Return the encoded bytes of one string without decoding them."""
+        return bytes(self._data[self._offsets[position]:self._offsets[position + 1]])
+
+
+class RecordTable(Sequence):
+    """Read-only sequence of product records decoded from compact JSON on access."""
+
+    def __init__(self, raw: StringTable):
+        self.raw_table = raw
+
+    def __len__(self) -> int:
+        return len(self.raw_table)
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self[i] for i in range(*position.indices(len(self)))]
+        return json.loads(self.raw_table[position])
+
+
+class CompiledIndex(Mapping):
+    """Inverted index whose sorted vocabulary and postings live in the mapped file."""
+
+    def __init__(self, terms: StringTable, offsets: memoryview, postings: memoryview):
+        self._terms = terms
+        self._offsets = offsets
+        self._postings = postings
+
+    def _position(self, term: str) -> int:
+        position = bisect_left(self._terms, term)
+        if position < len(self._terms) and self._terms[position] == term:
+            return position
+        return -1
+
+    def __getitem__(self, term: str) -> memoryview:
+        position = self._position(term)
+        if position < 0:
+            raise KeyError(term)
+        return self._postings_at(position)
+
+    def __contains__(self, term) -> bool:
+        return isinstance(term, str) and self._position(term) >= 0
+
+    def __iter__(self):
+        return iter(self._terms)
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    def _postings_at(self, position: int) -> memoryview:
+        return self._postings[self._offsets[position]:self._offsets[position + 1]]
+
+    def values(self):
+        # Walk postings by position instead of looking every term up again.
+        return (self._postings_at(position) for position in range(len(self._terms)))
+
+    def items(self):
+        return ((self._terms[position], self._postings_at(position)) for position in range(len(self._terms)))
+
+    def remapped(self, doc_map: np.ndarray) -> Dict[str, array]:
+        """
+        Copy the index with documents renumbered or dropped.
+
+        Args:
+            doc_map: New position of every old document, or -1 to drop it;
+                must preserve the relative order of the documents it keeps
+
+        Returns:
+            A buildable index (term -> ``array('I')`` triples) without empty posting lists
+        """
+        triples = np.frombuffer(self._postings, dtype=np.uint32).reshape(-1, 3)
+        new_ids = doc_map[triples[:, 0]]
+        keep = new_ids >= 0
+        kept = triples[keep]
+        kept[:, 0] = new_ids[keep]
+        lengths = np.diff(np.frombuffer(self._offsets, dtype=np.uint64).astype(np.int64)) // 3
+        term_ids = np.repeat(np.arange(len(lengths)), lengths)
+        bounds = np.concatenate(([0], np.cumsum(np.bincount(term_ids[keep], minlength=len(lengths))))) * 3
+        flat = kept.ravel()
+        index: Dict[str, array] = {}
+        for position, term in enumerate(self._terms):
+            start, end = bounds[position], bounds[position + 1]
+            if end > start:
+                index[term] = array('I', flat[start:end].tobytes())
+        return index
+
+
+def _string_table_sections(name: str, values: List[str]) -> List[Tuple[str, bytes]]:
+    offsets = array('Q', [0])
+    blobs = []
+    position = 0
+    for value in values:
+        encoded = value.encode('utf-8')
+        blobs.append(encoded)
+        position += len(encoded)
+        offsets.append(position)
+    return [(f"{name}.off", offsets.tobytes()), (f"{name}.data", b"".join(blobs))]
+
+
+class CatalogBuilder:
+    """
+    Builds a compiled catalog artifact one product at a time.
+
+    Product records are spooled to an anonymous temporary file as they are
+    added; only the search columns, posting lists and TF-IDF term rows stay
+    in memory, all of them in compact form. Peak memory while compiling or
+    uploading a catalog is therefore independent of the size of the records.
+    """
+
+    def __init__(self, temp_directory: Optional[str] = None):
+        """
+        Initialize an empty builder.
+
+        Args:
+            temp_directory: Where to spool records; the system default when omitted
+        """
+        self.count = 0
+        self.columns: Dict[str, List[str]] = {name: [] for name, _ in SEARCH_FIELDS + LOOKUP_COLUMNS}
+        self.index: Dict[str, array] = {}
+        self._term_rows = TermRowBuilder()
+        self._carried_rows: Optional[sparse.csr_matrix] = None
+        self._records = tempfile.TemporaryFile(dir=temp_directory)
+        self._record_offsets = array('Q', [0])
+
+    def __enter__(self) -> "CatalogBuilder":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def add(self, product: Dict[str, Any]) -> int:
+        """
+        Append a product.
+
+        Args:
+            product: Product dictionary
+
+        Returns:
+            The product's document position
+        """
+        doc_id = self.count
+        values = product_columns(product)
+        for name, column in self.columns.items():
+            column.append(values[name])
+        index_document(self.index, doc_id, values)
+        self._term_rows.add(values)
+        self._append_record(json.dumps(product, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+        return doc_id
+
+    def carry_over(self, previous: TenantCatalog, doc_ids: List[int]):
+        """
+        Start the catalog with products of a previous compiled catalog.
+
+        Records are copied as stored bytes, posting lists are renumbered in
+        bulk and TF-IDF rows are recovered from the stored matrix, so none of
+        the carried products is decoded, validated or tokenized again.
+        Products of a catalog loaded from JSON are simply re-added.
+
+        Args:
+            previous: The catalog to copy from
+            doc_ids: Positions of the products to keep, in increasing order
+
+        Raises:
+            ValueError: If products were already added
+        """
+        if self.count:
+            raise ValueError("carry_over() must be called before any product is added")
+        if not isinstance(previous.index, CompiledIndex):
+            for doc_id in doc_ids:
+                self.add(previous.product(doc_id))
+            return
+
+        doc_map = np.full(len(previous), -1, dtype=np.int64)
+        doc_map[np.asarray(doc_ids, dtype=np.int64)] = np.arange(len(doc_ids))
+        self.index = previous.index.remapped(doc_map)
+        for name, column in self.columns.items():
+            values = previous.columns[name]
+            column.extend(values[doc_id] for doc_id in doc_ids)
+        raw = previous.products.raw_table
+        for doc_id in doc_ids:
+            self._append_record(raw.raw(doc_id))
+        self._carried_rows = VectorIndex(previous).term_rows(doc_ids)
+
+    def write(self, out_path: str, meta: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Write the artifact.
+
+        Args:
+            out_path: Destination ``.pscat`` path
+            meta: Extra metadata stored in the table of contents
+
+        Returns:
+            The path written
+        """
+        term_rows = self._term_rows.matrix()
+        if self._carried_rows is not None:
+            term_rows = sparse.vstack([self._carried_rows, term_rows], format='csr')
+        # Derived structures only need the document count, columns and index.
+        catalog = TenantCatalog("compile", range(self.count), columns=self.columns, index=self.index, size_bytes=0)
+        sections: List[Tuple[str, Union[bytes, BinaryIO]]] = [
+            ("records.off", self._record_offsets.tobytes()),
+            ("records.data", self._records),
+        ]
+        for name, values in self.columns.items():
+            sections += _string_table_sections(f"col.{name}", values)
+        terms = sorted(self.index)
+        posting_offsets = array('Q', [0])
+        postings = array('I')
+        for term in terms:
+            postings.extend(self.index[term])
+            posting_offsets.append(len(postings))
+        sections += _string_table_sections("terms", terms)
+        sections.append(("postings.off", posting_offsets.tobytes()))
+        sections.append(("postings.data", postings.tobytes()))
+        derived = _derived_sections(catalog, term_rows)
+        for name, info in derived.items():
+            sections += [(f"{name}.{key}", payload) for key, payload in info.pop("payloads").items()]
+
+        toc: Dict[str, Any] = {
+            "count": self.count,
+            "columns": list(self.columns),
+            "built_at": time.time(),
+            "meta": meta or {},
+            "derived": derived,
+            "sections": {},
+        }
+        _write_artifact(out_path, toc, sections)
+        return out_path
+
+    def close(self):
+        """Delete the spooled records."""
+        self._records.close()
+
+    def _append_record(self, record: bytes):
+        self._records.write(record)
+        self._record_offsets.append(self._record_offsets[-1] + len(record))
+        self.count += 1
+
+
+def _payload_length(payload: Union[bytes, BinaryIO]) -> int:
+    if isinstance(payload, bytes):
+        return len(payload)
+    return payload.seek(0, os.SEEK_END)
+
+
+def _write_artifact(out_path: str, toc: Dict[str, Any], sections: List[Tuple[str, Union[bytes, BinaryIO]]]):
+    """Lay out and write the sections, renaming the file into place when complete."""
+    # Offsets depend on the TOC length, so lay out once with placeholder
+    # offsets sized generously, then fill in the real ones.
+    base_length = len(MAGIC) + _HEADER.size
+    toc_reserve = len(json.dumps(toc)) + 64 * len(sections) + 256
+    position = _align(base_length + toc_reserve)
+    for name, payload in sections:
+        length = _payload_length(payload)
+        toc["sections"][name] = [position, length]
+        position = _align(position + length)
+    toc_bytes = json.dumps(toc).encode('utf-8')
+    if len(toc_bytes) > toc_reserve:
+        raise ValueError("compiled catalog table of contents exceeded its reserved space")
+    toc_bytes = toc_bytes.ljust(toc_reserve, b' ')
+
+    tmp_path = f"{out_path}.tmp-{os.getpid()}"
+    with open(tmp_path, 'wb') as file:
+        file.write(MAGIC)
+        file.write(_HEADER.pack(FORMAT_VERSION, 1 if sys.byteorder == 'little' else 2, len(toc_bytes)))
+        file.write(toc_bytes)
+        for name, payload in sections:
+            offset, _ = toc["sections"][name]
+            file.write(b"\0" * (offset - file.tell()))
+            if isinstance(payload, bytes):
+                file.write(payload)
+            else:
+                payload.seek(0)
+                shutil.copyfileobj(payload, file)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp_path, out_path)
+
+
+def write_compiled_catalog(
+    out_path: str,
+    products: List[Dict[str, Any]],
+    meta: Optional[Dict[str, Any]] = None
+) -> str:
+    """
+    Write a compiled catalog artifact.
+
+    The file is written next to its destination and renamed into place, so a
+    reader never maps a partially written artifact.
+
+    Args:
+        out_path: Destination ``.pscat`` path
+        products: List of product dictionaries
+        meta: Extra metadata stored in the table of contents
+
+    Returns:
+        The path written
+    """
+    with CatalogBuilder(os.path.dirname(out_path) or None) as builder:
+        for product in products:
+            builder.add(product)
+        return builder.write(out_path, meta)
+
+
+def _derived_sections(
+    catalog: TenantCatalog,
+    term_rows: Optional[sparse.csr_matrix] = None
+) -> Dict[str, Dict[str, Any]]:
+    """Build the ranking structures and return their params, section names and payloads."""
+    ranker = BM25Ranker(catalog)
+    vectors = VectorIndex(catalog, term_rows)
+    matrix = vectors.matrix
+    return {
+        "bm25": {
+            "params": ranker.params,
+            "payloads": {"factors": b"".join(factors.tobytes() for factors in ranker.factors)},
+        },
+        "tfidf": {
+            "params": vectors.params,
+            # scipy's own index dtype, so loading needs no conversion copy
+            "index_dtype": str(matrix.indices.dtype),
+            "payloads": {
+                "data": matrix.data.astype('float32').tobytes(),
+                "indices": matrix.indices.tobytes(),
+                "indptr": matrix.indptr.astype(matrix.indices.dtype).tobytes(),
+                "idf": vectors.idf.astype('float32').tobytes(),
+            },
+        },
+    }
+
+
+def _align(position: int) -> int:
+    return (position + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+class CompiledCatalogFile:
+    """A memory-mapped ``.pscat`` artifact."""
+
+    def __init__(self, path: str):
+        """
+        Map a compiled catalog and read its table of contents.
+
+        Args:
+            path: Path to the ``.pscat`` file
+
+        Raises:
+            ValueError: If the file is not a compatible compiled catalog
+        """
+        self.path = path
+        with open(path, 'rb') as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mmap)
+        if bytes(view[:len(MAGIC)]) != MAGIC:
+            raise ValueError(f"{path} is not a compiled product catalog")
+        format_version, byte_order, toc_length = _HEADER.unpack_from(view, len(MAGIC))
+        if format_version != FORMAT_VERSION:
+            raise ValueError(f"{path} uses catalog format {format_version}, expected {FORMAT_VERSION}")
+        if byte_order != (1 if sys.byteorder == 'little' else 2):
+            raise ValueError(f"{path} was compiled on a machine with a different byte order")
+        toc_start = len(MAGIC) + _HEADER.size
+        self.toc = json.loads(bytes(view[toc_start:toc_start + toc_length]))
+        self.meta = self.toc.get("meta", {})
+        self._view = view
+
+    @property
+    def size_bytes(self) -> int:
+        return len(self._mmap)
+
+    def section(self, name: str, typecode: str = 'B') -> memoryview:
+        """Return a zero-copy view of a section, cast to an array typecode."""
+        offset, length = self.toc["sections"][name]
+        view = self._view[offset:offset + length]
+        return view.cast(typecode) if typecode != 'B' else view
+
+    def string_table(self, name: str) -> StringTable:
+        return StringTable(self.section(f"{name}.off", 'Q'), self.section(f"{name}.data"))
+
+
+def load_compiled_catalog(
+    tenant_id: str,
+    path: str,
+    version: int = 1,
+    source_signature: Optional[Tuple[int, int]] = None
+) -> TenantCatalog:
+    """
+    Map a compiled artifact and wrap it in a ``TenantCatalog``.
+
+    Args:
+        tenant_id: The tenant identifier
+        path: Path to the ``.pscat`` file
+        version: Catalog version to assign
+        source_signature: Signature of ``path`` when it was opened
+
+    Returns:
+        A catalog backed by the mapped file
+    """
+    compiled = CompiledCatalogFile(path)
+    columns = {name: compiled.string_table(f"col.{name}") for name in compiled.toc["columns"]}
+    precomputed = {}
+    for name, info in compiled.toc.get("derived", {}).items():
+        prefix = f"{name}."
+        precomputed[name] = dict(info)
+        precomputed[name].update(
+            (key[len(prefix):], compiled.section(key)) for key in compiled.toc["sections"] if key.startswith(prefix)
+        )
+    index = CompiledIndex(
+        compiled.string_table("terms"),
+        compiled.section("postings.off", 'Q'),
+        compiled.section("postings.data", 'I'),
+    )
+    return TenantCatalog(
+        tenant_id,
+        RecordTable(compiled.string_table("records")),
+        source_path=path,
+        version=version,
+        source_signature=source_signature,
+        columns=columns,
+        index=index,
+        size_bytes=compiled.size_bytes,
+        precomputed=precomputed
+    )
+
+
+def compiled_path_for(json_path: str) -> str:
+    """Return the default artifact path for a tenant JSON catalog."""
+    return os.path.splitext(json_path)[0] + COMPILED_EXTENSION
+
+
+def compile_catalog_file(json_path: str, out_path: Optional[str] = None) -> str:
+    """
+    Compile a tenant JSON catalog file.
+
+    Args:
+        json_path: Path to the ``{tenant_id}.json`` catalog
+        out_path: Destination path; defaults to ``{tenant_id}.pscat`` alongside it
+
+    Returns:
+        The path of the written artifact
+    """
+    signature = file_signature(json_path)
+    out_path = out_path or compiled_path_for(json_path)
+    with open(json_path, 'rb') as file, CatalogBuilder(os.path.dirname(out_path) or None) as builder:
+        for product in iter_json_array(iter(lambda: file.read(_READ_CHUNK_BYTES), b"")):
+            builder.add(product)
+        builder.write(out_path, meta={
+            "source": os.path.basename(json_path),
+            "source_signature": list(signature) if signature else None,
+        })
+    if signature is not None:
+        # Stamp the artifact with the source's mtime: if the JSON changes while
+        # (or after) it is compiled, the JSON is newer and wins until recompiled.
+        os.utime(out_path, ns=(signature[0], signature[0]))
+    logger.info(f"Compiled {builder.count} products from {json_path} to {out_path}")
+    return out_path
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compile tenant product catalogs for fast loading.")
+    parser.add_argument("paths", nargs="+", help="catalog JSON files, or directories with --all")
+    parser.add_argument("--all", action="store_true", help="compile every *.json file in the given directories")
+    parser.add_argument("-o", "--output", help="output path (single input only)")
+    args = parser.parse_args(argv)
+
+    inputs = []
+    for path in args.paths:
+        if args.all:
+            inputs += sorted(
+                os.path.join(path, name) for name in os.listdir(path) if name.endswith('.json')
+            )
+        else:
+            inputs.append(path)
+    if args.output and len(inputs) != 1:
+        parser.error("--output can only be used with a single input file")
+
+    for json_path in inputs:
+        out_path = compile_catalog_file(json_path, args.output)
+        print(f"{json_path} -> {out_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main())
@@ -0,0 +1,225 @@
+"""Facet tables and numeric range filters over a tenant catalog."""
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from app.services.product_search.catalog import TenantCatalog
+
+SORT_OPTIONS = ("relevance", "price_asc", "price_desc")
+
+_TRUE_VALUES = {"1", "true", "yes", "instock", "in stock"}
+
+
+def parse_price(value: str) -> Optional[float]:
+    """
+    Parse a WooCommerce price column value.
+
+    Args:
+        value: Raw price such as ``"1200"``, ``"1,200.50"`` or ``""``
+
+    Returns:
+        The price, or None if the product has no price
+    """
+    value = value.replace(',', '').strip()
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def _is_true(value: str) -> bool:
+    return value.strip().lower() in _TRUE_VALUES
+
+
+def split_categories(value: str) -> List[str]:
+    """
+    Expand a lowercased ``Categories`` column into filterable category values.
+
+    ``"skin care > cleanser, offers"`` yields ``"skin care > cleanser"``, its
+    ancestor ``"skin care"``, its leaf ``"cleanser"`` and ``"offers"``.
+
+    Args:
+        value: Lowercased categories column value
+
+    Returns:
+        Unique category values in first-seen order
+    """
+    values = []
+    for path in value.split(','):
+        parts = [part.strip() for part in path.split('>') if part.strip()]
+        for depth in range(1, len(parts) + 1):
+            values.append(' > '.join(parts[:depth]))
+        if len(parts) > 1:
+            values.append(parts[-1])
+    return list(dict.fromkeys(values))
+
+
+class CatalogFacets:
+    """
+    Precomputed filter structures for one catalog snapshot.
+
+    Effective prices (sale price when set, otherwise regular price) are kept
+    both per document, for sorting, and as a sorted array with a parallel
+    document array, so a price range is two binary searches and a slice.
+    Brand, category, stock and featured flags are kept as posting sets.
+    """
+
+    def __init__(self, catalog: TenantCatalog):
+        """
+        Build the facet tables from the catalog's lookup columns.
+
+        Args:
+            catalog: The catalog snapshot
+        """
+        sale_prices = catalog.columns['sale_price']
+        regular_prices = catalog.columns['regular_price']
+        in_stock = catalog.columns['in_stock']
+        featured = catalog.columns['featured']
+        brands = catalog.columns['brand']
+        categories = catalog.columns['categories']
+
+        self.doc_count = len(catalog)
+        self.prices: List[Optional[float]] = []
+        self.in_stock: Set[int] = set()
+        self.featured: Set[int] = set()
+        self.brands: Dict[str, Set[int]] = {}
+        self.categories: Dict[str, Set[int]] = {}
+        self.doc_brand: List[str] = []
+        self.doc_categories: List[List[str]] = []
+
+        priced = []
+        for doc_id in range(self.doc_count):
+            price = parse_price(sale_prices[doc_id])
+            if price is None:
+                price = parse_price(regular_prices[doc_id])
+            self.prices.append(price)
+            if price is not None:
+                priced.append((price, doc_id))
+            if _is_true(in_stock[doc_id]):
+                self.in_stock.add(doc_id)
+            if _is_true(featured[doc_id]):
+                self.featured.add(doc_id)
+
+            brand = brands[doc_id].strip()
+            self.doc_brand.append(brand)
+            if brand:
+                self.brands.setdefault(brand, set()).add(doc_id)
+
+            doc_categories = split_categories(categories[doc_id])
+            self.doc_categories.append(doc_categories)
+            for category in doc_categories:
+                self.categories.setdefault(category, set()).add(doc_id)
+
+        priced.sort()
+        self.sorted_prices = array('d', (price for price, _ in priced))
+        self.sorted_price_docs = array('I', (doc_id for _, doc_id in priced))
+
+    def price_range(self, min_price: Optional[float], max_price: Optional[float]) -> Set[int]:
+        """
+        Return the documents whose effective price lies in an inclusive range.
+
+        Args:
+            min_price: Lower bound, or None for unbounded
+            max_price: Upper bound, or None for unbounded
+
+        Returns:
+            Set of document positions
+        """
+        low = 0 if min_price is None else bisect_left(self.sorted_prices, min_price)
+        high = len(self.sorted_prices) if max_price is None else bisect_right(self.sorted_prices, max_price)
+        return set(self.sorted_price_docs[low:high])
+
+    def filter(
+        self,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        in_stock: Optional[bool] = None,
+        brand: Optional[str] = None,
+        category: Optional[str] = None,
+        featured: Optional[bool] = None
+    ) -> Optional[Set[int]]:
+        """
+        Intersect the requested filters.
+
+        Args:
+            min_price: Minimum effective price
+            max_price: Maximum effective price
+            in_stock: Require (True) or exclude (False) in-stock products
+            brand: Brand name, matched case-insensitively
+            category: Category name or path, matched case-insensitively
+            featured: Require (True) or exclude (False) featured products
+
+        Returns:
+            Matching document positions, or None if no filter was given
+        """
+        selections = []
+        if brand:
+            selections.append(self.brands.get(brand.strip().lower(), set()))
+        if category:
+            selections.append(self.categories.get(category.strip().lower(), set()))
+        if min_price is not None or max_price is not None:
+            selections.append(self.price_range(min_price, max_price))
+        if in_stock is True:
+            selections.append(self.in_stock)
+        if featured is True:
+            selections.append(self.featured)
+        exclusions = []
+        if in_stock is False:
+            exclusions.append(self.in_stock)
+        if featured is False:
+            exclusions.append(self.featured)
+
+        if not selections and not exclusions:
+            return None
+        if selections:
+            selections.sort(key=len)
+            matches = set(selections[0])
+            for selection in selections[1:]:
+                matches &= selection
+        else:
+            matches = set(range(self.doc_count))
+        for exclusion in exclusions:
+            matches -= exclusion
+        return matches
+
+    def sort_by_price(self, doc_ids: Iterable[int], descending: bool = False) -> List[int]:
+        """Order documents by effective price, products without a price last."""
+        doc_ids = list(doc_ids)
+        priced = [doc_id for doc_id in doc_ids if self.prices[doc_id] is not None]
+        unpriced = [doc_id for doc_id in doc_ids if self.prices[doc_id] is None]
+        priced.sort(key=self.prices.__getitem__, reverse=descending)
+        return priced + unpriced
+
+    def counts(self, doc_ids: Iterable[int]) -> Dict[str, Any]:
+        """
+        Count facet values over a result set.
+
+        Args:
+            doc_ids: Document positions of every match, not just the returned page
+
+        Returns:
+            Brand and category counts, stock/featured counts and the price span
+        """
+        doc_ids = list(doc_ids)
+        brands = Counter(self.doc_brand[doc_id] for doc_id in doc_ids if self.doc_brand[doc_id])
+        categories = Counter(
+            category for doc_id in doc_ids for category in self.doc_categories[doc_id]
+        )
+        prices = [self.prices[doc_id] for doc_id in doc_ids if self.prices[doc_id] is not None]
+        in_stock = sum(1 for doc_id in doc_ids if doc_id in self.in_stock)
+        featured = sum(1 for doc_id in doc_ids if doc_id in self.featured)
+        return {
+            "brand": dict(brands.most_common()),
+            "category": dict(categories.most_common()),
+            "in_stock": {"true": in_stock, "false": len(doc_ids) - in_stock},
+            "featured": {"true": featured, "false": len(doc_ids) - featured},
+            "price": {"min": min(prices), "max": max(prices)} if prices else {"min": None, "max": None},
+        }
+
+
+def get_catalog_facets(catalog: TenantCatalog) -> CatalogFacets:
+    """Return the facet tables of a catalog snapshot, building them on first use."""
+    return catalog.derived("facets", CatalogFacets)
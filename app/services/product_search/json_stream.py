@@ -0,0 +1,133 @@
+"""Incremental parsing of a top-level JSON array from a stream of byte chunks."""
+import codecs
+import json
+import re
+from typing import Any, Iterable, Iterator, List
+
+# Largest single array item buffered while waiting for the rest of it.
+DEFAULT_MAX_ITEM_BYTES = 1 << 20
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+
+class JSONArrayParser:
+    """
+    Parses a JSON array item by item as its bytes arrive.
+
+    Only the item currently being received is buffered, so memory stays
+    bounded by the largest item rather than by the whole document. Each item
+    is decoded with the standard library's JSON decoder once it is complete.
+    """
+
+    def __init__(self, max_item_bytes: int = DEFAULT_MAX_ITEM_BYTES):
+        """
+        Initialize the parser.
+
+        Args:
+            max_item_bytes: Reject the document once one item grows past this size
+        """
+        self.max_item_bytes = max_item_bytes
+        self.items = 0
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self._json = json.JSONDecoder()
+        self._buffer = ""
+        self._state = "start"
+
+    def feed(self, chunk: bytes) -> List[Any]:
+        """
+        Consume the next chunk of the document.
+
+        Args:
+            chunk: Raw bytes, split anywhere (even inside a UTF-8 character)
+
+        Returns:
+            The items completed by this chunk, in order
+
+        Raises:
+            ValueError: If the data is not a JSON array or an item is too large
+        """
+        self._buffer += self._decoder.decode(chunk)
+        return self._drain(final=False)
+
+    def close(self) -> List[Any]:
+        """
+        Signal the end of the document.
+
+        Returns:
+            Any items completed by the end of input
+
+        Raises:
+            ValueError: If the array was not properly closed
+        """
+        self._buffer += self._decoder.decode(b"", final=True)
+        items = self._drain(final=True)
+        if self._state != "done":
+            raise ValueError("Incomplete JSON array")
+        return items
+
+    def _drain(self, final: bool) -> List[Any]:
+        items = []
+        buffer = self._buffer
+        position = 0
+        while True:
+            position = _WHITESPACE.match(buffer, position).end()
+            if position == len(buffer):
+                break
+            char = buffer[position]
+            if self._state == "start":
+                if char != '[':
+                    raise ValueError("Expected a JSON array")
+                position += 1
+                self._state = "first"
+            elif self._state == "first" and char == ']':
+                position += 1
+                self._state = "done"
+            elif self._state == "after":
+                if char == ',':
+                    self._state = "next"
+                elif char == ']':
+                    self._state = "done"
+                else:
+                    raise ValueError(f"Expected ',' or ']' after array item {self.items}")
+                position += 1
+            elif self._state == "done":
+                raise ValueError("Unexpected data after the JSON array")
+            else:
+                try:
+                    item, end = self._json.raw_decode(buffer, position)
+                except json.JSONDecodeError as e:
+                    # Usually the item is just not complete yet.
+                    if final or len(buffer) - position > self.max_item_bytes:
+                        raise ValueError(f"Invalid JSON in array item {self.items}: {e.msg}") from None
+                    break
+                if end == len(buffer) and not final and not isinstance(item, (dict, list)):
+                    # A bare number may continue in the next chunk.
+                    break
+                items.append(item)
+                self.items += 1
+                position = end
+                self._state = "after"
+        self._buffer = buffer[position:]
+        if len(self._buffer) > self.max_item_bytes:
+            raise ValueError(f"Array item {self.items} exceeds {self.max_item_bytes} bytes")
+        return items
+
+
+def iter_json_array(chunks: Iterable[bytes], max_item_bytes: int = DEFAULT_MAX_ITEM_BYTES) -> Iterator[Any]:
+    """
+    Yield the items of a JSON array read from byte chunks.
+
+    Args:
+        chunks: The document's bytes, in order
+        max_item_bytes: Largest single item accepted
+
+    Returns:
+        Iterator over the array's items
+
+    Raises:
+        ValueError: If the document is not a well-formed JSON array
+    """
+    parser = JSONArrayParser(max_item_bytes)
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    yield from parser.close()
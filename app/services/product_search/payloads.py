@@ -0,0 +1,64 @@
+"""Product JSON fragments serialized once per catalog snapshot."""
+from typing import Dict, List
+
+from app.schemas.product_search import Product, ProductSummary
+from app.services.product_search.catalog import TenantCatalog
+
+# Projection name -> response model whose aliased JSON is the product payload.
+PROJECTIONS = {
+    "full": Product,
+    "slim": ProductSummary,
+}
+
+
+class ProductPayloads:
+    """
+    Cache of serialized product JSON for one catalog snapshot.
+
+    A product is validated and serialized the first time a search returns it,
+    and later responses reuse the bytes. Fragments are produced by the same
+    models the API declares, so they match what FastAPI would have rendered.
+    The cache lives and dies with the snapshot, so a reload never serves
+    stale products.
+    """
+
+    def __init__(self, catalog: TenantCatalog):
+        """
+        Initialize an empty payload cache.
+
+        Args:
+            catalog: The catalog snapshot whose products are serialized
+        """
+        self.catalog = catalog
+        self._fragments: Dict[str, Dict[int, bytes]] = {name: {} for name in PROJECTIONS}
+
+    def get(self, doc_id: int, projection: str = "full") -> bytes:
+        """
+        Return the JSON object of a product in a projection.
+
+        Args:
+            doc_id: Document position of the product
+            projection: One of ``PROJECTIONS``
+
+        Returns:
+            UTF-8 encoded JSON object
+        """
+        fragments = self._fragments[projection]
+        fragment = fragments.get(doc_id)
+        if fragment is None:
+            model = PROJECTIONS[projection].model_validate(self.catalog.product(doc_id))
+            fragment = fragments[doc_id] = model.model_dump_json(by_alias=True).encode('utf-8')
+        return fragment
+
+    def get_many(self, doc_ids: List[int], projection: str = "full") -> List[bytes]:
+        """Return the JSON objects of several products, in order."""
+        return [self.get(doc_id, projection) for doc_id in doc_ids]
+
+    def stats(self) -> Dict[str, int]:
+        """Return the number of cached fragments per projection."""
+        return {name: len(fragments) for name, fragments in self._fragments.items()}
+
+
+def get_product_payloads(catalog: TenantCatalog) -> ProductPayloads:
+    """Return the payload cache of a catalog snapshot, creating it on first use."""
+    return catalog.derived("payloads", ProductPayloads)
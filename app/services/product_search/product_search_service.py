@@ -1,10 +1,29 @@
 import json
 import os
-from typing import List, Dict, Any, Optional
+import threading
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Set, Tuple
 import logging
 from fuzzywuzzy import fuzz
 from fuzzywuzzy import process
 
+from app.services.product_search.autocomplete import PRODUCT, get_suggestion_index
+from app.services.product_search.catalog import TenantCatalog
+from app.services.product_search.catalog_store import CatalogStore, is_valid_tenant_id
+from app.services.product_search.catalog_upload import CatalogUpload, apply_catalog_delta
+from app.services.product_search.catalog_watcher import CatalogWatcher
+from app.services.product_search.facets import SORT_OPTIONS, get_catalog_facets
+from app.services.product_search.payloads import PROJECTIONS, get_product_payloads
+from app.services.product_search.ranking import get_bm25_ranker
+from app.services.product_search.result_cache import SearchResultCache
+from app.services.product_search.search_pool import SearchWorkerPool
+from app.services.product_search.spelling import get_spelling_corrector
+from app.services.product_search.synonyms import SynonymStore, expand_terms
+from app.services.product_search.text import tokenize
+from app.services.product_search.vector_search import (
+    SEARCH_MODES, blend_scores, get_vector_index, top_documents
+)
+
 logger = logging.getLogger(__name__)
 
 class ProductSearchService:
@@ -13,35 +32,154 @@ class ProductSearchService:
     Loads product data from JSON files and provides search functionality.
     """
     
-    def __init__(self, data_directory: str = "data_center"):
+    def __init__(
+        self,
+        data_directory: str = "data_center",
+        memory_budget_mb: int = 0,
+        prewarm_tenants: Optional[List[str]] = None,
+        cache_size: int = 1024,
+        cache_ttl_seconds: float = 300.0,
+        hybrid_alpha: float = 0.5,
+        spelling_correction: bool = True,
+        synonyms: Optional[Dict[str, List[str]]] = None,
+        synonyms_directory: Optional[str] = None,
+        search_workers: int = 4,
+        max_queue_depth: int = 256,
+        max_queue_per_tenant: int = 64,
+        compile_catalogs: bool = False
+    ):
         """
         Initialize the product search service.
         
+        Catalogs are loaded lazily on a tenant's first search, so construction
+        only reads the catalogs listed in ``prewarm_tenants``.
+        
         Args:
             data_directory: Directory where product JSON files are stored
+            memory_budget_mb: Memory budget for loaded catalogs in MB (0 means unlimited)
+            prewarm_tenants: Tenants whose catalogs are loaded up front
+            cache_size: Cached searches per tenant (0 disables the result cache)
+            cache_ttl_seconds: Seconds a cached search result stays valid
+            hybrid_alpha: Weight of the BM25 score in hybrid mode (the rest goes to TF-IDF similarity)
+            spelling_correction: Correct query words that are not in the tenant's catalog
+            synonyms: Synonyms applied to every tenant's queries
+            synonyms_directory: Directory of per-tenant synonym files
+                (defaults to ``<data_directory>/synonyms``)
+            search_workers: Worker threads running searches for async callers
+            max_queue_depth: Searches waiting for a worker before new ones are rejected
+            max_queue_per_tenant: Searches one tenant may have waiting
+            compile_catalogs: Compile JSON catalogs into shared memory-mapped
+                artifacts on first load, so worker processes share one copy
         """
         self.data_directory = data_directory
-        self.tenant_products = {}
-        self.load_all_tenant_products()
+        self.catalog_store = CatalogStore(
+            data_directory,
+            loader=lambda file_path: self.load_products_from_file(file_path, raise_errors=True),
+            memory_budget_bytes=memory_budget_mb * 1024 * 1024,
+            compile_catalogs=compile_catalogs
+        )
+        self.catalog_watcher: Optional[CatalogWatcher] = None
+        self.result_cache = SearchResultCache(cache_size, cache_ttl_seconds)
+        self.hybrid_alpha = hybrid_alpha
+        self.spelling_correction = spelling_correction
+        self.synonyms = SynonymStore(
+            synonyms_directory or os.path.join(data_directory, "synonyms"),
+            defaults=synonyms,
+            on_change=self.result_cache.invalidate
+        )
+        self.worker_pool = SearchWorkerPool(search_workers, max_queue_depth, max_queue_per_tenant)
+        # Updated from the worker threads, so guarded by a lock
+        self._stats_lock = threading.Lock()
+        self.ranking_stats = {mode: 0 for mode in SEARCH_MODES}
+        self.ranking_stats["fuzzy_fallback"] = 0
+        self.ranking_stats["spelling_corrections"] = 0
+        self.ranking_stats["synonym_expansions"] = 0
+        if prewarm_tenants:
+            self.catalog_store.prewarm(prewarm_tenants)
     
-    def load_all_tenant_products(self):
-        """Load product data for all tenants from JSON files."""
-        if not os.path.exists(self.data_directory):
-            logger.warning(f"Data directory {self.data_directory} does not exist")
-            return
+    def start_catalog_watcher(self, interval_seconds: float = 5.0):
+        """
+        Reload changed catalog files in the background without a restart.
         
-        for filename in os.listdir(self.data_directory):
-            if filename.endswith('.json'):
-                tenant_id = filename.replace('.json', '')
-                file_path = os.path.join(self.data_directory, filename)
-                self.tenant_products[tenant_id] = self.load_products_from_file(file_path)
+        Args:
+            interval_seconds: Seconds between checks of the catalog files
+        """
+        if self.catalog_watcher is None:
+            self.catalog_watcher = CatalogWatcher(self.catalog_store, interval_seconds)
+        self.catalog_watcher.start()
     
-    def load_products_from_file(self, file_path: str) -> List[Dict[str, Any]]:
+    def get_catalog_version(self, tenant_id: str) -> int:
+        """
+        Get the version of a tenant's catalog, bumped on every reload that changed it.
+        
+        Args:
+            tenant_id: The tenant identifier
+            
+        Returns:
+            The catalog version, or 0 if the tenant has no catalog
+        """
+        catalog = self.catalog_store.get(tenant_id)
+        return catalog.version if catalog is not None else 0
+    
+    def start_catalog_upload(self, tenant_id: str) -> CatalogUpload:
+        """
+        Begin replacing a tenant's catalog with a streamed upload.
+        
+        Feed the request body to the returned upload chunk by chunk, then call
+        its ``finish`` to publish the catalog, and ``close`` it in any case.
+        
+        Args:
+            tenant_id: The tenant identifier
+            
+        Returns:
+            The upload in progress
+            
+        Raises:
+            ValueError: If the tenant id cannot be used as a catalog name
+        """
+        if not is_valid_tenant_id(tenant_id):
+            raise ValueError(f"Invalid tenant id {tenant_id!r}")
+        return CatalogUpload(self.catalog_store, tenant_id)
+    
+    def update_catalog(
+        self,
+        tenant_id: str,
+        upserts: List[Dict[str, Any]],
+        deletes: List[str]
+    ) -> Dict[str, Any]:
+        """
+        Add, replace and delete products of a tenant's catalog by SKU.
+        
+        Unchanged products are carried over from the current compiled catalog
+        without re-indexing, so small edits cost far less than a re-upload.
+        
+        Args:
+            tenant_id: The tenant identifier
+            upserts: Products to add or to replace by SKU
+            deletes: SKUs of products to remove
+            
+        Returns:
+            Summary of the edit with the new catalog version
+            
+        Raises:
+            ValueError: If the tenant id is invalid
+            CatalogValidationError: If an upserted product is invalid
+        """
+        if not is_valid_tenant_id(tenant_id):
+            raise ValueError(f"Invalid tenant id {tenant_id!r}")
+        return apply_catalog_delta(self.catalog_store, tenant_id, upserts, deletes)
+    
+    def load_all_tenant_products(self):
+        """Eagerly load product data for all tenants, subject to the memory budget."""
+        self.catalog_store.prewarm(self.catalog_store.available_tenants())
+    
+    def load_products_from_file(self, file_path: str, raise_errors: bool = False) -> List[Dict[str, Any]]:
         """
         Load products from a JSON file.
         
         Args:
             file_path: Path to the JSON file containing products
+            raise_errors: Re-raise read/parse errors instead of returning an empty list
             
         Returns:
             List of product dictionaries
@@ -52,6 +190,8 @@ class ProductSearchService:
                 logger.info(f"Loaded {len(products)} products from {file_path}")
                 return products
         except Exception as e:
+            if raise_errors:
+                raise
             logger.error(f"Error loading products from {file_path}: {e}")
             return []
     
@@ -65,7 +205,12 @@ class ProductSearchService:
         Returns:
             List of products for the tenant
         """
-        return self.tenant_products.get(tenant_id, [])
+        catalog = self.catalog_store.get(tenant_id)
+        if catalog is None:
+            return []
+        # Compiled catalogs decode records on access; materialize them for callers
+        # that expect a plain list.
+        return catalog.products if isinstance(catalog.products, list) else list(catalog.products)
     
     def search_products(self, tenant_id: str, query: str, limit: int = 10) -> List[Dict[str, Any]]:
         """
@@ -79,38 +224,409 @@ class ProductSearchService:
         Returns:
             List of matching products
         """
-        products = self.get_products_for_tenant(tenant_id)
-        if not products:
+        return self.search(tenant_id, query, limit)["products"]
+    
+    async def search_async(self, tenant_id: str, query: str, **options) -> Dict[str, Any]:
+        """
+        Run ``search`` on the worker pool so it does not block the event loop.
+        
+        Args:
+            tenant_id: The tenant identifier
+            query: Search query string
+            **options: Any other ``search`` argument
+            
+        Returns:
+            The ``search`` result
+            
+        Raises:
+            SearchQueueFullError: If too many searches are already waiting
+        """
+        return await self.worker_pool.run(tenant_id, self.search, tenant_id, query, **options)
+    
+    async def search_products_async(self, tenant_id: str, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Run ``search_products`` on the worker pool; see ``search_async``."""
+        return (await self.search_async(tenant_id, query, limit=limit))["products"]
+    
+    async def search_batch_async(self, tenant_id: str, queries: List[str], **options) -> Dict[str, Dict[str, Any]]:
+        """Run ``search_batch`` on the worker pool; see ``search_async``."""
+        return await self.worker_pool.run(tenant_id, self.search_batch, tenant_id, queries, **options)
+    
+    async def suggest_async(self, tenant_id: str, prefix: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Run ``suggest`` on the worker pool; see ``search_async``."""
+        return await self.worker_pool.run(tenant_id, self.suggest, tenant_id, prefix, limit)
+    
+    def search(
+        self,
+        tenant_id: str,
+        query: str,
+        limit: int = 10,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        in_stock: Optional[bool] = None,
+        brand: Optional[str] = None,
+        category: Optional[str] = None,
+        featured: Optional[bool] = None,
+        sort: str = "relevance",
+        include_facets: bool = False,
+        mode: str = "lexical",
+        projection: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Search for products with optional facet filters, sorting and facet counts.
+        
+        Filters are applied first, so the text ranking only scores products
+        that can be returned. An empty query lists the filtered products in
+        catalog order.
+        
+        Args:
+            tenant_id: The tenant identifier
+            query: Search query string (may be empty)
+            limit: Maximum number of results to return
+            min_price: Minimum effective price (sale price, else regular price)
+            max_price: Maximum effective price
+            in_stock: Only in-stock (True) or out-of-stock (False) products
+            brand: Brand name, matched case-insensitively
+            category: Category name or path such as "Skin Care > Cleanser"
+            featured: Only featured (True) or non-featured (False) products
+            sort: One of "relevance", "price_asc" or "price_desc"
+            include_facets: Whether to count facet values over all matches
+            mode: "lexical" (BM25), "vector" (TF-IDF similarity) or "hybrid" (both blended)
+            projection: Return products as cached JSON bytes in this projection
+                ("full" or "slim") instead of dictionaries
+            
+        Returns:
+            Dictionary with the page of ``products``, the ``total`` number of
+            matches and ``facets`` (None unless requested)
+        """
+        if sort not in SORT_OPTIONS:
+            raise ValueError(f"Unsupported sort {sort!r}, expected one of {', '.join(SORT_OPTIONS)}")
+        self._check_options(mode, projection)
+        
+        catalog = self.catalog_store.get(tenant_id)
+        if catalog is None or not len(catalog):
             logger.warning(f"No products found for tenant {tenant_id}")
-            return []
+            return {"products": [], "total": 0, "facets": None}
+        
+        # Picks up synonym file edits, which invalidate cached results
+        self.synonyms.get(tenant_id)
         
         # Normalize the query
         query = query.lower().strip()
-        if not query:
-            return products[:limit]
+        filters = {
+            "min_price": min_price,
+            "max_price": max_price,
+            "in_stock": in_stock,
+            "brand": brand.strip().lower() if brand else None,
+            "category": category.strip().lower() if category else None,
+            "featured": featured,
+        }
+        cache_key = (query, limit, tuple(filters.values()), sort, include_facets, mode)
+        cached = self.result_cache.get(tenant_id, catalog.version, cache_key)
+        if cached is None:
+            cached = self._execute_search(catalog, query, limit, filters, sort, include_facets, mode)
+            self.result_cache.put(tenant_id, catalog.version, cache_key, cached)
         
-        # Perform fuzzy search on product names and descriptions
-        scored_products = []
-        for product in products:
-            product_name = product.get('Name', '').lower()
-            product_description = product.get('Description', '').lower()
-            product_categories = product.get('Categories', '').lower()
+        doc_ids, total, facet_counts = cached
+        return {
+            "products": self._render_products(catalog, doc_ids, projection),
+            "total": total,
+            "facets": facet_counts,
+        }
+    
+    def search_batch(
+        self,
+        tenant_id: str,
+        queries: List[str],
+        limit: int = 10,
+        mode: str = "lexical",
+        projection: Optional[str] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Run several searches against one tenant catalog in a single pass.
+        
+        Queries are normalized and deduplicated, answered from the result
+        cache where possible, and the rest are ranked together so shared terms
+        are scored once. Results are cached exactly as ``search`` caches them.
+        
+        Args:
+            tenant_id: The tenant identifier
+            queries: Search query strings
+            limit: Maximum number of results to return per query
+            mode: "lexical" (BM25), "vector" (TF-IDF similarity) or "hybrid" (both blended)
+            projection: Return products as cached JSON bytes in this projection
+                ("full" or "slim") instead of dictionaries
             
+        Returns:
+            Dictionary mapping each distinct input query to its ``products``
+            and ``total`` number of matches
+        """
+        self._check_options(mode, projection)
+        
+        catalog = self.catalog_store.get(tenant_id)
+        if catalog is None or not len(catalog):
+            logger.warning(f"No products found for tenant {tenant_id}")
+            return {query: {"products": [], "total": 0} for query in queries}
+        
+        self.synonyms.get(tenant_id)
+        normalized = {query: query.lower().strip() for query in queries}
+        no_filters = (None,) * 6
+        results: Dict[str, Tuple[List[int], int, Optional[Dict[str, Any]]]] = {}
+        pending = []
+        for query in dict.fromkeys(normalized.values()):
+            cache_key = (query, limit, no_filters, "relevance", False, mode)
+            cached = self.result_cache.get(tenant_id, catalog.version, cache_key)
+            if cached is not None:
+                results[query] = cached
+            elif query:
+                pending.append(query)
+            else:
+                results[query] = (list(range(min(limit, len(catalog)))), len(catalog), None)
+        
+        if pending:
+            for query, matches in zip(pending, self._rank_many(catalog, pending, mode=mode)):
+                results[query] = (matches[:limit], len(matches), None)
+                cache_key = (query, limit, no_filters, "relevance", False, mode)
+                self.result_cache.put(tenant_id, catalog.version, cache_key, results[query])
+        
+        logger.info(f"Batch search for tenant {tenant_id}: {len(queries)} queries, {len(pending)} ranked")
+        response = {}
+        for query, key in normalized.items():
+            doc_ids, total, _ = results[key]
+            response[query] = {
+                "products": self._render_products(catalog, doc_ids, projection),
+                "total": total,
+            }
+        return response
+    
+    def _check_options(self, mode: str, projection: Optional[str]):
+        """Reject unknown search modes and projections."""
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"Unsupported search mode {mode!r}, expected one of {', '.join(SEARCH_MODES)}")
+        if projection is not None and projection not in PROJECTIONS:
+            raise ValueError(f"Unsupported projection {projection!r}, expected one of {', '.join(PROJECTIONS)}")
+    
+    def _render_products(self, catalog: TenantCatalog, doc_ids: List[int], projection: Optional[str]) -> List[Any]:
+        """Return product dictionaries, or their cached JSON bytes when a projection is given."""
+        if projection is None:
+            return [catalog.product(doc_id) for doc_id in doc_ids]
+        return get_product_payloads(catalog).get_many(doc_ids, projection)
+    
+    def _execute_search(
+        self,
+        catalog: TenantCatalog,
+        query: str,
+        limit: int,
+        filters: Dict[str, Any],
+        sort: str,
+        include_facets: bool,
+        mode: str = "lexical"
+    ) -> Tuple[List[int], int, Optional[Dict[str, Any]]]:
+        """Run a search against one catalog snapshot and return ``(page, total, facets)``."""
+        if any(value is not None for value in filters.values()) or sort != "relevance" or include_facets:
+            facets = get_catalog_facets(catalog)
+            candidates = facets.filter(**filters)
+        else:
+            facets = None
+            candidates = None
+        
+        if query:
+            matches = self._rank_products(catalog, query, candidates, mode)
+        elif candidates is not None:
+            matches = sorted(candidates)
+        else:
+            matches = range(len(catalog))
+        
+        if sort != "relevance":
+            matches = facets.sort_by_price(matches, descending=sort == "price_desc")
+        
+        facet_counts = facets.counts(matches) if include_facets else None
+        return list(matches[:limit]), len(matches), facet_counts
+    
+    def _rank_products(
+        self,
+        catalog: TenantCatalog,
+        query: str,
+        candidates: Optional[Set[int]] = None,
+        mode: str = "lexical"
+    ) -> List[int]:
+        """
+        Rank a catalog's products against a normalized query.
+        
+        Lexical mode ranks with field-weighted BM25 over the inverted index,
+        vector mode by TF-IDF cosine similarity, and hybrid mode by a blend of
+        the two. The fuzzy scan only runs when the chosen mode finds nothing.
+        
+        Args:
+            catalog: The tenant catalog snapshot to search
+            query: Lowercased, stripped query string
+            candidates: Restrict scoring to these document positions
+            mode: One of ``SEARCH_MODES``
+            
+        Returns:
+            Document positions of every match, best first
+        """
+        return self._rank_many(catalog, [query], candidates, mode)[0]
+    
+    def _rank_many(
+        self,
+        catalog: TenantCatalog,
+        queries: List[str],
+        candidates: Optional[Set[int]] = None,
+        mode: str = "lexical"
+    ) -> List[List[int]]:
+        """
+        Rank a catalog's products against several normalized queries at once.
+        
+        Each query is spell-corrected and expanded with synonyms first. Queries
+        share work: each distinct term's postings are scored once and vector
+        similarities come from one matrix product for the whole batch.
+        
+        Args:
+            catalog: The tenant catalog snapshot to search
+            queries: Lowercased, stripped query strings
+            candidates: Restrict scoring to these document positions
+            mode: One of ``SEARCH_MODES``
+            
+        Returns:
+            Document positions of every match, best first, per query
+        """
+        analyzed = [self._analyze_query(catalog, query) for query in queries]
+        if mode in ("lexical", "hybrid"):
+            lexical_scores = get_bm25_ranker(catalog).score_many(analyzed, candidates)
+        if mode in ("vector", "hybrid"):
+            similarities = get_vector_index(catalog).similarities_many([" ".join(terms) for terms in analyzed])
+        
+        rankings = []
+        for position, query in enumerate(queries):
+            if mode == "vector":
+                ranked = top_documents(similarities[:, position], candidates)
+            elif mode == "hybrid":
+                blended = blend_scores(lexical_scores[position], similarities[:, position], self.hybrid_alpha)
+                ranked = top_documents(blended, candidates)
+            else:
+                scores = lexical_scores[position]
+                ranked = sorted(scores, key=lambda doc_id: (-scores[doc_id], doc_id))
+            if ranked:
+                self._count_ranking(mode)
+            else:
+                self._count_ranking("fuzzy_fallback")
+                ranked = self._fuzzy_rank_products(catalog, query, candidates)
+            rankings.append(ranked)
+        return rankings
+    
+    def _count_ranking(self, name: str):
+        with self._stats_lock:
+            self.ranking_stats[name] += 1
+    
+    def _ranking_stats(self) -> Dict[str, int]:
+        with self._stats_lock:
+            return dict(self.ranking_stats)
+    
+    def _analyze_query(self, catalog: TenantCatalog, query: str) -> List[str]:
+        """
+        Tokenize a query, correct misspelled words and append synonyms.
+        
+        Words that are synonym keys are left alone, so a synonym such as
+        "sunblock" -> "sunscreen" works even though "sunblock" is not in the
+        catalog.
+        
+        Args:
+            catalog: The tenant catalog snapshot whose vocabulary is used
+            query: Lowercased, stripped query string
+            
+        Returns:
+            Query tokens ready for index lookup
+        """
+        terms = tokenize(query)
+        synonyms = self.synonyms.get(catalog.tenant_id)
+        if self.spelling_correction:
+            corrector = get_spelling_corrector(catalog)
+            corrected = [
+                term if term in synonyms else (corrector.correct(term) or term)
+                for term in terms
+            ]
+            if corrected != terms:
+                self._count_ranking("spelling_corrections")
+                logger.debug(f"Corrected query {query!r} to {' '.join(corrected)!r}")
+                terms = corrected
+        expanded = expand_terms(terms, synonyms)
+        if len(expanded) > len(terms):
+            self._count_ranking("synonym_expansions")
+        return expanded
+    
+    def _fuzzy_rank_products(
+        self,
+        catalog: TenantCatalog,
+        query: str,
+        candidates: Optional[Set[int]] = None
+    ) -> List[int]:
+        """
+        Rank products by fuzzy similarity for queries with no indexed term.
+        
+        Args:
+            catalog: The tenant catalog snapshot to search
+            query: Lowercased, stripped query string
+            candidates: Restrict scoring to these document positions
+            
+        Returns:
+            Document positions of every match, best first
+        """
+        # Perform fuzzy search on the prebuilt name, description and category
+        # columns; product records are only decoded for the returned results
+        names = catalog.columns['name']
+        descriptions = catalog.columns['description']
+        categories = catalog.columns['categories']
+        scored_products = []
+        doc_ids = range(len(catalog)) if candidates is None else sorted(candidates)
+        for doc_id in doc_ids:
             # Calculate fuzzy match scores
-            name_score = fuzz.partial_ratio(query, product_name)
-            description_score = fuzz.partial_ratio(query, product_description)
-            category_score = fuzz.partial_ratio(query, product_categories)
+            name_score = fuzz.partial_ratio(query, names[doc_id])
+            description_score = fuzz.partial_ratio(query, descriptions[doc_id])
+            category_score = fuzz.partial_ratio(query, categories[doc_id])
             
             # Use the highest score
             max_score = max(name_score, description_score, category_score)
             
             # Only include products with a reasonable match score
             if max_score > 30:  # Threshold for relevance
-                scored_products.append((product, max_score))
+                scored_products.append((doc_id, max_score))
         
         # Sort by score (descending) and return top results
         scored_products.sort(key=lambda x: x[1], reverse=True)
-        return [product for product, score in scored_products[:limit]]
+        return [doc_id for doc_id, score in scored_products]
+    
+    def suggest(self, tenant_id: str, prefix: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Suggest product names and categories for a partially typed query.
+        
+        Suggestions come from a prefix index built once per catalog snapshot;
+        featured and in-stock products rank first, categories by their size.
+        
+        Args:
+            tenant_id: The tenant identifier
+            prefix: Text typed so far; any word of a product name may match
+            limit: Maximum number of suggestions to return
+            
+        Returns:
+            List of suggestions with ``text``, ``type`` ("product" or "category")
+            and ``product_id`` (None for categories)
+        """
+        catalog = self.catalog_store.get(tenant_id)
+        if catalog is None or not len(catalog):
+            return []
+        
+        suggestions = []
+        for kind, target in get_suggestion_index(catalog).suggest(prefix, limit):
+            if kind == PRODUCT:
+                # Only the returned products are decoded, for their display name.
+                suggestions.append({
+                    "text": catalog.product(target).get('Name') or catalog.columns['name'][target],
+                    "type": kind,
+                    "product_id": catalog.columns['id'][target] or None,
+                })
+            else:
+                suggestions.append({"text": target, "type": kind, "product_id": None})
+        return suggestions
     
     def get_product_by_id(self, tenant_id: str, product_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -123,10 +639,13 @@ class ProductSearchService:
         Returns:
             Product dictionary or None if not found
         """
-        products = self.get_products_for_tenant(tenant_id)
-        for product in products:
-            if str(product.get('ID')) == str(product_id):
-                return product
+        catalog = self.catalog_store.get(tenant_id)
+        if catalog is None:
+            return None
+        product_id = str(product_id)
+        for doc_id, candidate_id in enumerate(catalog.columns['id']):
+            if candidate_id == product_id:
+                return catalog.product(doc_id)
         return None
     
     def get_products_by_category(self, tenant_id: str, category: str, limit: int = 10) -> List[Dict[str, Any]]:
@@ -141,16 +660,7 @@ class ProductSearchService:
         Returns:
             List of products in the category
         """
-        products = self.get_products_for_tenant(tenant_id)
-        category_lower = category.lower()
-        
-        matching_products = []
-        for product in products:
-            product_categories = product.get('Categories', '').lower()
-            if category_lower in product_categories:
-                matching_products.append(product)
-        
-        return matching_products[:limit]
+        return self._filter_column(tenant_id, 'categories', category, limit)
     
     def get_products_by_brand(self, tenant_id: str, brand: str, limit: int = 10) -> List[Dict[str, Any]]:
         """
@@ -164,16 +674,39 @@ class ProductSearchService:
         Returns:
             List of products from the brand
         """
-        products = self.get_products_for_tenant(tenant_id)
-        brand_lower = brand.lower()
+        return self._filter_column(tenant_id, 'brand', brand, limit)
+    
+    def _filter_column(self, tenant_id: str, column: str, value: str, limit: int) -> List[Dict[str, Any]]:
+        """Return products whose lowercased search column contains a substring."""
+        catalog = self.catalog_store.get(tenant_id)
+        if catalog is None:
+            return []
+        value_lower = value.lower()
         
         matching_products = []
-        for product in products:
-            product_brand = product.get('Brand', '').lower()
-            if brand_lower in product_brand:
-                matching_products.append(product)
+        for doc_id, column_value in enumerate(catalog.columns[column]):
+            if value_lower in column_value:
+                matching_products.append(catalog.product(doc_id))
+                if len(matching_products) >= limit:
+                    break
+        
+        return matching_products
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get counters for the catalog store, the search result cache, ranking
+        and the search worker pool.
         
-        return matching_products[:limit]
+        Returns:
+            Dictionary with ``catalogs``, ``result_cache``, ``ranking`` and
+            ``worker_pool`` sections
+        """
+        return {
+            "catalogs": self.catalog_store.stats(),
+            "result_cache": self.result_cache.stats(),
+            "ranking": self._ranking_stats(),
+            "worker_pool": self.worker_pool.stats(),
+        }
     
     def format_product_response(self, product: Dict[str, Any]) -> str:
         """
@@ -201,4 +734,34 @@ Price: {price}
 Description: {description}
         """.strip()
         
-        return formatted
\ No newline at end of file
+        return formatted
+
+
+@lru_cache(maxsize=None)
+def get_product_search_service() -> ProductSearchService:
+    """
+    Return the process-wide product search service configured from settings.
+    
+    Sharing one instance means each tenant catalog is loaded once per process
+    rather than once per router or service that searches products.
+    """
+    from app.config.settings import settings
+
+    service = ProductSearchService(
+        data_directory=settings.PRODUCT_CATALOG_DIR,
+        memory_budget_mb=settings.PRODUCT_CATALOG_MEMORY_BUDGET_MB,
+        prewarm_tenants=settings.PRODUCT_CATALOG_PREWARM_TENANTS,
+        cache_size=settings.PRODUCT_SEARCH_CACHE_SIZE,
+        cache_ttl_seconds=settings.PRODUCT_SEARCH_CACHE_TTL_SECONDS,
+        hybrid_alpha=settings.PRODUCT_SEARCH_HYBRID_ALPHA,
+        spelling_correction=settings.PRODUCT_SEARCH_SPELLING_CORRECTION,
+        synonyms=settings.PRODUCT_SEARCH_SYNONYMS,
+        synonyms_directory=settings.PRODUCT_SEARCH_SYNONYMS_DIR,
+        search_workers=settings.PRODUCT_SEARCH_WORKERS,
+        max_queue_depth=settings.PRODUCT_SEARCH_MAX_QUEUE_DEPTH,
+        max_queue_per_tenant=settings.PRODUCT_SEARCH_MAX_QUEUE_PER_TENANT,
+        compile_catalogs=settings.PRODUCT_CATALOG_COMPILE_ON_LOAD
+    )
+    if settings.PRODUCT_CATALOG_RELOAD_INTERVAL_SECONDS > 0:
+        service.start_catalog_watcher(settings.PRODUCT_CATALOG_RELOAD_INTERVAL_SECONDS)
+    return service
@@ -0,0 +1,137 @@
+"""Bounded per-tenant cache of product search results."""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class _TenantPartition:
+    def __init__(self, version: int):
+        self.version = version
+        self.entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+
+
+class SearchResultCache:
+    """
+    LRU + TTL cache mapping a normalized search to the results it produced.
+
+    Entries are partitioned per tenant and tagged with the catalog version they
+    were computed against. The first lookup that sees a newer catalog version
+    drops the tenant's whole partition, so a hot reload never serves results
+    from the previous catalog. Values hold document positions rather than
+    product records; callers resolve them against the same catalog snapshot.
+    """
+
+    def __init__(
+        self,
+        max_entries_per_tenant: int = 1024,
+        ttl_seconds: float = 300.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries_per_tenant: Maximum cached searches per tenant (0 disables caching)
+            ttl_seconds: Seconds an entry stays valid (0 means no expiry)
+            clock: Monotonic time source, overridable for tests
+        """
+        self.max_entries_per_tenant = max_entries_per_tenant
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._partitions: Dict[str, _TenantPartition] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries_per_tenant > 0
+
+    def get(self, tenant_id: str, version: int, key: Hashable) -> Optional[Any]:
+        """
+        Look up a cached search result.
+
+        Args:
+            tenant_id: The tenant identifier
+            version: Version of the catalog the caller is searching
+            key: Normalized search key
+
+        Returns:
+            The cached result, or None on a miss
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            partition = self._partition(tenant_id, version)
+            entry = partition.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at and expires_at <= self._clock():
+                del partition.entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            partition.entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, tenant_id: str, version: int, key: Hashable, value: Any):
+        """
+        Store the result of a search.
+
+        Args:
+            tenant_id: The tenant identifier
+            version: Version of the catalog the results were computed against
+            key: Normalized search key
+            value: Result built from document positions; treated as immutable
+        """
+        if not self.enabled:
+            return
+        expires_at = self._clock() + self.ttl_seconds if self.ttl_seconds else 0.0
+        with self._lock:
+            partition = self._partition(tenant_id, version)
+            if partition.version != version:
+                # Results computed against an older snapshot than the one now cached.
+                return
+            partition.entries[key] = (expires_at, value)
+            partition.entries.move_to_end(key)
+            while len(partition.entries) > self.max_entries_per_tenant:
+                partition.entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, tenant_id: str):
+        """Drop every cached search for a tenant."""
+        with self._lock:
+            if self._partitions.pop(tenant_id, None) is not None:
+                self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit, miss and eviction counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "tenants": len(self._partitions),
+                "entries": sum(len(partition.entries) for partition in self._partitions.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+    def _partition(self, tenant_id: str, version: int) -> _TenantPartition:
+        partition = self._partitions.get(tenant_id)
+        if partition is None:
+            partition = self._partitions[tenant_id] = _TenantPartition(version)
+        elif partition.version < version:
+            partition.entries.clear()
+            partition.version = version
+            self.invalidations += 1
+        return partition
@@ -0,0 +1,147 @@
+"""Bounded, tenant-fair worker pool that keeps search CPU work off the event loop."""
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class SearchQueueFullError(RuntimeError):
+    """Raised when a search cannot be queued because the pool is saturated."""
+
+
+class SearchWorkerPool:
+    """
+    Runs synchronous search calls on worker threads for async callers.
+
+    Waiting searches are queued per tenant and dispatched round-robin across
+    tenants, so one tenant's burst cannot starve the others. Queue depth is
+    bounded overall and per tenant; past either bound new searches are
+    rejected immediately instead of piling up behind the workers.
+
+    Threads rather than processes: catalogs, derived indexes and the result
+    cache live in this process, and the numeric ranking paths release the GIL.
+    """
+
+    def __init__(self, max_workers: int = 4, max_queue_depth: int = 256, max_queue_per_tenant: int = 64):
+        """
+        Initialize the pool.
+
+        Args:
+            max_workers: Searches running at the same time
+            max_queue_depth: Searches waiting across all tenants before rejecting
+            max_queue_per_tenant: Searches one tenant may have waiting
+        """
+        self.max_workers = max_workers
+        self.max_queue_depth = max_queue_depth
+        self.max_queue_per_tenant = max_queue_per_tenant
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="product-search")
+        self._lock = threading.Lock()
+        # tenant_id -> waiting tasks; key order is the round-robin order
+        self._queues: "OrderedDict[str, Deque[Tuple]]" = OrderedDict()
+        self._queued = 0
+        self._active = 0
+        self.submitted = 0
+        self.completed = 0
+        self.rejected = 0
+        self.max_wait_seconds = 0.0
+
+    async def run(self, tenant_id: str, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run a synchronous call on a worker and wait for its result.
+
+        Args:
+            tenant_id: Tenant the call is made for, used for fairness and limits
+            func: The synchronous callable
+            *args: Positional arguments for ``func``
+            **kwargs: Keyword arguments for ``func``
+
+        Returns:
+            Whatever ``func`` returns
+
+        Raises:
+            SearchQueueFullError: If the overall or the tenant's queue is full
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self._lock:
+            queue = self._queues.get(tenant_id)
+            if self._queued >= self.max_queue_depth or (
+                queue is not None and len(queue) >= self.max_queue_per_tenant
+            ):
+                self.rejected += 1
+                raise SearchQueueFullError(f"Search queue is full for tenant {tenant_id}")
+            if queue is None:
+                queue = self._queues[tenant_id] = deque()
+            queue.append((func, args, kwargs, loop, future, time.monotonic()))
+            self._queued += 1
+            self.submitted += 1
+            self._dispatch()
+        return await future
+
+    def _dispatch(self):
+        """Start queued tasks on free workers, one tenant at a time. Caller holds the lock."""
+        while self._active < self.max_workers and self._queues:
+            tenant_id, queue = next(iter(self._queues.items()))
+            task = queue.popleft()
+            self._queued -= 1
+            # Move the tenant to the back of the rotation, or drop it when drained.
+            del self._queues[tenant_id]
+            if queue:
+                self._queues[tenant_id] = queue
+            if task[4].cancelled():
+                continue
+            self.max_wait_seconds = max(self.max_wait_seconds, time.monotonic() - task[5])
+            self._active += 1
+            self._executor.submit(self._execute, task)
+
+    def _execute(self, task: Tuple):
+        func, args, kwargs, loop, future, _ = task
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            self._resolve(loop, future, None, e)
+        else:
+            self._resolve(loop, future, result, None)
+        finally:
+            with self._lock:
+                self._active -= 1
+                self.completed += 1
+                self._dispatch()
+
+    @staticmethod
+    def _resolve(loop: asyncio.AbstractEventLoop, future: asyncio.Future, result: Any, error: Any):
+        def settle():
+            if future.done():
+                return
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+        try:
+            loop.call_soon_threadsafe(settle)
+        except RuntimeError:
+            # The caller's loop has closed; nobody is waiting for the result.
+            logger.debug("Dropped search result for a closed event loop")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return queue depth, concurrency and rejection counters."""
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "active": self._active,
+                "queued": self._queued,
+                "queued_tenants": len(self._queues),
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "max_wait_ms": round(self.max_wait_seconds * 1000, 3),
+            }
+
+    def shutdown(self):
+        """Stop the worker threads once running searches finish."""
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,144 @@
+"""Symmetric-delete (SymSpell-style) spelling correction over a catalog's vocabulary."""
+from typing import Dict, List, Optional, Set
+
+from app.services.product_search.catalog import TenantCatalog
+
+MAX_EDIT_DISTANCE = 2
+# Only the first characters of a word generate deletes; typos past the prefix
+# are still caught by the edit distance check on the candidates it finds.
+PREFIX_LENGTH = 7
+MIN_WORD_LENGTH = 3
+
+# Query filler words that are often missing from product text; correcting
+# them would add noise terms ("for" -> "form").
+STOP_WORDS = frozenset({
+    "a", "an", "and", "any", "are", "best", "buy", "can", "do", "does", "for", "from",
+    "good", "have", "i", "in", "is", "it", "me", "my", "need", "of", "on", "or",
+    "please", "show", "some", "something", "that", "the", "to", "want", "what",
+    "which", "with", "you", "your",
+})
+
+
+def _deletes(word: str, max_distance: int) -> Set[str]:
+    """Return every string reachable from a word by up to ``max_distance`` deletions."""
+    results: Set[str] = set()
+    frontier = {word}
+    for _ in range(max_distance):
+        next_frontier = set()
+        for candidate in frontier:
+            if len(candidate) <= 1:
+                continue
+            for position in range(len(candidate)):
+                deleted = candidate[:position] + candidate[position + 1:]
+                if deleted not in results:
+                    results.add(deleted)
+                    next_frontier.add(deleted)
+        frontier = next_frontier
+    return results
+
+
+def edit_distance(source: str, target: str, max_distance: int) -> int:
+    """
+    Optimal string alignment distance (Levenshtein plus adjacent transpositions).
+
+    Args:
+        source: First string
+        target: Second string
+        max_distance: Distances above this are not needed exactly
+
+    Returns:
+        The distance, or ``max_distance + 1`` if it exceeds ``max_distance``
+    """
+    if abs(len(source) - len(target)) > max_distance:
+        return max_distance + 1
+    previous_previous: List[int] = []
+    previous = list(range(len(target) + 1))
+    for i in range(1, len(source) + 1):
+        current = [i] + [0] * len(target)
+        for j in range(1, len(target) + 1):
+            cost = 0 if source[i - 1] == target[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (
+                i > 1 and j > 1
+                and source[i - 1] == target[j - 2]
+                and source[i - 2] == target[j - 1]
+            ):
+                current[j] = min(current[j], previous_previous[j - 2] + 1)
+        # Transpositions reach back two rows, so both must exceed the bound.
+        if min(current) > max_distance and min(previous) > max_distance:
+            return max_distance + 1
+        previous_previous, previous = previous, current
+    return previous[-1]
+
+
+class SpellingCorrector:
+    """
+    Spelling dictionary built from the indexed terms of one catalog snapshot.
+
+    Every term and its deletions (up to ``MAX_EDIT_DISTANCE`` characters) map
+    back to the term. A misspelled word is corrected by generating its own
+    deletions and looking them up, so only a handful of candidates need an
+    edit distance check instead of the whole vocabulary.
+    """
+
+    def __init__(self, catalog: TenantCatalog, max_distance: int = MAX_EDIT_DISTANCE):
+        """
+        Build the delete dictionary from the catalog's inverted index.
+
+        Args:
+            catalog: The catalog snapshot
+            max_distance: Largest edit distance a correction may have
+        """
+        self.max_distance = max_distance
+        # Number of postings approximates how common a term is in the catalog.
+        self.frequencies: Dict[str, int] = {
+            term: len(postings) // 3 for term, postings in catalog.index.items()
+        }
+        self.deletes: Dict[str, List[str]] = {}
+        for term in self.frequencies:
+            if len(term) < MIN_WORD_LENGTH or term.isdigit():
+                continue
+            prefix = term[:PREFIX_LENGTH]
+            for variant in _deletes(prefix, max_distance) | {prefix}:
+                self.deletes.setdefault(variant, []).append(term)
+
+    def correct(self, word: str) -> Optional[str]:
+        """
+        Find the closest catalog term to an unknown word.
+
+        Args:
+            word: Normalized query token
+
+        Returns:
+            The correction (lowest distance, then most frequent), or None if
+            the word is known, too short to correct, or has no close term
+        """
+        if (
+            word in self.frequencies or len(word) < MIN_WORD_LENGTH
+            or word.isdigit() or word in STOP_WORDS
+        ):
+            return None
+        # Short words tolerate fewer edits, or nearly everything would match.
+        max_distance = 1 if len(word) <= 4 else self.max_distance
+        prefix = word[:PREFIX_LENGTH]
+
+        best: Optional[str] = None
+        best_key = None
+        checked: Set[str] = set()
+        for variant in _deletes(prefix, max_distance) | {prefix}:
+            for term in self.deletes.get(variant, ()):
+                if term in checked:
+                    continue
+                checked.add(term)
+                distance = edit_distance(word, term, max_distance)
+                if distance > max_distance:
+                    continue
+                key = (distance, -self.frequencies[term], term)
+                if best_key is None or key < best_key:
+                    best, best_key = term, key
+        return best
+
+
+def get_spelling_corrector(catalog: TenantCatalog) -> SpellingCorrector:
+    """Return the spelling dictionary of a catalog snapshot, building it on first use."""
+    return catalog.derived("spelling", SpellingCorrector)
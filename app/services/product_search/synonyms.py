@@ -0,0 +1,151 @@
+"""Configurable query synonym maps, global and per tenant."""
+import json
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.services.product_search.catalog import file_signature
+from app.services.product_search.catalog_store import is_valid_tenant_id
+from app.services.product_search.text import tokenize
+
+logger = logging.getLogger(__name__)
+
+SynonymMap = Dict[str, List[str]]
+
+
+def normalize_synonyms(raw: Dict[str, List[str]]) -> SynonymMap:
+    """
+    Normalize a synonym mapping to single-token keys and token expansions.
+
+    Args:
+        raw: Mapping of a term to the terms or phrases it should also match,
+            e.g. ``{"spf": ["sunscreen"], "moisturiser": ["moisturizer"]}``
+
+    Returns:
+        Mapping of normalized term to normalized expansion tokens
+    """
+    synonyms: SynonymMap = {}
+    for term, expansions in raw.items():
+        key = " ".join(tokenize(term))
+        if not key or " " in key:
+            logger.warning(f"Ignoring synonym key {term!r}: keys must be single words")
+            continue
+        if isinstance(expansions, str):
+            expansions = [expansions]
+        tokens = synonyms.setdefault(key, [])
+        for expansion in expansions:
+            for token in tokenize(expansion):
+                if token != key and token not in tokens:
+                    tokens.append(token)
+    return synonyms
+
+
+class SynonymStore:
+    """
+    Synonym maps for query expansion.
+
+    Global synonyms come from settings; a tenant may add or override entries
+    in ``<directory>/<tenant_id>.json``. Tenant files are re-read when they
+    change, checked at most once per ``check_interval_seconds``, and
+    ``on_change`` is called so cached search results can be dropped.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        defaults: Optional[Dict[str, List[str]]] = None,
+        check_interval_seconds: float = 5.0,
+        on_change: Optional[Callable[[str], None]] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize the synonym store.
+
+        Args:
+            directory: Directory holding per-tenant synonym files
+            defaults: Synonyms applied to every tenant
+            check_interval_seconds: Minimum seconds between checks of a tenant's file
+            on_change: Called with the tenant ID when its synonyms change
+            clock: Monotonic time source (injectable for tests)
+        """
+        self.directory = directory
+        self.defaults = normalize_synonyms(defaults or {})
+        self.check_interval_seconds = check_interval_seconds
+        self.on_change = on_change
+        self._clock = clock
+        self._lock = threading.Lock()
+        # tenant_id -> (signature, merged synonyms, last check time)
+        self._tenants: Dict[str, Tuple[Optional[Tuple[int, int]], SynonymMap, float]] = {}
+
+    def synonyms_path(self, tenant_id: str) -> str:
+        """Return the path of a tenant's synonym file."""
+        return os.path.join(self.directory, f"{tenant_id}.json")
+
+    def get(self, tenant_id: str) -> SynonymMap:
+        """
+        Get the synonyms that apply to a tenant.
+
+        Args:
+            tenant_id: The tenant identifier
+
+        Returns:
+            Mapping of normalized term to expansion tokens
+        """
+        if not is_valid_tenant_id(tenant_id):
+            return self.defaults
+        now = self._clock()
+        entry = self._tenants.get(tenant_id)
+        if entry is not None and now - entry[2] < self.check_interval_seconds:
+            return entry[1]
+
+        with self._lock:
+            entry = self._tenants.get(tenant_id)
+            signature = file_signature(self.synonyms_path(tenant_id))
+            if entry is not None and entry[0] == signature:
+                self._tenants[tenant_id] = (signature, entry[1], now)
+                return entry[1]
+
+            synonyms = dict(self.defaults)
+            if signature is not None:
+                synonyms.update(self._load(tenant_id))
+            self._tenants[tenant_id] = (signature, synonyms, now)
+
+        if entry is not None and self.on_change is not None:
+            logger.info(f"Synonyms changed for tenant {tenant_id}")
+            self.on_change(tenant_id)
+        return synonyms
+
+    def _load(self, tenant_id: str) -> SynonymMap:
+        file_path = self.synonyms_path(tenant_id)
+        try:
+            with open(file_path, 'r', encoding='utf-8') as file:
+                raw = json.load(file)
+            if not isinstance(raw, dict):
+                raise ValueError("expected an object mapping terms to lists of synonyms")
+            return normalize_synonyms(raw)
+        except Exception as e:
+            logger.error(f"Error loading synonyms from {file_path}: {e}")
+            return {}
+
+
+def expand_terms(terms: List[str], synonyms: SynonymMap) -> List[str]:
+    """
+    Append the synonyms of each term to a token list.
+
+    Args:
+        terms: Normalized query tokens
+        synonyms: Mapping of normalized term to expansion tokens
+
+    Returns:
+        The tokens followed by any expansions not already present
+    """
+    if not synonyms:
+        return terms
+    expanded = list(terms)
+    for term in terms:
+        for synonym in synonyms.get(term, ()):
+            if synonym not in expanded:
+                expanded.append(synonym)
+    return expanded
@@ -0,0 +1,44 @@
+"""Text normalization shared by catalog indexing and query parsing."""
+import html
+import re
+import unicodedata
+from typing import Any, List
+
+_TAG_RE = re.compile(r'<[^>]+>')
+_TOKEN_RE = re.compile(r'\w+')
+
+
+def normalize_text(value: Any) -> str:
+    """
+    Normalize a catalog value or query for matching.
+
+    Strips HTML tags and entities (WooCommerce descriptions are HTML), applies
+    NFKC so full-width and compatibility characters compare equal, and case-folds.
+
+    Args:
+        value: Raw field value; None and non-strings are accepted
+
+    Returns:
+        The normalized string
+    """
+    if value is None:
+        return ''
+    text = str(value)
+    if '<' in text:
+        text = _TAG_RE.sub(' ', text)
+    if '&' in text:
+        text = html.unescape(text)
+    return unicodedata.normalize('NFKC', text).casefold()
+
+
+def tokenize(value: Any) -> List[str]:
+    """
+    Split a value into normalized word tokens.
+
+    Args:
+        value: Raw field value or query
+
+    Returns:
+        List of tokens in their original order
+    """
+    return _TOKEN_RE.findall(normalize_text(value))
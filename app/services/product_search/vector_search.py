@@ -0,0 +1,268 @@
+"""Local TF-IDF similarity search over hashed word and character n-grams."""
+import math
+import zlib
+from array import array
+from collections import Counter
+from typing import Dict, List, Mapping, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from app.services.product_search.catalog import SEARCH_FIELDS, TenantCatalog
+from app.services.product_search.ranking import FIELD_WEIGHTS
+from app.services.product_search.text import tokenize
+
+SEARCH_MODES = ("lexical", "vector", "hybrid")
+
+N_FEATURES = 1 << 18
+CHAR_NGRAM = 3
+# Cosine similarities below this are treated as no match.
+MIN_SIMILARITY = 0.02
+
+
+def _feature(text: str) -> int:
+    # crc32 rather than hash() so vectors are identical across processes.
+    return zlib.crc32(text.encode('utf-8')) & (N_FEATURES - 1)
+
+
+def extract_features(tokens: List[str]) -> Counter:
+    """
+    Hash tokens into word and character n-gram feature counts.
+
+    Character trigrams of each padded word let loosely phrased or misspelled
+    queries ("moisturiser") still overlap with catalog text ("moisturizer").
+
+    Args:
+        tokens: Normalized tokens
+
+    Returns:
+        Counter of feature index to raw count
+    """
+    features = Counter()
+    for token in tokens:
+        features[_feature(f"w:{token}")] += 1
+        padded = f" {token} "
+        for start in range(max(len(padded) - CHAR_NGRAM + 1, 1)):
+            features[_feature(f"c:{padded[start:start + CHAR_NGRAM]}")] += 1
+    return features
+
+
+class TermRowBuilder:
+    """
+    Accumulates per-document term-frequency rows, one document at a time.
+
+    Rows hold field-weighted, log-scaled feature counts before IDF weighting
+    and are kept in flat typed arrays rather than Python lists, so building
+    the matrix for a large catalog stays compact.
+    """
+
+    def __init__(self):
+        self._indptr = array('i', [0])
+        self._indices = array('i')
+        self._values = array('f')
+
+    def __len__(self) -> int:
+        return len(self._indptr) - 1
+
+    def add(self, fields: Mapping[str, str]):
+        """
+        Append the row of one document.
+
+        Args:
+            fields: The document's lowercased search field values
+        """
+        weighted: Dict[int, float] = {}
+        for name, _ in SEARCH_FIELDS:
+            weight = FIELD_WEIGHTS.get(name, 1.0)
+            for feature, count in extract_features(tokenize(fields[name])).items():
+                weighted[feature] = weighted.get(feature, 0.0) + weight * count
+        self._indices.extend(weighted.keys())
+        self._values.extend(1.0 + math.log(count) if count >= 1.0 else count for count in weighted.values())
+        self._indptr.append(len(self._indices))
+
+    def matrix(self) -> sparse.csr_matrix:
+        """Return the rows added so far as a documents x features matrix."""
+        return sparse.csr_matrix((
+            np.array(self._values, dtype=np.float32),
+            np.array(self._indices, dtype=np.int32),
+            np.array(self._indptr, dtype=np.int32),
+        ), shape=(len(self), N_FEATURES))
+
+
+class VectorIndex:
+    """
+    Sparse TF-IDF matrix for one catalog snapshot.
+
+    Rows are products and are L2-normalized, so a query is answered by one
+    sparse matrix-vector product followed by a top-k selection. Field weights
+    match the BM25 ranker so both modes agree on what matters.
+    """
+
+    def __init__(self, catalog: TenantCatalog, term_rows: Optional[sparse.csr_matrix] = None):
+        """
+        Build the TF-IDF matrix from the catalog's search columns.
+
+        Args:
+            catalog: The catalog snapshot
+            term_rows: Term-frequency rows of every document, as built by
+                ``TermRowBuilder``; computed from the columns when omitted
+        """
+        self.doc_count = len(catalog)
+        self.params = {
+            "n_features": N_FEATURES,
+            "char_ngram": CHAR_NGRAM,
+            "field_weights": {name: FIELD_WEIGHTS.get(name, 1.0) for name, _ in SEARCH_FIELDS},
+        }
+        stored = catalog.precomputed.get("tfidf")
+        if stored is not None and stored["params"] == self.params:
+            # Zero-copy views into a compiled artifact shared by every worker.
+            index_dtype = np.dtype(stored.get("index_dtype", "int32"))
+            self.idf = np.frombuffer(stored["idf"], dtype=np.float32)
+            self.matrix = sparse.csc_matrix((
+                np.frombuffer(stored["data"], dtype=np.float32),
+                np.frombuffer(stored["indices"], dtype=index_dtype),
+                np.frombuffer(stored["indptr"], dtype=index_dtype),
+            ), shape=(self.doc_count, N_FEATURES), copy=False)
+            return
+
+        if term_rows is None:
+            builder = TermRowBuilder()
+            for doc_id in range(self.doc_count):
+                builder.add({name: catalog.columns[name][doc_id] for name, _ in SEARCH_FIELDS})
+            term_rows = builder.matrix()
+
+        document_frequency = np.bincount(term_rows.indices, minlength=N_FEATURES)
+        self.idf = (np.log((1.0 + self.doc_count) / (1.0 + document_frequency)) + 1.0).astype(np.float32)
+        matrix = term_rows.multiply(self.idf).tocsr()
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        norms[norms == 0] = 1.0
+        # CSC makes selecting the handful of query feature columns cheap.
+        self.matrix = sparse.diags(1.0 / norms).dot(matrix).tocsc().astype(np.float32)
+
+    def term_rows(self, doc_ids: Sequence[int]) -> sparse.csr_matrix:
+        """
+        Recover the term-frequency rows of some documents from the TF-IDF matrix.
+
+        Each row comes back scaled by an unknown per-row constant, which is
+        harmless: rows are only used for their non-zero pattern and are
+        L2-normalized again after IDF weighting. This lets a changed catalog
+        reuse the rows of its unchanged products instead of re-tokenizing them.
+
+        Args:
+            doc_ids: Document positions, in the order the rows should appear
+
+        Returns:
+            A ``len(doc_ids)`` x features matrix
+        """
+        rows = self.matrix.tocsr()[np.asarray(doc_ids, dtype=np.int64)]
+        return rows.dot(sparse.diags(1.0 / self.idf.astype(np.float64))).astype(np.float32).tocsr()
+
+    def query_vector(self, query: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the non-zero feature indices and L2-normalized TF-IDF weights of a query."""
+        features = extract_features(tokenize(query))
+        if not features:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        indices = np.fromiter(features.keys(), dtype=np.int64, count=len(features))
+        counts = np.fromiter(features.values(), dtype=np.float32, count=len(features))
+        weights = (1.0 + np.log(counts)) * self.idf[indices]
+        norm = np.linalg.norm(weights)
+        return indices, weights / norm if norm else weights
+
+    def similarities(self, query: str) -> np.ndarray:
+        """
+        Compute the cosine similarity of every product to a query.
+
+        Args:
+            query: Raw or normalized query text
+
+        Returns:
+            Dense array with one similarity per document position
+        """
+        indices, weights = self.query_vector(query)
+        if not len(indices):
+            return np.zeros(self.doc_count, dtype=np.float32)
+        return np.asarray(self.matrix[:, indices].dot(weights)).ravel()
+
+    def similarities_many(self, queries: List[str]) -> np.ndarray:
+        """
+        Compute the cosine similarity of every product to several queries at once.
+
+        Only the union of the queries' feature columns is sliced out of the
+        catalog matrix, and it is multiplied once for the whole batch.
+
+        Args:
+            queries: Raw or normalized query texts
+
+        Returns:
+            Dense ``(documents, queries)`` array of similarities
+        """
+        vectors = [self.query_vector(query) for query in queries]
+        features = np.unique(np.concatenate([indices for indices, _ in vectors] or [np.empty(0, dtype=np.int64)]))
+        if not len(features):
+            return np.zeros((self.doc_count, len(queries)), dtype=np.float32)
+        weights = np.zeros((len(features), len(queries)), dtype=np.float32)
+        for column, (indices, query_weights) in enumerate(vectors):
+            weights[np.searchsorted(features, indices), column] = query_weights
+        return np.asarray(self.matrix[:, features].dot(weights))
+
+    def rank(self, query: str, candidates: Optional[Set[int]] = None) -> List[int]:
+        """Return document positions above the similarity floor, most similar first."""
+        scores = self.similarities(query)
+        return top_documents(scores, candidates)
+
+
+def top_documents(scores: np.ndarray, candidates: Optional[Set[int]] = None, limit: Optional[int] = None) -> List[int]:
+    """
+    Select the best-scoring documents above ``MIN_SIMILARITY``.
+
+    Args:
+        scores: One score per document position
+        candidates: Restrict results to these document positions
+        limit: Only order the top ``limit`` documents (argpartition), if given
+
+    Returns:
+        Document positions, best first
+    """
+    if candidates is not None:
+        mask = np.zeros(len(scores), dtype=bool)
+        mask[np.fromiter(candidates, dtype=np.int64, count=len(candidates))] = True
+        scores = np.where(mask, scores, 0.0)
+    matches = np.flatnonzero(scores > MIN_SIMILARITY)
+    if limit is not None and len(matches) > limit:
+        matches = matches[np.argpartition(-scores[matches], limit - 1)[:limit]]
+    # Stable sort on the negated score keeps catalog order for ties.
+    order = np.argsort(-scores[matches], kind='stable')
+    return matches[order].tolist()
+
+
+def blend_scores(
+    lexical: Dict[int, float],
+    similarities: np.ndarray,
+    alpha: float
+) -> np.ndarray:
+    """
+    Blend BM25 and cosine scores into one ranking score.
+
+    BM25 scores are divided by the best BM25 score of the query so both
+    signals lie in ``[0, 1]`` before weighting.
+
+    Args:
+        lexical: BM25 score per matching document position
+        similarities: Cosine similarity per document position
+        alpha: Weight of the lexical score (``1 - alpha`` goes to the vector score)
+
+    Returns:
+        Blended score per document position
+    """
+    blended = (1.0 - alpha) * similarities
+    if lexical:
+        best = max(lexical.values())
+        doc_ids = np.fromiter(lexical.keys(), dtype=np.int64, count=len(lexical))
+        lexical_scores = np.fromiter(lexical.values(), dtype=np.float32, count=len(lexical))
+        blended[doc_ids] += alpha * lexical_scores / best
+    return blended
+
+
+def get_vector_index(catalog: TenantCatalog) -> VectorIndex:
+    """Return the TF-IDF index of a catalog snapshot, building it on first use."""
+    return catalog.derived("tfidf", VectorIndex)
@@ -0,0 +1,41 @@
+import json
+from typing import Any
+
+from fastapi.responses import Response
+
+
+def render_json(value: Any) -> bytes:
+    """
+    Serialize a value to JSON, embedding ``bytes`` values verbatim.
+
+    Args:
+        value: JSON-compatible value; ``bytes`` anywhere inside it must already
+            hold a serialized JSON fragment
+
+    Returns:
+        UTF-8 encoded JSON document
+    """
+    if isinstance(value, bytes):
+        return value
+    if isinstance(value, dict):
+        return b"{" + b",".join(
+            json.dumps(str(key), ensure_ascii=False).encode('utf-8') + b":" + render_json(item)
+            for key, item in value.items()
+        ) + b"}"
+    if isinstance(value, (list, tuple)):
+        return b"[" + b",".join(render_json(item) for item in value) + b"]"
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode('utf-8')
+
+
+class RawJSONResponse(Response):
+    """
+    JSON response assembled from pre-serialized fragments.
+
+    Skips response-model validation and re-serialization entirely; the
+    caller is responsible for the fragments matching the declared schema.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return render_json(content)
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Benchmark ProductSearchService on synthetic catalogs and write JSON results.
+
+For each catalog size this measures index build time (JSON load and each
+derived structure, plus compiling the .pscat artifact), memory, and per
+workload p50/p99 latency and throughput for each search mode. The result
+cache is disabled so every query does real work.
+
+Usage:
+    python benchmarks/product_search_benchmark.py
+    python benchmarks/product_search_benchmark.py --sizes 1000,10000 --output bench.json
+    python benchmarks/product_search_benchmark.py --modes lexical,hybrid --concurrency 4
+"""
+import argparse
+import asyncio
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.product_search.autocomplete import get_suggestion_index
+from app.services.product_search.compiler import compile_catalog_file, load_compiled_catalog
+from app.services.product_search.facets import get_catalog_facets
+from app.services.product_search.product_search_service import ProductSearchService
+from app.services.product_search.ranking import get_bm25_ranker
+from app.services.product_search.spelling import get_spelling_corrector
+from app.services.product_search.vector_search import SEARCH_MODES, get_vector_index
+from benchmarks.synthetic_catalog import generate_catalog, generate_workloads
+
+TENANT = "benchmark"
+DERIVED_BUILDERS = {
+    "bm25": get_bm25_ranker,
+    "tfidf": get_vector_index,
+    "facets": get_catalog_facets,
+    "spelling": get_spelling_corrector,
+    "suggest": get_suggestion_index,
+}
+
+
+def rss_mb():
+    """Current resident set size in MB, or None where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError):
+        return None
+
+
+def percentile(sorted_values, fraction):
+    position = min(len(sorted_values) - 1, max(0, round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[position]
+
+
+def measure_latency(run, queries, repeat):
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for query in queries:
+            query_start = time.perf_counter()
+            run(query)
+            latencies.append((time.perf_counter() - query_start) * 1000)
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "queries": len(latencies),
+        "p50_ms": round(percentile(latencies, 0.50), 3),
+        "p99_ms": round(percentile(latencies, 0.99), 3),
+        "mean_ms": round(statistics.fmean(latencies), 3),
+        "max_ms": round(latencies[-1], 3),
+        "qps": round(len(latencies) / elapsed, 1),
+    }
+
+
+def measure_concurrent_throughput(service, queries, mode, concurrency):
+    """Throughput through the async worker pool with ``concurrency`` searches in flight."""
+    async def run_all():
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one(query):
+            async with semaphore:
+                await service.search_async(TENANT, query, limit=10, mode=mode)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(query) for query in queries))
+        return time.perf_counter() - start
+
+    elapsed = asyncio.run(run_all())
+    return round(len(queries) / elapsed, 1)
+
+
+def benchmark_size(size, args, data_directory):
+    products = generate_catalog(size, seed=args.seed)
+    workloads = generate_workloads(products, args.queries, seed=args.seed)
+    json_path = os.path.join(data_directory, f"{TENANT}.json")
+    with open(json_path, 'w', encoding='utf-8') as file:
+        json.dump(products, file)
+    del products
+    gc.collect()
+
+    result = {"products": size, "build_seconds": {}, "memory_mb": {}, "workloads": {}}
+    service = ProductSearchService(
+        data_directory=data_directory,
+        cache_size=0,
+        search_workers=max(1, args.concurrency),
+        max_queue_depth=max(256, args.queries),
+        max_queue_per_tenant=max(256, args.queries)
+    )
+
+    baseline = rss_mb()
+    start = time.perf_counter()
+    catalog = service.catalog_store.get(TENANT)
+    result["build_seconds"]["load_json"] = round(time.perf_counter() - start, 3)
+    for name, builder in DERIVED_BUILDERS.items():
+        start = time.perf_counter()
+        builder(catalog)
+        result["build_seconds"][name] = round(time.perf_counter() - start, 3)
+    if baseline is not None:
+        result["memory_mb"]["catalog_rss"] = round(rss_mb() - baseline, 1)
+    result["memory_mb"]["catalog_estimate"] = round(catalog.size_bytes / (1024 * 1024), 1)
+
+    start = time.perf_counter()
+    compiled_path = compile_catalog_file(json_path)
+    result["build_seconds"]["compile"] = round(time.perf_counter() - start, 3)
+    start = time.perf_counter()
+    compiled = load_compiled_catalog(TENANT, compiled_path)
+    for builder in DERIVED_BUILDERS.values():
+        builder(compiled)
+    result["build_seconds"]["load_compiled_with_derived"] = round(time.perf_counter() - start, 3)
+    result["memory_mb"]["compiled_file"] = round(os.path.getsize(compiled_path) / (1024 * 1024), 1)
+    os.remove(compiled_path)
+
+    for workload, queries in workloads.items():
+        result["workloads"][workload] = {}
+        for mode in args.modes:
+            fuzzy_before = service.ranking_stats["fuzzy_fallback"]
+            stats = measure_latency(
+                lambda query: service.search(TENANT, query, limit=10, mode=mode), queries, args.repeat
+            )
+            stats["fuzzy_fallbacks"] = service.ranking_stats["fuzzy_fallback"] - fuzzy_before
+            if args.concurrency > 1:
+                stats["concurrent_qps"] = measure_concurrent_throughput(service, queries, mode, args.concurrency)
+            result["workloads"][workload][mode] = stats
+
+    suggest_queries = [query[:length] for query in workloads["exact"] for length in (2, 4, 6)]
+    result["workloads"]["suggest"] = {
+        "prefix": measure_latency(lambda prefix: service.suggest(TENANT, prefix, 10), suggest_queries, args.repeat)
+    }
+    result["workloads"]["batch"] = {
+        "lexical": measure_latency(
+            lambda _: service.search_batch(TENANT, workloads["exact"][:20], limit=10), range(10), args.repeat
+        )
+    }
+
+    if baseline is not None:
+        result["memory_mb"]["peak_rss"] = round(rss_mb() - baseline, 1)
+    service.worker_pool.shutdown()
+    os.remove(json_path)
+    return result
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,10000,100000", help="comma-separated catalog sizes")
+    parser.add_argument("--modes", default="lexical,vector,hybrid", help="comma-separated search modes")
+    parser.add_argument("--queries", type=int, default=200, help="queries per workload")
+    parser.add_argument("--repeat", type=int, default=1, help="passes over each workload")
+    parser.add_argument("--concurrency", type=int, default=1, help="also measure pool throughput with N searches in flight")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write JSON results here instead of stdout")
+    args = parser.parse_args()
+    args.modes = [mode.strip() for mode in args.modes.split(",") if mode.strip()]
+    for mode in args.modes:
+        if mode not in SEARCH_MODES:
+            parser.error(f"unknown mode {mode!r}, expected one of {', '.join(SEARCH_MODES)}")
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "args": {key: value for key, value in vars(args).items() if key != "output"},
+        },
+        "results": [],
+    }
+    with tempfile.TemporaryDirectory(prefix="product-search-bench-") as data_directory:
+        for size in (int(value) for value in args.sizes.split(",")):
+            print(f"Benchmarking {size} products...", file=sys.stderr)
+            report["results"].append(benchmark_size(size, args, data_directory))
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(output + "\n")
+        print(f"Wrote {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Generate synthetic WooCommerce-shaped product catalogs for benchmarks.
+"""
+import random
+from typing import Any, Dict, List
+
+BRANDS = [
+    "CeraVe", "The Ordinary", "Cosrx", "Neutrogena", "La Roche-Posay", "Simple",
+    "Bioderma", "Garnier", "Nivea", "Some By Mi", "Innisfree", "Laneige",
+]
+PRODUCT_TYPES = [
+    ("Foaming Facial Cleanser", "Skin Care > Cleanser"),
+    ("Hydrating Cleanser", "Skin Care > Cleanser"),
+    ("Daily Moisturizing Lotion", "Skin Care > Moisturizer"),
+    ("Moisturizing Cream", "Skin Care > Moisturizer"),
+    ("Sunscreen SPF 50", "Skin Care > Sunscreen"),
+    ("Niacinamide Serum", "Skin Care > Serum"),
+    ("Vitamin C Serum", "Skin Care > Serum"),
+    ("Micellar Water", "Skin Care > Toner"),
+    ("Exfoliating Toner", "Skin Care > Toner"),
+    ("Anti-Dandruff Shampoo", "Hair Care > Shampoo"),
+    ("Repair Conditioner", "Hair Care > Conditioner"),
+    ("Lip Balm", "Lip Care"),
+]
+SKIN_TYPES = ["oily", "dry", "combination", "sensitive", "acne-prone", "normal"]
+BENEFITS = [
+    "hydrating", "non-comedogenic", "fragrance-free", "brightening", "soothing",
+    "oil control", "barrier repair", "gentle", "lightweight", "long lasting",
+]
+SIZES = ["30ml", "50ml", "88ml", "100ml", "236ml", "473ml"]
+META_FIELDS = [
+    "Meta: cartflows_redirect_flow_id", "Meta: cartflows_add_to_cart_text",
+    "Meta: site-sidebar-layout", "Meta: ast-site-content-layout", "Meta: site-content-style",
+    "Meta: site-sidebar-style", "Meta: theme-transparent-header-meta",
+    "Meta: astra-migrate-meta-layouts", "Meta: stick-header-meta", "Meta: _uag_css_file_name",
+    "Meta: _uag_js_file_name", "Meta: _last_change_time", "Meta: wpfoof-identifier_exists",
+    "Meta: _wp_old_date",
+]
+
+
+def generate_product(product_id: int, rng: random.Random) -> Dict[str, Any]:
+    """Generate one product record shaped like a WooCommerce CSV/JSON export row."""
+    brand = rng.choice(BRANDS)
+    product_type, category = rng.choice(PRODUCT_TYPES)
+    size = rng.choice(SIZES)
+    skin_types = rng.sample(SKIN_TYPES, 2)
+    benefits = rng.sample(BENEFITS, 3)
+    regular_price = rng.randrange(200, 4000, 10)
+    on_sale = rng.random() < 0.4
+    description = (
+        f"<p>{brand} {product_type} is a {benefits[0]}, {benefits[1]} formula made for "
+        f"{skin_types[0]} and {skin_types[1]} skin.</p><ul><li>{benefits[2].capitalize()}</li>"
+        f"<li>Dermatologist tested</li><li>Size: {size}</li></ul>"
+    )
+    product = {
+        "ID": product_id,
+        "Type": "simple",
+        "SKU": f"{brand[:3].upper()}-{product_id}",
+        "Name": f"{brand} {product_type} {size}",
+        "Published": 1,
+        "Is featured?": 1 if rng.random() < 0.1 else 0,
+        "Short description": f"<p>{benefits[0].capitalize()} {product_type.lower()} for {skin_types[0]} skin.</p>",
+        "Description": description,
+        "In stock?": 1 if rng.random() < 0.85 else 0,
+        "Stock": str(rng.randrange(0, 200)),
+        "Low stock amount": "5",
+        "Sale price": regular_price - rng.randrange(10, 150, 10) if on_sale else None,
+        "Regular price": regular_price,
+        "Categories": category,
+        "Shipping class": "",
+        "Images": f"https://example.com/images/{product_id}.jpg",
+        "Brands": brand,
+        "Brand": brand,
+    }
+    for field in META_FIELDS:
+        product[field] = "default"
+    return product
+
+
+def generate_catalog(size: int, seed: int = 42) -> List[Dict[str, Any]]:
+    """
+    Generate a deterministic synthetic catalog.
+
+    Args:
+        size: Number of products
+        seed: Random seed, so runs are comparable across releases
+
+    Returns:
+        List of product dictionaries
+    """
+    rng = random.Random(seed)
+    return [generate_product(1000 + position, rng) for position in range(size)]
+
+
+def _misspell(word: str, rng: random.Random) -> str:
+    """Apply one random typo (transposition, deletion, substitution or insertion)."""
+    if len(word) < 4:
+        return word
+    position = rng.randrange(1, len(word) - 1)
+    edit = rng.choice(("transpose", "delete", "substitute", "insert"))
+    if edit == "transpose":
+        return word[:position] + word[position + 1] + word[position] + word[position + 2:]
+    if edit == "delete":
+        return word[:position] + word[position + 1:]
+    letter = rng.choice("abcdefghijklmnopqrstuvwxyz")
+    if edit == "substitute":
+        return word[:position] + letter + word[position + 1:]
+    return word[:position] + letter + word[position:]
+
+
+def generate_workloads(
+    products: List[Dict[str, Any]],
+    queries_per_workload: int = 200,
+    seed: int = 7
+) -> Dict[str, List[str]]:
+    """
+    Generate query workloads for a synthetic catalog.
+
+    Args:
+        products: Catalog from ``generate_catalog``
+        queries_per_workload: Queries in each workload
+        seed: Random seed
+
+    Returns:
+        Mapping of workload name to queries:
+
+        - ``exact``: names or brand plus product type, as written in the catalog
+        - ``misspelled``: the same with a typo in one longer word
+        - ``category``: category and product-type words
+        - ``long_tail``: descriptive multi-attribute phrases that few products match
+    """
+    rng = random.Random(seed)
+    names = [product["Name"] for product in products]
+    count = queries_per_workload
+
+    exact = []
+    for _ in range(count):
+        if rng.random() < 0.5:
+            exact.append(rng.choice(names))
+        else:
+            exact.append(f"{rng.choice(BRANDS)} {rng.choice(PRODUCT_TYPES)[0]}")
+
+    misspelled = []
+    for query in exact:
+        words = query.split()
+        candidates = [position for position, word in enumerate(words) if len(word) > 4]
+        if candidates:
+            position = rng.choice(candidates)
+            words[position] = _misspell(words[position], rng)
+        misspelled.append(" ".join(words))
+
+    category_terms = sorted({
+        part.strip() for _, path in PRODUCT_TYPES for part in path.split(">")
+    } | {product_type.split()[-1] for product_type, _ in PRODUCT_TYPES})
+    category = [rng.choice(category_terms) for _ in range(count)]
+
+    long_tail = [
+        f"{rng.choice(BENEFITS)} {rng.choice(PRODUCT_TYPES)[0].lower()} for "
+        f"{rng.choice(SKIN_TYPES)} skin {rng.choice(SIZES)}"
+        for _ in range(count)
+    ]
+
+    return {
+        "exact": exact,
+        "misspelled": misspelled,
+        "category": category,
+        "long_tail": long_tail,
+    }
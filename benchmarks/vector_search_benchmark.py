@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Compare query latency of the TF-IDF vector mode against the lexical modes.
+
+Usage:
+    python benchmarks/vector_search_benchmark.py --products 10000
+    python benchmarks/vector_search_benchmark.py --catalog data_center/shajba.json
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.product_search.catalog import TenantCatalog
+from app.services.product_search.product_search_service import ProductSearchService
+from app.services.product_search.ranking import get_bm25_ranker
+from app.services.product_search.vector_search import get_vector_index
+from benchmarks.synthetic_catalog import generate_catalog
+
+QUERIES = [
+    "cerave cleanser",
+    "something for oily skin",
+    "sunscreen",
+    "moisturiser for dry skin",
+    "vitamin c serum",
+    "gentle fragrance free",
+]
+
+
+def time_queries(run, queries, repeat):
+    latencies = []
+    for _ in range(repeat):
+        for query in queries:
+            start = time.perf_counter()
+            run(query)
+            latencies.append((time.perf_counter() - start) * 1000)
+    return {
+        "p50_ms": round(statistics.median(latencies), 3),
+        "mean_ms": round(statistics.fmean(latencies), 3),
+        "max_ms": round(max(latencies), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--catalog", help="tenant catalog JSON file to benchmark against")
+    parser.add_argument("--products", type=int, default=5000, help="synthetic catalog size when --catalog is not given")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.catalog:
+        with open(args.catalog, 'r', encoding='utf-8') as file:
+            products = json.load(file)
+    else:
+        products = generate_catalog(args.products)
+
+    service = ProductSearchService(data_directory=os.devnull, cache_size=0)
+    catalog = TenantCatalog("benchmark", products)
+
+    start = time.perf_counter()
+    get_bm25_ranker(catalog)
+    bm25_build = time.perf_counter() - start
+    start = time.perf_counter()
+    get_vector_index(catalog)
+    vector_build = time.perf_counter() - start
+
+    results = {
+        "products": len(products),
+        "build_seconds": {"bm25": round(bm25_build, 3), "tfidf": round(vector_build, 3)},
+        "queries": {},
+    }
+    fuzzy_repeat = max(1, args.repeat // 5)
+    results["queries"]["fuzzy_scan"] = time_queries(
+        lambda query: service._fuzzy_rank_products(catalog, query.lower()), QUERIES, fuzzy_repeat
+    )
+    for mode in ("lexical", "vector", "hybrid"):
+        results["queries"][mode] = time_queries(
+            lambda query: service._rank_products(catalog, query.lower(), mode=mode), QUERIES, args.repeat
+        )
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
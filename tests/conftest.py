@@ -0,0 +1,13 @@
+"""Settings needed to import the app without a .env file."""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+for name in (
+    "MONGODB_URL", "WHATSAPP_WEBHOOK_VERIFY_TOKEN", "WHATSAPP_ACCESS_TOKEN", "WHATSAPP_PHONE_NUMBER_ID",
+    "INSTAGRAM_WEBHOOK_VERIFY_TOKEN", "INSTAGRAM_ACCESS_TOKEN",
+    "FB_PAGE_ACCESS_TOKEN", "FB_APP_SECRET", "FB_WEBHOOK_VERIFY_TOKEN",
+    "API_KEY", "SECRET_KEY",
+):
+    os.environ.setdefault(name, "test")
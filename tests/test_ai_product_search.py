@@ -0,0 +1,59 @@
+"""Product search answers from ``AIService`` and how their failures are handled."""
+import asyncio
+import logging
+
+import pytest
+
+from app.services.ai_service import AIService
+from app.services.product_search.search_pool import SearchQueueFullError
+
+
+@pytest.fixture
+def service():
+    return AIService()
+
+
+def fail_with(monkeypatch, service, error):
+    queries = []
+
+    async def search_products_async(tenant_id, query, limit=10):
+        queries.append(query)
+        raise error
+
+    monkeypatch.setattr(service.product_search_service, "search_products_async", search_products_async)
+    return queries
+
+
+def test_search_query_comes_from_message_analysis(monkeypatch, service):
+    queries = []
+
+    async def search_products_async(tenant_id, query, limit=10):
+        queries.append(query)
+        return [{"Name": "Gentle Facial Cleanser", "Sale price": 900, "Description": "Soap-free."}]
+
+    monkeypatch.setattr(service.product_search_service, "search_products_async", search_products_async)
+    reply = asyncio.run(service._handle_product_search("I'm looking for a facial cleanser", "shop"))
+    assert queries == ["facial cleanser"]
+    assert "Gentle Facial Cleanser" in reply
+
+
+def test_non_search_message_does_not_search(monkeypatch, service):
+    queries = fail_with(monkeypatch, service, AssertionError("should not search"))
+    assert asyncio.run(service._handle_product_search("thank you", "shop")) is None
+    assert queries == []
+
+
+def test_full_search_queue_falls_back_to_the_model(monkeypatch, service, caplog):
+    fail_with(monkeypatch, service, SearchQueueFullError("256 searches waiting"))
+    with caplog.at_level(logging.WARNING, logger="app.services.ai_service"):
+        assert asyncio.run(service._handle_product_search("show me sunscreen", "shop")) is None
+    assert any("search queue is full" in record.getMessage() for record in caplog.records)
+
+
+def test_search_error_is_logged_with_traceback(monkeypatch, service, caplog):
+    fail_with(monkeypatch, service, ValueError("broken catalog"))
+    with caplog.at_level(logging.ERROR, logger="app.services.ai_service"):
+        assert asyncio.run(service._handle_product_search("show me sunscreen", "shop")) is None
+    [record] = [record for record in caplog.records if record.levelno == logging.ERROR]
+    assert "broken catalog" in record.getMessage()
+    assert record.exc_info is not None
@@ -0,0 +1,208 @@
+"""Prompt assembly of ``AIService.respond_first`` and how it copes with failing calls."""
+import asyncio
+import json
+
+import pytest
+
+from app.config.settings import settings
+from app.models.lead import Message
+from app.services import ai_service as ai_service_module
+from app.services.ai_service import AIService, REPLY_FALLBACK, SALES_ASSISTANT_PROMPT, parse_reply_and_intent
+from app.services.llm.base import LLMProvider
+
+SUMMARY = "Customer Rina wants a sunscreen for oily skin."
+
+
+class RecordingProvider(LLMProvider):
+    name = "recording"
+
+    def __init__(self):
+        super().__init__("test")
+        self.calls = []
+
+    async def complete(self, messages, max_tokens=150, temperature=0.7, json_mode=False):
+        self.calls.append(messages)
+        if json_mode:
+            return json.dumps({"reply": "Sure!", "intent": "WARM"})
+        if "intent classifier" in messages[0]["content"]:
+            return "WARM"
+        return "Sure!"
+
+
+def history(count):
+    return [
+        Message(role="user" if position % 2 == 0 else "assistant", content=f"msg{position}", timestamp="t")
+        for position in range(count)
+    ]
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    provider = RecordingProvider()
+    monkeypatch.setattr(ai_service_module, "get_llm_provider", lambda tenant_id=None: provider)
+    return provider
+
+
+@pytest.mark.parametrize("combined", [True, False])
+def test_prompt_holds_summary_and_every_unsummarized_message(monkeypatch, provider, combined):
+    monkeypatch.setattr(settings, "AI_COMBINED_RESPONSE", combined)
+    service = AIService()
+
+    async def no_search(user_message, tenant_id):
+        return None
+
+    monkeypatch.setattr(service, "_handle_product_search", no_search)
+    user_context = {"tenant_id": "prompt-test", "conversation_summary": SUMMARY, "summarized_messages": 4}
+
+    async def run():
+        reply, intent = await service.respond_first("which one is best?", history(12), user_context)
+        await intent
+        return reply
+
+    assert asyncio.run(run()) == "Sure!"
+
+    reply_prompts = [messages for messages in provider.calls if messages[0]["content"].startswith(SALES_ASSISTANT_PROMPT)]
+    assert len(reply_prompts) == 1
+    prompt = reply_prompts[0]
+    assert SUMMARY in prompt[0]["content"]
+    contents = [message["content"] for message in prompt[1:]]
+    assert contents == [f"msg{position}" for position in range(4, 12)] + ["which one is best?"]
+
+
+def test_history_without_summary_is_not_sliced(monkeypatch, provider):
+    monkeypatch.setattr(settings, "AI_COMBINED_RESPONSE", False)
+    service = AIService()
+
+    async def no_search(user_message, tenant_id):
+        return None
+
+    monkeypatch.setattr(service, "_handle_product_search", no_search)
+
+    async def run():
+        reply, intent = await service.respond_first("hello again", history(4), {"tenant_id": "prompt-test"})
+        await intent
+        return reply
+
+    asyncio.run(run())
+    prompt = next(messages for messages in provider.calls if messages[0]["content"] == SALES_ASSISTANT_PROMPT)
+    assert [message["content"] for message in prompt[1:]] == ["msg0", "msg1", "msg2", "msg3", "hello again"]
+
+
+def test_intent_detection_error_resolves_to_neutral(monkeypatch, provider):
+    monkeypatch.setattr(settings, "AI_COMBINED_RESPONSE", False)
+    service = AIService()
+
+    async def no_search(user_message, tenant_id):
+        return None
+
+    async def broken_detect_intent(message, conversation_history, tenant_id=None):
+        raise TypeError("unhashable type: 'list'")
+
+    monkeypatch.setattr(service, "_handle_product_search", no_search)
+    monkeypatch.setattr(service, "detect_intent", broken_detect_intent)
+
+    async def run():
+        reply, intent = await service.respond_first("hello again", history(2), {"tenant_id": "prompt-test"})
+        return reply, await intent
+
+    assert asyncio.run(run()) == ("Sure!", "NEUTRAL")
+
+
+def test_chat_reads_only_successful_intents():
+    from app.api.v1.chat import _detected_intent
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        pending, cancelled, failed, detected = (loop.create_future() for _ in range(4))
+        cancelled.cancel()
+        failed.set_exception(RuntimeError("provider misconfigured"))
+        failed.exception()  # retrieved, as the background task would
+        detected.set_result("HOT")
+        return [_detected_intent(future) for future in (pending, cancelled, failed, detected)]
+
+    assert asyncio.run(run()) == [None, None, None, "HOT"]
+
+
+@pytest.mark.parametrize("content, parsed", [
+    ('{"reply": "Sure!", "intent": "HOT"}', ("Sure!", "HOT")),
+    ('```json\n{"reply": "Sure!", "intent": "warm"}\n```', ("Sure!", "WARM")),
+    ('Here you go: {"reply": " Sure! ", "intent": "COLD"} Thanks', ("Sure!", "COLD")),
+    ('{"response": "Sure!"}', ("Sure!", None)),
+    ('{"reply": "Sure!", "intent": "EXCITED"}', ("Sure!", None)),
+    ('{"reply": "Sure!", "intent": "HO', None),
+    ('{"intent": "HOT"}', None),
+    ('{"reply": "   ", "intent": "HOT"}', None),
+    ('["Sure!", "HOT"]', None),
+    ("Sure! The customer seems HOT.", None),
+])
+def test_parse_reply_and_intent(content, parsed):
+    assert parse_reply_and_intent(content) == parsed
+
+
+class FailingCombinedProvider(RecordingProvider):
+    """Answers the combined call with unparseable text after ``combined_delay``; other calls after ``reply_delay``."""
+
+    def __init__(self, combined_delay=0.0, reply_delay=0.0):
+        super().__init__()
+        self.combined_delay = combined_delay
+        self.reply_delay = reply_delay
+
+    async def complete(self, messages, max_tokens=150, temperature=0.7, json_mode=False):
+        if json_mode:
+            self.calls.append(messages)
+            await asyncio.sleep(self.combined_delay)
+            return "Sure! I think they are WARM"
+        if messages[0]["content"].startswith(SALES_ASSISTANT_PROMPT):
+            await asyncio.sleep(self.reply_delay)
+        return await super().complete(messages, max_tokens, temperature, json_mode)
+
+
+def respond_combined(monkeypatch, provider, message):
+    monkeypatch.setattr(settings, "AI_COMBINED_RESPONSE", True)
+    monkeypatch.setattr(ai_service_module, "get_llm_provider", lambda tenant_id=None: provider)
+    service = AIService()
+
+    async def no_search(user_message, tenant_id):
+        return None
+
+    monkeypatch.setattr(service, "_handle_product_search", no_search)
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        reply, intent = await service.respond_first(message, history(2), {"tenant_id": "prompt-test"})
+        return reply, await intent, loop.time() - started
+
+    return service, asyncio.run(run())
+
+
+def test_unparseable_combined_output_falls_back_to_two_calls(monkeypatch):
+    provider = FailingCombinedProvider()
+    service, (reply, intent, _) = respond_combined(monkeypatch, provider, "which serum is best for me?")
+    assert reply == "Sure!"
+    assert intent in ("HOT", "WARM", "COLD", "NEUTRAL")
+    system_prompts = [messages[0]["content"] for messages in provider.calls]
+    assert len([prompt for prompt in system_prompts if prompt.startswith(SALES_ASSISTANT_PROMPT + " ")]) == 1
+    assert system_prompts.count(SALES_ASSISTANT_PROMPT) == 1
+    assert service.response_stats["combined_fallback"] == 1
+
+
+def test_fallback_reply_gets_only_the_time_left(monkeypatch):
+    monkeypatch.setattr(settings, "AI_REPLY_TIMEOUT_SECONDS", 0.5)
+    monkeypatch.setattr(ai_service_module, "MIN_FALLBACK_REPLY_SECONDS", 0.05)
+    provider = FailingCombinedProvider(combined_delay=0.3, reply_delay=5.0)
+    _, (reply, _, elapsed) = respond_combined(monkeypatch, provider, "is the toner alcohol free?")
+    assert reply == REPLY_FALLBACK
+    assert elapsed < 0.8
+
+
+def test_no_fallback_call_when_the_deadline_is_nearly_spent(monkeypatch):
+    monkeypatch.setattr(settings, "AI_REPLY_TIMEOUT_SECONDS", 0.5)
+    monkeypatch.setattr(ai_service_module, "MIN_FALLBACK_REPLY_SECONDS", 0.3)
+    provider = FailingCombinedProvider(combined_delay=0.3)
+    _, (reply, _, _) = respond_combined(monkeypatch, provider, "does the balm melt in the heat?")
+    assert reply == REPLY_FALLBACK
+    assert not [
+        messages for messages in provider.calls
+        if messages[0]["content"] == SALES_ASSISTANT_PROMPT
+    ]
@@ -0,0 +1,59 @@
+"""Prefix matching and ranking of as-you-type suggestions."""
+import pytest
+
+from app.services.product_search.autocomplete import CATEGORY, PRODUCT, SuggestionIndex
+from app.services.product_search.catalog import TenantCatalog
+from benchmarks.synthetic_catalog import generate_catalog
+
+
+def product(name, categories="", featured=0, in_stock=0):
+    return {"Name": name, "Categories": categories, "Is featured?": featured, "In stock?": in_stock}
+
+
+PRODUCTS = [
+    product("CeraVe Foaming Cleanser", "Skin Care > Cleanser"),
+    product("Cosrx Snail Essence", "Skin Care > Essence", featured=1, in_stock=1),
+    product("Cleansing Balm", "Skin Care > Cleanser", in_stock=1),
+    product("Foaming Face Wash", "Skin Care", featured=1),
+]
+
+
+@pytest.fixture
+def index():
+    return SuggestionIndex(TenantCatalog("suggest", PRODUCTS))
+
+
+@pytest.mark.parametrize("prefix", ["cl", "clean", "CLEAN "])
+def test_categories_and_products_rank_by_score(index, prefix):
+    # Both cleanser categories hold two products and rank above them
+    suggestions = index.suggest(prefix)
+    assert set(suggestions[:2]) == {(CATEGORY, "skin care > cleanser"), (CATEGORY, "cleanser")}
+    assert suggestions[2:] == [(PRODUCT, 2), (PRODUCT, 0)]
+
+
+def test_featured_products_rank_first(index):
+    assert index.suggest("foam") == [(PRODUCT, 3), (PRODUCT, 0)]
+
+
+def test_any_word_of_a_name_matches(index):
+    assert index.suggest("snail") == [(PRODUCT, 1)]
+    assert index.suggest("wash") == [(PRODUCT, 3)]
+    assert index.suggest("foaming cl") == [(PRODUCT, 0)]
+
+
+def test_no_match_and_limit(index):
+    assert index.suggest("zz") == []
+    assert index.suggest("") == []
+    assert len(index.suggest("s", limit=2)) == 2
+
+
+def test_matches_brute_force_ranking():
+    index = SuggestionIndex(TenantCatalog("suggest", generate_catalog(300)))
+    for prefix in ["c", "ce", "cer", "cera", "foaming f", "serum", "la roche", "sun", "skin care"]:
+        positions = sorted(
+            (position for position, key in enumerate(index.keys) if key.startswith(prefix)),
+            key=index._rank, reverse=True
+        )
+        expected = list(dict.fromkeys(index.targets[position] for position in positions))[:10]
+        assert index.suggest(prefix, limit=10) == expected
+        assert index.suggest(prefix, limit=10) == expected  # memoized answer
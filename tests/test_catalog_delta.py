@@ -0,0 +1,82 @@
+"""SKU-level catalog edits through ``ProductSearchService.update_catalog``."""
+import json
+
+import pytest
+
+from app.services.product_search.catalog_upload import CatalogValidationError
+from app.services.product_search.product_search_service import ProductSearchService
+from benchmarks.synthetic_catalog import generate_catalog
+
+TENANT = "delta"
+
+
+@pytest.fixture
+def service(tmp_path):
+    products = generate_catalog(20)
+    for product in products[:2]:
+        product["SKU"] = None  # WooCommerce variations often have no SKU
+    with open(tmp_path / f"{TENANT}.json", "w") as file:
+        json.dump(products, file)
+    service = ProductSearchService(str(tmp_path), cache_size=0)
+    yield service
+    service.worker_pool.shutdown()
+
+
+def skus(service):
+    return [product["SKU"] for product in service.get_products_for_tenant(TENANT)]
+
+
+def new_product(sku, name, base):
+    product = dict(base, SKU=sku, Name=name)
+    product["ID"] = 99000 + len(sku)
+    return product
+
+
+def test_upsert_and_delete_by_sku(service):
+    before = skus(service)
+    version = service.get_catalog_version(TENANT)
+    template = service.get_products_for_tenant(TENANT)[5]
+    summary = service.update_catalog(
+        TENANT,
+        upserts=[
+            new_product("NEW-1", "Zanzibar Glow Serum", template),
+            new_product(before[5], "Renamed Cleanser", template),
+        ],
+        deletes=[before[6], "MISSING-SKU"],
+    )
+
+    assert (summary["added"], summary["updated"], summary["deleted"]) == (1, 1, 1)
+    assert summary["not_found"] == ["MISSING-SKU"]
+    assert summary["products"] == len(before)
+    assert summary["version"] > version
+
+    after = skus(service)
+    assert before[6] not in after
+    assert after[-2:] == ["NEW-1", before[5]]  # replaced products move to the end
+    assert after.count(None) == 2
+    assert service.search_products(TENANT, "zanzibar glow")[0]["SKU"] == "NEW-1"
+    assert service.get_products_for_tenant(TENANT)[-1]["Name"] == "Renamed Cleanser"
+
+
+@pytest.mark.parametrize("sku", ["", "   "])
+def test_empty_delete_sku_is_rejected_before_anything_applies(service, sku):
+    before = skus(service)
+    version = service.get_catalog_version(TENANT)
+    with pytest.raises(CatalogValidationError) as error:
+        service.update_catalog(TENANT, upserts=[], deletes=[before[3], sku])
+    assert error.value.errors[0]["delete_index"] == 1
+    assert skus(service) == before
+    assert service.get_catalog_version(TENANT) == version
+
+
+@pytest.mark.parametrize("sku", [None, "", " "])
+def test_upsert_without_sku_is_rejected(service, sku):
+    template = service.get_products_for_tenant(TENANT)[5]
+    with pytest.raises(CatalogValidationError):
+        service.update_catalog(TENANT, upserts=[new_product("X", "No SKU", template) | {"SKU": sku}], deletes=[])
+
+
+def test_sku_upserted_and_deleted_is_rejected(service):
+    template = service.get_products_for_tenant(TENANT)[5]
+    with pytest.raises(CatalogValidationError):
+        service.update_catalog(TENANT, upserts=[new_product("DUP", "Twice", template)], deletes=["DUP"])
@@ -0,0 +1,84 @@
+"""Lazy loading, prewarming and LRU eviction of tenant catalogs."""
+import json
+
+import pytest
+
+from app.services.product_search.catalog_store import CatalogStore
+from benchmarks.synthetic_catalog import generate_catalog
+
+TENANTS = ["alpha", "bravo", "charlie"]
+
+
+class CountingLoader:
+    def __init__(self):
+        self.paths = []
+
+    def __call__(self, file_path):
+        self.paths.append(file_path)
+        with open(file_path) as file:
+            return json.load(file)
+
+
+@pytest.fixture
+def catalog_directory(tmp_path):
+    for tenant_id in TENANTS:
+        with open(tmp_path / f"{tenant_id}.json", "w") as file:
+            json.dump(generate_catalog(50), file)
+    return str(tmp_path)
+
+
+def make_store(directory, catalogs_in_budget=0.0):
+    loader = CountingLoader()
+    budget = 0
+    if catalogs_in_budget:
+        size = CatalogStore(directory, loader=CountingLoader()).get(TENANTS[0]).size_bytes
+        budget = int(size * catalogs_in_budget)
+    return CatalogStore(directory, loader=loader, memory_budget_bytes=budget), loader
+
+
+def test_catalogs_load_on_first_use(catalog_directory):
+    store, loader = make_store(catalog_directory)
+    assert store.loaded_tenants() == []
+    assert store.available_tenants() == TENANTS
+    catalog = store.get("bravo")
+    assert len(catalog) == 50
+    assert store.get("bravo") is catalog
+    assert store.loaded_tenants() == ["bravo"]
+    assert len(loader.paths) == 1
+    assert store.stats()["hits"] == 1
+
+
+def test_least_recently_used_catalog_is_evicted(catalog_directory):
+    store, loader = make_store(catalog_directory, catalogs_in_budget=2.5)
+    store.prewarm(["alpha", "bravo"])
+    assert store.loaded_tenants() == ["alpha", "bravo"]
+    assert len(loader.paths) == 2
+
+    store.get("alpha")  # bravo is now the coldest
+    store.get("charlie")
+    assert store.loaded_tenants() == ["alpha", "charlie"]
+    assert store.stats()["evictions"] == 1
+    assert store.stats()["loaded_bytes"] <= store.memory_budget_bytes
+
+    version = store.version("bravo")
+    assert len(store.get("bravo")) == 50
+    assert store.loaded_tenants() == ["charlie", "bravo"]
+    assert len(loader.paths) == 4
+    assert store.version("bravo") == version  # same file, same version
+
+
+def test_catalog_larger_than_the_budget_is_still_served(catalog_directory):
+    store, _ = make_store(catalog_directory, catalogs_in_budget=0.5)
+    store.get("alpha")
+    assert store.get("bravo") is not None
+    assert store.loaded_tenants() == ["bravo"]
+
+
+def test_unknown_tenants_leave_no_state(catalog_directory):
+    store, loader = make_store(catalog_directory)
+    for tenant_id in [f"missing-{number}" for number in range(1000)] + ["../../etc/passwd", ".hidden", ""]:
+        assert store.get(tenant_id) is None
+        assert store.reload(tenant_id) is None
+    assert store._tenant_locks == {}
+    assert loader.paths == []
+    assert store.loaded_tenants() == []
@@ -0,0 +1,79 @@
+"""Searches over compiled ``.pscat`` catalogs match the JSON they were compiled from."""
+import json
+import os
+
+import pytest
+
+from app.services.product_search.compiler import compile_catalog_file
+from app.services.product_search.product_search_service import ProductSearchService
+from benchmarks.synthetic_catalog import generate_catalog
+
+TENANT = "parity"
+QUERIES = ["cleanser", "foaming facial cleanser", "niacinamide serum oily skin", "cerave", "lip balm 30ml", ""]
+
+
+def write_catalog(directory, products):
+    path = os.path.join(directory, f"{TENANT}.json")
+    with open(path, "w") as file:
+        json.dump(products, file)
+    return path
+
+
+@pytest.fixture
+def services(tmp_path):
+    products = generate_catalog(300)
+    json_directory = tmp_path / "json"
+    compiled_directory = tmp_path / "compiled"
+    json_directory.mkdir()
+    compiled_directory.mkdir()
+    write_catalog(str(json_directory), products)
+    compile_catalog_file(write_catalog(str(compiled_directory), products))
+    from_json = ProductSearchService(str(json_directory), cache_size=0)
+    compiled = ProductSearchService(str(compiled_directory), cache_size=0)
+    yield from_json, compiled
+    from_json.worker_pool.shutdown()
+    compiled.worker_pool.shutdown()
+
+
+def test_compiled_artifact_is_loaded(services):
+    from_json, compiled = services
+    assert from_json.catalog_store.get(TENANT).source_path.endswith(".json")
+    assert compiled.catalog_store.get(TENANT).source_path.endswith(".pscat")
+    assert list(compiled.get_products_for_tenant(TENANT)) == list(from_json.get_products_for_tenant(TENANT))
+
+
+@pytest.mark.parametrize("mode", ["lexical", "vector", "hybrid"])
+@pytest.mark.parametrize("query", QUERIES)
+def test_search_results_match(services, mode, query):
+    from_json, compiled = services
+    expected = from_json.search(TENANT, query, limit=20, mode=mode, include_facets=True)
+    actual = compiled.search(TENANT, query, limit=20, mode=mode, include_facets=True)
+    assert [product["ID"] for product in actual["products"]] == [product["ID"] for product in expected["products"]]
+    assert actual["total"] == expected["total"]
+    assert actual["facets"] == expected["facets"]
+
+
+def test_filtered_and_sorted_results_match(services):
+    from_json, compiled = services
+    options = dict(limit=15, max_price=2000, in_stock=True, sort="price_asc")
+    expected = from_json.search(TENANT, "cleanser", **options)
+    actual = compiled.search(TENANT, "cleanser", **options)
+    assert actual == expected
+
+
+def test_newer_json_wins_over_stale_artifact(tmp_path):
+    path = write_catalog(str(tmp_path), generate_catalog(30))
+    compile_catalog_file(path)
+    products = generate_catalog(30)
+    products[0]["Name"] = "Zzyzx Renamed Cleanser"
+    write_catalog(str(tmp_path), products)
+    stamp = os.stat(path).st_mtime_ns + 1_000_000_000
+    os.utime(path, ns=(stamp, stamp))
+
+    service = ProductSearchService(str(tmp_path), cache_size=0)
+    try:
+        assert service.catalog_store.get(TENANT).source_path == path
+        assert service.search(TENANT, "zzyzx")["products"][0]["Name"] == "Zzyzx Renamed Cleanser"
+    finally:
+        service.worker_pool.shutdown()
+
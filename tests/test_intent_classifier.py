@@ -0,0 +1,127 @@
+"""Local intent classification and when ``detect_intent`` escalates to the LLM."""
+import asyncio
+
+import pytest
+
+from app.services import ai_service as ai_service_module
+from app.services.ai_service import AIService
+from app.services.intent import IntentClassifier, NaiveBayesIntentModel, SEED_EXAMPLES
+from app.services.intent.analysis import feature_tokens
+from app.services.llm.base import LLMError, LLMProvider
+
+
+@pytest.fixture(scope="module")
+def model():
+    return NaiveBayesIntentModel.train(SEED_EXAMPLES)
+
+
+@pytest.fixture
+def classifier(model):
+    return IntentClassifier(model, threshold=0.9)
+
+
+class CountingProvider(LLMProvider):
+    name = "counting"
+
+    def __init__(self, answer="WARM", error=None):
+        super().__init__("test")
+        self.answer = answer
+        self.error = error
+        self.calls = 0
+
+    async def complete(self, messages, max_tokens=150, temperature=0.7, json_mode=False):
+        self.calls += 1
+        if self.error is not None:
+            raise self.error
+        return self.answer
+
+
+@pytest.mark.parametrize("message, intent", [
+    ("I want to order now", "HOT"),
+    ("what is the price", "HOT"),
+    ("any discount?", "HOT"),
+    ("how much does it cost", "HOT"),
+    ("tell me more about the serum", "WARM"),
+    ("not interested, thanks", "COLD"),
+    ("I don't want to buy anything", "COLD"),
+    ("hi there", "NEUTRAL"),
+])
+def test_clear_messages_are_settled_locally(classifier, message, intent):
+    prediction = classifier.classify(message)
+    assert prediction.intent == intent
+    assert classifier.is_confident(prediction)
+
+
+@pytest.mark.parametrize("message", ["yes", "asdf qwerty zxcv", "ok send me 3"])
+def test_ambiguous_messages_are_uncertain(classifier, message):
+    assert not classifier.is_confident(classifier.classify(message))
+
+
+def test_negated_buying_phrase_is_not_a_hot_signal(classifier):
+    prediction = classifier.classify("I don't want to buy anything")
+    assert prediction.intent != "HOT"
+
+
+def test_stats_count_confident_and_uncertain(classifier):
+    classifier.classify("I want to order now")
+    classifier.classify("yes")
+    assert classifier.stats() == {"confident": 1, "uncertain": 1, "confident_rate": 0.5}
+
+
+def test_model_round_trips_through_json(tmp_path, model):
+    path = str(tmp_path / "intent_model.json")
+    model.save(path)
+    loaded = NaiveBayesIntentModel.load(path)
+    for message in ["I want to order now", "I don't need it", "something else entirely"]:
+        tokens = feature_tokens(message)
+        assert loaded.predict(tokens) == pytest.approx(model.predict(tokens))
+
+
+@pytest.fixture
+def service(monkeypatch, classifier):
+    service = AIService()
+    service.intent_classifier = classifier
+    return service
+
+
+def use_provider(monkeypatch, provider):
+    monkeypatch.setattr(ai_service_module, "get_llm_provider", lambda tenant_id=None: provider)
+
+
+def test_confident_prediction_skips_the_llm(monkeypatch, service):
+    provider = CountingProvider(answer="COLD")
+    use_provider(monkeypatch, provider)
+    assert asyncio.run(service.detect_intent("I want to order now", [], "intent-test")) == "HOT"
+    assert provider.calls == 0
+
+
+def test_uncertain_prediction_is_escalated(monkeypatch, service):
+    provider = CountingProvider(answer="WARM")
+    use_provider(monkeypatch, provider)
+    assert asyncio.run(service.detect_intent("yes", [], "intent-test")) == "WARM"
+    assert provider.calls == 1
+
+
+def test_threshold_above_one_always_escalates(monkeypatch, model):
+    service = AIService()
+    service.intent_classifier = IntentClassifier(model, threshold=1.01)
+    provider = CountingProvider(answer="COLD")
+    use_provider(monkeypatch, provider)
+    assert asyncio.run(service.detect_intent("I want to order now", [], "intent-test")) == "COLD"
+    assert provider.calls == 1
+
+
+@pytest.mark.parametrize("message, intent", [
+    ("asdf qwerty zxcv", "COLD"),
+    ("ok send me 3 now", "HOT"),
+    ("maybe later", "WARM"),
+])
+def test_uncertain_prediction_without_provider_uses_keywords(monkeypatch, service, message, intent):
+    use_provider(monkeypatch, None)
+    assert not service.intent_classifier.is_confident(service.intent_classifier.classify(message))
+    assert asyncio.run(service.detect_intent(message, [])) == intent
+
+
+def test_llm_failure_uses_keywords(monkeypatch, service):
+    use_provider(monkeypatch, CountingProvider(error=LLMError("down", status_code=500)))
+    assert asyncio.run(service.detect_intent("asdf qwerty zxcv", [], "intent-test")) == "COLD"
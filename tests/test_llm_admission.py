@@ -0,0 +1,140 @@
+"""Adaptive concurrency, tenant rate limits and fair queueing of LLM calls."""
+import asyncio
+
+import pytest
+
+from app.services.llm.admission import LLMAdmissionController, LLMAdmissionError
+from app.services.llm.base import LLMError
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+async def call(controller, tenant_id="shop", seconds=0.0, clock=None, error=None):
+    async with controller.admit(tenant_id):
+        if clock is not None:
+            clock.now += seconds
+        if error is not None:
+            raise error
+
+
+def test_fast_calls_raise_the_limit():
+    controller = LLMAdmissionController(initial_limit=4, max_limit=64, clock=FakeClock())
+
+    async def run():
+        for _ in range(8):
+            await call(controller)
+
+    asyncio.run(run())
+    assert 5.0 < controller.limit < 6.0
+    assert controller.stats()["admitted"] == 8
+
+
+def test_slow_call_backs_off_once_per_window():
+    clock = FakeClock()
+    controller = LLMAdmissionController(
+        initial_limit=10, target_latency_seconds=5.0, latency_backoff=0.5, clock=clock
+    )
+
+    async def run():
+        await call(controller, seconds=6.0, clock=clock)
+        await call(controller, seconds=6.0, clock=clock)  # six seconds later: a new window
+        await asyncio.gather(*(call(controller) for _ in range(2)))
+
+    asyncio.run(run())
+    assert controller.limit == pytest.approx(2.5 + 1 / 2.5 + 1 / (2.5 + 1 / 2.5))
+
+
+def test_throttling_halves_the_limit_and_pauses_admission():
+    clock = FakeClock()
+    controller = LLMAdmissionController(initial_limit=8, clock=clock)
+
+    async def run():
+        with pytest.raises(LLMError):
+            await call(controller, error=LLMError("slow down", status_code=429, retry_after=3.0))
+        assert controller.stats()["paused_seconds"] == 3.0
+        clock.now += 3.5
+        with pytest.raises(LLMError) as raised:
+            await call(controller, error=LLMError("slow down", status_code=503))
+        assert raised.value.status_code == 503
+
+    asyncio.run(run())
+    assert controller.limit == 4.0  # the 503 falls in the same window as the 429
+    assert controller.stats()["throttled"] == 2
+
+
+def test_tenant_over_its_rate_is_rejected():
+    controller = LLMAdmissionController(tenant_rate=1.0, tenant_burst=2.0, queue_timeout_seconds=0.5, clock=FakeClock())
+
+    async def run():
+        await call(controller, "busy")
+        await call(controller, "busy")
+        with pytest.raises(LLMAdmissionError):
+            await call(controller, "busy")
+        await call(controller, "quiet")
+
+    asyncio.run(run())
+    assert controller.stats()["rate_limited"] == 1
+
+
+def test_waiting_calls_are_admitted_round_robin():
+    controller = LLMAdmissionController(initial_limit=1, max_limit=1)
+    order = []
+
+    async def tracked(tenant_id, name, release=None):
+        async with controller.admit(tenant_id):
+            order.append(name)
+            if release is not None:
+                await release.wait()
+
+    async def run():
+        release = asyncio.Event()
+        first = asyncio.ensure_future(tracked("a", "a1", release))
+        await asyncio.sleep(0)
+        waiting = [asyncio.ensure_future(tracked(tenant, name)) for tenant, name in
+                   [("a", "a2"), ("a", "a3"), ("b", "b1")]]
+        await asyncio.sleep(0)
+        assert controller.stats()["queued"] == 3
+        release.set()
+        await asyncio.gather(first, *waiting)
+
+    asyncio.run(run())
+    assert order == ["a1", "a2", "b1", "a3"]
+
+
+def test_call_not_admitted_before_its_deadline_fails():
+    controller = LLMAdmissionController(initial_limit=1, max_limit=1, queue_timeout_seconds=0.05)
+
+    async def run():
+        release = asyncio.Event()
+
+        async def hold():
+            async with controller.admit("shop"):
+                await release.wait()
+
+        holder = asyncio.ensure_future(hold())
+        await asyncio.sleep(0)
+        with pytest.raises(LLMAdmissionError):
+            await call(controller)
+        release.set()
+        await holder
+        await call(controller)  # the expired waiter did not leak a slot
+
+    asyncio.run(run())
+    assert controller.stats()["expired"] == 1
+    assert controller.stats()["in_flight"] == 0
+
+
+def test_disabled_controller_admits_everything():
+    controller = LLMAdmissionController(max_limit=0)
+
+    async def run():
+        await asyncio.gather(*(call(controller) for _ in range(100)))
+
+    asyncio.run(run())
+    assert controller.stats()["admitted"] == 0
@@ -0,0 +1,149 @@
+"""Per-tenant LRU + TTL caching of LLM responses to repeated messages."""
+import asyncio
+
+import pytest
+
+from app.config.settings import settings
+from app.models.lead import Message
+from app.services import ai_service as ai_service_module
+from app.services.ai_service import AIService
+from app.services.llm.base import LLMProvider
+from app.services.llm.response_cache import LLMResponseCache, history_fingerprint, normalize_message
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def message(role, content):
+    return Message(role=role, content=content, timestamp="t")
+
+
+@pytest.mark.parametrize("text", ["Hi!", " HI ", "hi", "hi?!", "ＨＩ", "  hi\n"])
+def test_greetings_normalize_alike(text):
+    assert normalize_message(text) == "hi"
+
+
+def test_normalization_keeps_inner_punctuation_and_words():
+    assert normalize_message("How   much is the 50ml?") == "how much is the 50ml"
+    assert normalize_message("don't") != normalize_message("dont")
+
+
+def test_history_fingerprint_covers_recent_turns_only():
+    history = [message("user", "hello"), message("assistant", "Hi! How can I help?"), message("user", "price?")]
+    assert history_fingerprint(history, 0) == ""
+    assert history_fingerprint([], 2) == ""
+    assert history_fingerprint(history, 2) == history_fingerprint([message("user", "other")] + history[1:], 2)
+    assert history_fingerprint(history, 2) != history_fingerprint(history, 3)
+    assert history_fingerprint(history, 2) == history_fingerprint(
+        history[:1] + [message("assistant", " hi! HOW can i help"), message("user", "PRICE")], 2
+    )
+
+
+def test_only_opted_in_tenants_are_cached():
+    cache = LLMResponseCache(tenants=["shop"])
+    assert cache.enabled_for("shop")
+    assert not cache.enabled_for("other")
+    assert not cache.enabled_for(None)
+    cache.put("other", "key", "reply", 10)
+    assert cache.get("other", "key") is None
+    assert cache.stats()["entries"] == 0
+
+    everyone = LLMResponseCache(tenants=["*"])
+    assert everyone.enabled_for("other")
+    assert not everyone.enabled_for("")
+    assert not LLMResponseCache(tenants=["*"], max_entries_per_tenant=0).enabled_for("other")
+
+
+def test_entries_expire_after_the_ttl():
+    clock = FakeClock()
+    cache = LLMResponseCache(tenants=["shop"], ttl_seconds=60, clock=clock)
+    cache.put("shop", "key", "reply", 10)
+    clock.now += 59
+    assert cache.get("shop", "key") == "reply"
+    clock.now += 1
+    assert cache.get("shop", "key") is None
+    assert cache.stats()["expirations"] == 1
+    assert cache.stats()["entries"] == 0
+
+
+def test_zero_ttl_never_expires():
+    clock = FakeClock()
+    cache = LLMResponseCache(tenants=["shop"], ttl_seconds=0, clock=clock)
+    cache.put("shop", "key", "reply", 10)
+    clock.now += 10 ** 9
+    assert cache.get("shop", "key") == "reply"
+
+
+def test_each_tenant_keeps_its_own_lru_bound():
+    cache = LLMResponseCache(tenants=["*"], max_entries_per_tenant=2)
+    cache.put("shop", "a", "A", 1)
+    cache.put("shop", "b", "B", 1)
+    cache.put("other", "a", "other A", 1)
+    assert cache.get("shop", "a") == "A"  # b is now the least recently used
+    cache.put("shop", "c", "C", 1)
+    assert cache.get("shop", "b") is None
+    assert cache.get("shop", "a") == "A"
+    assert cache.get("shop", "c") == "C"
+    assert cache.get("other", "a") == "other A"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_hits_count_the_tokens_saved():
+    cache = LLMResponseCache(tenants=["shop"])
+    cache.put("shop", "key", "reply", 120)
+    cache.get("shop", "missing")
+    cache.get("shop", "key")
+    cache.get("shop", "key")
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["tokens_saved"]) == (2, 1, 240)
+    assert stats["hit_rate"] == pytest.approx(2 / 3)
+
+
+def test_keys_ignore_message_formatting_but_not_the_call():
+    cache = LLMResponseCache(tenants=["shop"])
+    history = [message("user", "hello")]
+    assert cache.key("reply", "m", "v1", "Hi!", history) == cache.key("reply", "m", "v1", " HI ", history)
+    assert cache.key("reply", "m", "v1", "hi", history) != cache.key("intent", "m", "v1", "hi", history)
+    assert cache.key("reply", "m", "v1", "hi", history) != cache.key("reply", "m", "v2", "hi", history)
+    assert cache.key("reply", "m", "v1", "hi", history) != cache.key("reply", "n", "v1", "hi", history)
+
+
+def test_repeated_message_is_answered_from_the_cache(monkeypatch):
+    class CountingProvider(LLMProvider):
+        name = "counting"
+
+        def __init__(self):
+            super().__init__("test")
+            self.calls = 0
+
+        async def complete(self, messages, max_tokens=150, temperature=0.7, json_mode=False):
+            self.calls += 1
+            return "We deliver nationwide in 2-3 days."
+
+    provider = CountingProvider()
+    monkeypatch.setattr(ai_service_module, "get_llm_provider", lambda tenant_id=None: provider)
+    monkeypatch.setattr(settings, "AI_COMBINED_RESPONSE", False)
+    service = AIService()
+    service.response_cache = LLMResponseCache(tenants=["shop"])
+
+    async def no_search(user_message, tenant_id):
+        return None
+
+    monkeypatch.setattr(service, "_handle_product_search", no_search)
+
+    async def run():
+        return [
+            await service._search_or_reply(text, [], "shop")
+            for text in ["Do you deliver to Sylhet?", "do you deliver to sylhet", "Do you deliver to Khulna?"]
+        ]
+
+    replies = asyncio.run(run())
+    assert replies[0] == replies[1] == replies[2] == "We deliver nationwide in 2-3 days."
+    assert provider.calls == 2
+    assert service.response_cache.stats()["hits"] == 1
+    assert service.response_cache.stats()["tokens_saved"] > 0
@@ -0,0 +1,88 @@
+"""Coalescing of identical in-flight LLM calls."""
+import asyncio
+
+import pytest
+
+from app.services.llm.base import LLMProvider
+from app.services.llm.singleflight import SingleFlight, request_key
+
+
+def test_concurrent_calls_share_one_execution():
+    group = SingleFlight()
+    started = []
+
+    async def run():
+        release = asyncio.Event()
+
+        async def call():
+            started.append(1)
+            await release.wait()
+            return "reply"
+
+        waiting = [asyncio.ensure_future(group.do("key", call)) for _ in range(5)]
+        await asyncio.sleep(0)
+        release.set()
+        return await asyncio.gather(*waiting)
+
+    assert asyncio.run(run()) == ["reply"] * 5
+    assert started == [1]
+    assert group.stats() == {"calls": 5, "deduplicated": 4, "dedupe_rate": 0.8, "in_flight": 0}
+
+
+def test_finished_calls_are_not_cached():
+    group = SingleFlight()
+    replies = iter(["first", "second"])
+
+    async def call():
+        return next(replies)
+
+    async def run():
+        return [await group.do("key", call), await group.do("key", call)]
+
+    assert asyncio.run(run()) == ["first", "second"]
+
+
+def test_errors_reach_every_caller():
+    group = SingleFlight()
+
+    async def call():
+        await asyncio.sleep(0)
+        raise ValueError("provider down")
+
+    async def run():
+        return await asyncio.gather(*(group.do("key", call) for _ in range(3)), return_exceptions=True)
+
+    errors = asyncio.run(run())
+    assert [str(error) for error in errors] == ["provider down"] * 3
+
+
+def test_caller_giving_up_does_not_cancel_the_others():
+    group = SingleFlight()
+
+    async def run():
+        release = asyncio.Event()
+
+        async def call():
+            await release.wait()
+            return "reply"
+
+        impatient = asyncio.ensure_future(group.do("key", call))
+        patient = asyncio.ensure_future(group.do("key", call))
+        await asyncio.sleep(0)
+        impatient.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await impatient
+        return await patient
+
+    assert asyncio.run(run()) == "reply"
+
+
+def test_request_key_tells_requests_apart():
+    first, second = LLMProvider("model"), LLMProvider("model")
+    messages = [{"role": "user", "content": "price?"}]
+    assert request_key(first, messages, max_tokens=10) == request_key(first, list(messages), max_tokens=10)
+    assert request_key(first, messages, max_tokens=10) != request_key(first, messages, max_tokens=20)
+    assert request_key(first, messages, max_tokens=10) != request_key(second, messages, max_tokens=10)
+    assert request_key(first, messages) != request_key(first, [{"role": "user", "content": "price"}])
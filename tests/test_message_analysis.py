@@ -0,0 +1,54 @@
+"""Single-pass message analysis shared by product search and intent detection."""
+import random
+
+import pytest
+
+from app.services.intent.analysis import PhraseAutomaton, analyze_message
+
+
+def test_automaton_finds_exactly_the_brute_force_matches():
+    rng = random.Random(7)
+    vocabulary = "a b c d e".split()
+    for _ in range(300):
+        phrases = [tuple(rng.choice(vocabulary) for _ in range(rng.randint(1, 4))) for _ in range(rng.randint(1, 8))]
+        automaton = PhraseAutomaton((phrase, index) for index, phrase in enumerate(phrases))
+        tokens = [rng.choice(vocabulary) for _ in range(rng.randint(0, 15))]
+        expected = sorted(
+            (start, start + len(phrase), index)
+            for index, phrase in enumerate(phrases)
+            for start in range(len(tokens) - len(phrase) + 1)
+            if tuple(tokens[start:start + len(phrase)]) == phrase
+        )
+        assert sorted(automaton.find(tokens)) == expected
+
+
+@pytest.mark.parametrize("message, is_search, query", [
+    ("I'm looking for a facial cleanser", True, "facial cleanser"),
+    ("Show me sunscreen SPF 50!", True, "sunscreen spf 50"),
+    ("Hello, what's the price of the Cosrx snail mucin?", True, "cosrx snail mucin"),
+    ("what do you have", True, "what do you have"),
+    ("I don't need anything", False, "don't need anything"),
+    ("I wanted to ask about delivery", False, "wanted ask about delivery"),
+])
+def test_search_intent_and_query(message, is_search, query):
+    analysis = analyze_message(message)
+    assert analysis.is_product_search is is_search
+    assert analysis.search_query == query
+
+
+@pytest.mark.parametrize("message, signals, keyword_intent", [
+    ("I want to order now", {"HOT"}, "HOT"),
+    ("I don't want to buy anything", set(), "COLD"),
+    ("not interested, thanks", {"COLD"}, "COLD"),
+    ("hi there", {"NEUTRAL"}, "COLD"),
+    ("say hi to the team", set(), "COLD"),
+    ("maybe later", set(), "WARM"),
+])
+def test_intent_signals(message, signals, keyword_intent):
+    analysis = analyze_message(message)
+    assert analysis.intent_signals == signals
+    assert analysis.keyword_intent == keyword_intent
+
+
+def test_analysis_is_shared_between_consumers():
+    assert analyze_message("show me sunscreen") is analyze_message("show me sunscreen")
@@ -0,0 +1,55 @@
+"""Product search routes, with the service's worker pool calls stubbed."""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.v1 import product_search
+from app.services.product_search.search_pool import SearchQueueFullError
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(product_search.router)
+    return TestClient(app)
+
+
+def queue_full(*args, **kwargs):
+    raise SearchQueueFullError("Search queue is full for tenant shop")
+
+
+def test_suggest_runs_on_the_worker_pool(client, monkeypatch):
+    calls = []
+
+    async def suggest_async(tenant_id, prefix, limit=10):
+        calls.append((tenant_id, prefix, limit))
+        return [{"text": "CeraVe Foaming Cleanser", "type": "product", "product_id": "1001"}]
+
+    monkeypatch.setattr(product_search.product_search_service, "suggest_async", suggest_async)
+    response = client.get("/suggest", params={"tenant_id": "shop", "prefix": "cera", "limit": 5})
+    assert response.status_code == 200
+    assert response.json()["suggestions"][0]["text"] == "CeraVe Foaming Cleanser"
+    assert calls == [("shop", "cera", 5)]
+
+
+def test_suggest_returns_503_when_the_queue_is_full(client, monkeypatch):
+    async def suggest_async(*args, **kwargs):
+        queue_full()
+
+    monkeypatch.setattr(product_search.product_search_service, "suggest_async", suggest_async)
+    response = client.get("/suggest", params={"tenant_id": "shop", "prefix": "cera"})
+    assert response.status_code == 503
+
+
+@pytest.mark.parametrize("path, body, method", [
+    ("/search", {"tenant_id": "shop", "query": "cleanser"}, "search_async"),
+    ("/batch", {"tenant_id": "shop", "queries": ["cleanser", "toner"]}, "search_batch_async"),
+])
+def test_search_returns_503_when_the_queue_is_full(client, monkeypatch, path, body, method):
+    async def rejected(*args, **kwargs):
+        queue_full()
+
+    monkeypatch.setattr(product_search.product_search_service, method, rejected)
+    response = client.post(path, json=body)
+    assert response.status_code == 503
+    assert response.json()["detail"] == "Product search is busy, please retry shortly"
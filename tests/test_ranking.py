@@ -0,0 +1,68 @@
+"""Field-weighted BM25 ranking of product search."""
+import math
+
+import pytest
+
+from app.services.product_search.catalog import TenantCatalog
+from app.services.product_search.ranking import FIELD_WEIGHTS, BM25Ranker
+from app.services.product_search.text import tokenize
+
+PRODUCTS = [
+    {"Name": "Hydrating Toner", "Categories": "Skin Care > Toner", "Brand": "Cosrx",
+     "Description": "A toner that leaves skin soft, not a cleanser."},
+    {"Name": "Gentle Cleanser", "Categories": "Skin Care > Cleanser", "Brand": "CeraVe",
+     "Description": "Cleanser for dry skin."},
+    {"Name": "Foaming Cleanser Cleanser", "Categories": "Skin Care", "Brand": "CeraVe", "Description": ""},
+    {"Name": "Lip Balm", "Categories": "Lip Care", "Brand": "Nivea", "Description": "Soothing balm."},
+    {"Name": "Snail Mucin Essence", "Categories": "Skin Care > Essence", "Brand": "Cosrx",
+     "Description": "Essence with snail mucin for hydrating dull skin and a long description of it."},
+]
+
+
+def reference_bm25f(products, terms, k1=1.2, b=0.75):
+    """BM25F straight from its definition, over freshly tokenized fields."""
+    fields = [("name", "Name"), ("categories", "Categories"), ("brand", "Brand"), ("description", "Description")]
+    tokens = [{name: tokenize(product.get(key, "")) for name, key in fields} for product in products]
+    averages = {name: sum(len(doc[name]) for doc in tokens) / len(products) for name, _ in fields}
+    scores = {}
+    for term in dict.fromkeys(terms):
+        matching = [doc_id for doc_id, doc in enumerate(tokens) if any(term in doc[name] for name, _ in fields)]
+        idf = math.log(1 + (len(products) - len(matching) + 0.5) / (len(matching) + 0.5))
+        for doc_id in matching:
+            tf = sum(
+                FIELD_WEIGHTS[name] * tokens[doc_id][name].count(term)
+                / (1 - b + b * len(tokens[doc_id][name]) / averages[name])
+                for name, _ in fields if averages[name]
+            )
+            scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf / (k1 + tf)
+    return scores
+
+
+@pytest.fixture
+def ranker():
+    return BM25Ranker(TenantCatalog("ranking", PRODUCTS))
+
+
+@pytest.mark.parametrize("query", ["cleanser", "hydrating skin", "cosrx snail", "balm balm", "sunscreen"])
+def test_scores_match_the_bm25f_definition(ranker, query):
+    terms = tokenize(query)
+    expected = reference_bm25f(PRODUCTS, terms)
+    scores = ranker.score(terms)
+    assert scores.keys() == expected.keys()
+    for doc_id, score in expected.items():
+        assert scores[doc_id] == pytest.approx(score)
+
+
+def test_name_hit_outranks_description_hit(ranker):
+    ranking = ranker.rank(["cleanser"])
+    assert ranking.index(1) < ranking.index(0)
+    assert ranking.index(2) < ranking.index(0)
+
+
+def test_candidates_restrict_scoring(ranker):
+    assert ranker.score(["cleanser"], candidates={0, 3}).keys() == {0}
+
+
+def test_score_many_matches_separate_queries(ranker):
+    queries = [tokenize("cleanser"), tokenize("cosrx cleanser"), tokenize("lip")]
+    assert ranker.score_many(queries) == [ranker.score(terms) for terms in queries]
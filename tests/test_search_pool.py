@@ -0,0 +1,125 @@
+"""Tenant-fair queueing and queue limits of ``SearchWorkerPool``."""
+import asyncio
+import threading
+
+import pytest
+
+from app.services.product_search.search_pool import SearchQueueFullError, SearchWorkerPool
+
+
+@pytest.fixture
+def pool():
+    pool = SearchWorkerPool(max_workers=1, max_queue_depth=4, max_queue_per_tenant=2)
+    yield pool
+    pool.shutdown()
+
+
+def blocker():
+    """A call that holds the only worker until the event is set."""
+    release = threading.Event()
+    started = threading.Event()
+
+    def call():
+        started.set()
+        release.wait(5)
+        return "blocked"
+
+    return call, started, release
+
+
+async def wait_started(started):
+    assert await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+
+
+def test_full_tenant_queue_rejects_only_that_tenant(pool):
+    async def run():
+        call, started, release = blocker()
+        running = asyncio.ensure_future(pool.run("busy", call))
+        await wait_started(started)
+        queued = [asyncio.ensure_future(pool.run("busy", lambda: "busy")) for _ in range(2)]
+        await asyncio.sleep(0)
+        with pytest.raises(SearchQueueFullError):
+            await pool.run("busy", lambda: "rejected")
+        other = asyncio.ensure_future(pool.run("quiet", lambda: "quiet"))
+        await asyncio.sleep(0)
+        assert pool.stats()["queued"] == 3
+        release.set()
+        return await running, await asyncio.gather(*queued), await other
+
+    assert asyncio.run(run()) == ("blocked", ["busy", "busy"], "quiet")
+    stats = pool.stats()
+    assert stats["rejected"] == 1
+    assert stats["completed"] == 4
+
+
+def test_total_queue_limit_applies_across_tenants(pool):
+    async def run():
+        call, started, release = blocker()
+        running = asyncio.ensure_future(pool.run("first", call))
+        await wait_started(started)
+        queued = [asyncio.ensure_future(pool.run(f"tenant-{number}", lambda: None)) for number in range(4)]
+        await asyncio.sleep(0)
+        with pytest.raises(SearchQueueFullError):
+            await pool.run("another", lambda: None)
+        release.set()
+        await asyncio.gather(running, *queued)
+
+    asyncio.run(run())
+    assert pool.stats()["rejected"] == 1
+
+
+def test_waiting_calls_run_round_robin_across_tenants():
+    pool = SearchWorkerPool(max_workers=1)
+    order = []
+
+    async def run():
+        call, started, release = blocker()
+        running = asyncio.ensure_future(pool.run("a", call))
+        await wait_started(started)
+        queued = [
+            asyncio.ensure_future(pool.run(tenant_id, order.append, name))
+            for tenant_id, name in [("a", "a2"), ("a", "a3"), ("b", "b1"), ("c", "c1"), ("b", "b2")]
+        ]
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(running, *queued)
+
+    try:
+        asyncio.run(run())
+    finally:
+        pool.shutdown()
+    assert order == ["a2", "b1", "c1", "a3", "b2"]
+
+
+def test_errors_reach_the_caller(pool):
+    def fail():
+        raise ValueError("bad query")
+
+    async def run():
+        with pytest.raises(ValueError, match="bad query"):
+            await pool.run("shop", fail)
+        return await pool.run("shop", lambda: "still working")
+
+    assert asyncio.run(run()) == "still working"
+
+
+def test_ranking_counters_survive_concurrent_searches(tmp_path):
+    import json
+
+    from app.services.product_search.product_search_service import ProductSearchService
+    from benchmarks.synthetic_catalog import generate_catalog
+
+    with open(tmp_path / "shop.json", "w") as file:
+        json.dump(generate_catalog(50), file)
+    service = ProductSearchService(
+        str(tmp_path), cache_size=0, search_workers=8, max_queue_depth=400, max_queue_per_tenant=400
+    )
+
+    async def run():
+        await asyncio.gather(*(service.search_async("shop", "cleanser") for _ in range(400)))
+
+    try:
+        asyncio.run(run())
+    finally:
+        service.worker_pool.shutdown()
+    assert service.get_stats()["ranking"]["lexical"] == 400
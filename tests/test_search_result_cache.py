@@ -0,0 +1,48 @@
+"""Cached product search results are keyed by catalog version."""
+import json
+import os
+
+from app.services.product_search.product_search_service import ProductSearchService
+from benchmarks.synthetic_catalog import generate_catalog
+
+TENANT = "cached"
+
+
+def write_catalog(directory, products):
+    path = os.path.join(directory, f"{TENANT}.json")
+    with open(path, "w") as file:
+        json.dump(products, file)
+    return path
+
+
+def test_cached_results_are_reused(tmp_path):
+    write_catalog(str(tmp_path), generate_catalog(30))
+    service = ProductSearchService(str(tmp_path), cache_size=64)
+    try:
+        first = service.search(TENANT, "cleanser")
+        assert service.search(TENANT, "cleanser") == first
+        assert service.result_cache.stats()["hits"] == 1
+    finally:
+        service.worker_pool.shutdown()
+
+
+def test_catalog_change_invalidates_cached_results(tmp_path):
+    path = write_catalog(str(tmp_path), generate_catalog(30))
+    service = ProductSearchService(str(tmp_path), cache_size=64)
+    try:
+        first = service.search(TENANT, "zzyzx")
+        assert first["total"] == 0
+        assert service.search(TENANT, "zzyzx") == first
+        version = service.get_catalog_version(TENANT)
+
+        products = generate_catalog(30)
+        products[3]["Name"] = "Zzyzx Renamed Cleanser"
+        write_catalog(str(tmp_path), products)
+        stamp = os.stat(path).st_mtime_ns + 1_000_000_000
+        os.utime(path, ns=(stamp, stamp))
+        service.catalog_store.reload(TENANT)
+
+        assert service.get_catalog_version(TENANT) > version
+        assert [product["Name"] for product in service.search(TENANT, "zzyzx")["products"]] == ["Zzyzx Renamed Cleanser"]
+    finally:
+        service.worker_pool.shutdown()
@@ -0,0 +1,37 @@
+"""Adding the conversation summary columns to databases created before them."""
+import asyncio
+import sqlite3
+
+from app.database import sqlite_handler
+
+
+def test_old_database_is_migrated_once_per_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(sqlite_handler, "DB_DIR", str(tmp_path))
+    monkeypatch.setattr(sqlite_handler, "_migrated_paths", set())
+    with sqlite3.connect(tmp_path / "old.db") as conn:
+        conn.execute(
+            "CREATE TABLE leads (id TEXT PRIMARY KEY, tenant_id TEXT NOT NULL, name TEXT, email TEXT, "
+            "phone TEXT, source TEXT NOT NULL, intent TEXT NOT NULL, created_at TEXT NOT NULL, "
+            "updated_at TEXT NOT NULL, facebook_id TEXT UNIQUE)"
+        )
+        conn.execute("INSERT INTO leads VALUES ('l1', 'old', NULL, NULL, NULL, 'website', 'cold', 't', 't', NULL)")
+
+    migrations = []
+    migrate_tables = sqlite_handler.migrate_tables
+
+    async def counting_migrate(conn):
+        migrations.append(conn)
+        await migrate_tables(conn)
+
+    monkeypatch.setattr(sqlite_handler, "migrate_tables", counting_migrate)
+
+    async def run():
+        for _ in range(3):
+            lead = await sqlite_handler.get_lead_by_id("old", "l1")
+        await sqlite_handler.update_lead_summary("old", "l1", "Wants sunscreen.", 4)
+        return lead, await sqlite_handler.get_lead_by_id("old", "l1")
+
+    before, after = asyncio.run(run())
+    assert len(migrations) == 1
+    assert before["summary"] is None and before["summary_message_count"] == 0
+    assert after["summary"] == "Wants sunscreen." and after["summary_message_count"] == 4
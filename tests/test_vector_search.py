@@ -0,0 +1,64 @@
+"""TF-IDF similarity search and hybrid score blending."""
+import numpy as np
+import pytest
+
+from app.services.product_search.catalog import TenantCatalog
+from app.services.product_search.vector_search import MIN_SIMILARITY, VectorIndex, blend_scores, top_documents
+from benchmarks.synthetic_catalog import generate_catalog
+
+QUERIES = ["foaming cleanser", "moisturizing cream for dry skin", "cerave", "niacinamide serum", "zzyzx"]
+
+
+@pytest.fixture(scope="module")
+def products():
+    return generate_catalog(200)
+
+
+@pytest.fixture(scope="module")
+def index(products):
+    return VectorIndex(TenantCatalog("vector", products))
+
+
+def test_similarities_are_cosines(index):
+    norms = np.sqrt(np.asarray(index.matrix.multiply(index.matrix).sum(axis=1)).ravel())
+    assert np.allclose(norms, 1.0, atol=1e-5)
+    for query in QUERIES:
+        scores = index.similarities(query)
+        assert scores.shape == (index.doc_count,)
+        assert scores.min() >= 0.0 and scores.max() <= 1.0 + 1e-5
+
+
+def test_unrelated_query_matches_nothing(index):
+    assert index.rank("zzyzx") == []
+
+
+def test_misspelled_query_finds_the_product(index, products):
+    [best] = index.rank("moisturising lotion")[:1]
+    assert "Moisturizing" in products[best]["Name"]
+    [best] = index.rank("cleanzer")[:1]
+    assert "Cleanser" in products[best]["Name"]
+
+
+def test_batch_similarities_match_single_queries(index):
+    batch = index.similarities_many(QUERIES)
+    for column, query in enumerate(QUERIES):
+        assert np.allclose(batch[:, column], index.similarities(query), atol=1e-6)
+
+
+def test_top_documents_with_limit_is_a_prefix(index):
+    scores = index.similarities("foaming cleanser")
+    ranking = top_documents(scores)
+    assert all(scores[doc_id] > MIN_SIMILARITY for doc_id in ranking)
+    assert [scores[doc_id] for doc_id in ranking] == sorted((scores[doc_id] for doc_id in ranking), reverse=True)
+    assert top_documents(scores, limit=5) == ranking[:5]
+    candidates = set(ranking[::2])
+    assert top_documents(scores, candidates) == [doc_id for doc_id in ranking if doc_id in candidates]
+
+
+def test_blend_normalizes_bm25_and_weights_by_alpha():
+    similarities = np.array([0.2, 0.6, 0.0, 0.4], dtype=np.float32)
+    lexical = {0: 8.0, 2: 4.0}
+    assert np.allclose(blend_scores(lexical, similarities.copy(), 1.0), [1.0, 0.0, 0.5, 0.0])
+    assert np.allclose(blend_scores(lexical, similarities.copy(), 0.0), similarities)
+    assert np.allclose(blend_scores(lexical, similarities.copy(), 0.5), [0.6, 0.3, 0.25, 0.2])
+    assert np.allclose(blend_scores({}, similarities.copy(), 0.5), similarities * 0.5)